@@ -1,7 +1,9 @@
+import multiprocessing
+import json
 from argparse import Namespace, ArgumentParser
-from typing import List
+from typing import Any, Dict, List, Optional
 
-from analyzer.src.analyzer import Analyzer
+from analyzer.src.dedup import Deduplication
 
 
 def main() -> None:
@@ -18,13 +20,153 @@ def main() -> None:
                         help='Whether to conduct the statistical tests')
     parser.add_argument('-e', '--experiment_names', type=str, default="nodes,spaces,files",
                         help='Which experiments to run')
+    parser.add_argument('-d', '--deduplicate', type=str, default=str(Deduplication.OFF),
+                        choices=Deduplication.as_list(),
+                        help='Whether to analyze identical result files once and count them once '
+                        '(once) or replay their result for each copy (replay)')
+    parser.add_argument('-c', '--checkpoint_interval', type=float, default=600,
+                        help='Minimum number of seconds between two checkpoints (0 disables them)')
+    parser.add_argument('-r', '--resume', action='store_true',
+                        help='Whether to skip the repositories of the last checkpoint')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Whether to only analyze the repositories which are new to the '
+                        'incremental ranks and to run the Mann-Whitney U tests of the discrete '
+                        'metrics on these ranks')
+    parser.add_argument('--chunk_mb', type=float, default=0,
+                        help='Maximum size in MB of the result files analyzed in one task, larger '
+                        'repositories are split (0 sizes the chunks automatically, a negative '
+                        'size does not split repositories)')
+    parser.add_argument('--max_memory', type=float, default=0,
+                        help='Memory budget in MB of the analyzer and its workers, tasks are held '
+                        'back when it is approached (0 does not limit the memory)')
+    parser.add_argument('--telemetry_interval', type=float, default=0.,
+                        help='Minimum number of seconds between two exports of the throughput '
+                        'telemetry (0, the default, disables them)')
+    parser.add_argument('--sample_fraction', type=float, default=1.,
+                        help='Fraction of the result files to analyze for a fast approximate '
+                        'analysis, the other files are not read (the statistic tests of unsampled '
+                        'results keep this fraction of the values)')
+    parser.add_argument('--sample_cap', type=int, default=0,
+                        help='Maximum number of values per repository, feature and metric')
+    parser.add_argument('--reservoir_size', type=int, default=0,
+                        help='Maximum number of values per feature and metric')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed for sampling and bootstrapping')
+    parser.add_argument('--bootstrap_resamples', type=int, default=200,
+                        help='Number of bootstrap resamples for the error bars of sampled results')
+    parser.add_argument('--effect_size_resamples', type=int, default=0,
+                        help='Number of bootstrap resamples for the confidence intervals of the '
+                        'proportion and the median difference (0 disables them)')
+    parser.add_argument('--out_of_core_mb', type=float, default=0,
+                        help='Memory budget in MB of the Mann-Whitney U tests, which are run on '
+                        'the columnar store sorted on disk (0 runs all tests in memory)')
+    parser.add_argument('--test_cache_mb', type=float, default=0,
+                        help='Maximum size in MB of the cache of the statistic test results, only '
+                        'tests whose inputs changed are rerun (0, the default, disables the cache)')
+    parser.add_argument('--report', action='store_true',
+                        help='Whether to generate the tables, boxplots and histograms of the '
+                        'results whose inputs have changed')
+    parser.add_argument('--correction', type=str, default="bonferroni",
+                        choices=["bonferroni", "holm", "benjamini_hochberg"],
+                        help='Correction of the p-values saved as the corrected p-value of the '
+                        'report')
+    parser.add_argument('-j', '--jobs', type=int, default=multiprocessing.cpu_count(),
+                        help='Number of processes rendering the histograms of the report')
+    parser.add_argument('-w', '--watch', action='store_true',
+                        help='Whether to analyze the collector results while they are written')
+    parser.add_argument('--watch_debounce', type=float, default=60.,
+                        help='Minimum number of seconds between two summaries while watching')
+    parser.add_argument('--watch_idle', type=float, default=0.,
+                        help='Seconds without changes after which watching stops (0 never stops)')
+    parser.add_argument('-i', '--input', type=str,
+                        help='JSON Lines file (optionally .zst compressed) or - for stdin with '
+                        'the collector results to analyze instead of the result folder')
+    parser.add_argument('--export_db', action='store_true',
+                        help='Whether to export the individual spaces and nodes into a database')
+    parser.add_argument('--sql', type=str,
+                        help='SQL query to run on the exported database')
+    parser.add_argument('--aggregate', type=str,
+                        help='Metric to aggregate over the exported spaces or nodes')
+    parser.add_argument('--table', type=str, default="spaces", choices=["spaces", "nodes"],
+                        help='Table to aggregate')
+    parser.add_argument('--feature', type=str,
+                        help='Feature the aggregated spaces or nodes have to use')
+    parser.add_argument('--unused', action='store_true',
+                        help='Whether the feature has to be unused instead')
+    parser.add_argument('--min_repo_sloc', type=float,
+                        help='Minimum number of source lines of code of the aggregated '
+                        'repositories')
+    parser.add_argument('--depth', type=int,
+                        help='Nesting depth of the aggregated spaces')
+    parser.add_argument('--rollup', type=str,
+                        help='Comma separated repositories or owners whose results are '
+                        'aggregated from the repository cube (all for every repository)')
+    parser.add_argument('--rollup_exclude', type=str, default="",
+                        help='Comma separated repositories or owners to leave out of the rollup')
 
     args: Namespace = parser.parse_args()
 
+    # Imported after parsing, so `--help` does not load the analysis dependencies
+    from analyzer.src.analyzer import Analyzer
+    from analyzer.src.sampling import Sampler
+
     repo_count: int = args.repo_count
     skip_repos: int = args.skip_repos
     analyze_repos: bool = args.analyze_repos
     statistic_tests: bool = args.statistic_tests
     experiment_names: List[str] = args.experiment_names.split(",")
+    deduplication: str = args.deduplicate
+    checkpoint_interval: float = args.checkpoint_interval
+    resume: bool = args.resume
+    telemetry_interval: float = args.telemetry_interval
+    chunk_size = int(args.chunk_mb * (1 << 20))
+    max_memory = int(args.max_memory * (1 << 20))
+    incremental: bool = args.incremental
+    out_of_core_budget = int(args.out_of_core_mb * (1 << 20))
+    test_cache_size = int(args.test_cache_mb * (1 << 20))
+    sampler = Sampler(args.sample_fraction, args.sample_cap, args.reservoir_size, args.seed)
+    bootstrap_resamples: int = args.bootstrap_resamples
+    effect_size_resamples: int = args.effect_size_resamples
+    report: bool = args.report
+    jobs: int = args.jobs
+    correction: str = args.correction
+    export_db: bool = args.export_db
+    watch: bool = args.watch
+    watch_debounce: float = args.watch_debounce
+    watch_idle: float = args.watch_idle
+    stream_path: Optional[str] = args.input
+
+    Analyzer.analyze(repo_count, skip_repos, analyze_repos, statistic_tests, experiment_names,
+                     deduplication, checkpoint_interval, resume, sampler, bootstrap_resamples,
+                     report, jobs, export_db, watch, watch_debounce, watch_idle,
+                     stream_path, effect_size_resamples, telemetry_interval,
+                     chunk_size, max_memory, incremental, out_of_core_budget, test_cache_size,
+                     correction)
+
+    if args.rollup:
+        from analyzer.src.rollup import RepoCube
+        cube = RepoCube.load()
+
+        if cube is None:
+            print("No repository cube found, analyze the repositories first.")
+        else:
+            repos = None if args.rollup == "all" else args.rollup.split(",")
+            exclude = [repo for repo in args.rollup_exclude.split(",") if repo]
+            rollup: Dict[str, Any] = cube.aggregate(repos, exclude)
+            if cube.sampling:
+                rollup["sampling"] = cube.sampling
+            print(json.dumps(rollup, indent=4))
+
+    if args.sql or args.aggregate:
+        from analyzer.src.database import Database
+        database = Database()
+
+        if args.sql:
+            for row in database.query(args.sql):
+                print(*row, sep="\t")
 
-    Analyzer.analyze(repo_count, skip_repos, analyze_repos, statistic_tests, experiment_names)
+        if args.aggregate:
+            print(json.dumps(database.aggregate(args.aggregate, args.table, args.feature,
+                                                not args.unused, None, args.min_repo_sloc,
+                                                args.depth),
+                             indent=4))
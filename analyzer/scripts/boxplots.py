@@ -1,45 +1,132 @@
 import os
+from argparse import ArgumentParser
 from os.path import join
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+import numpy as np
 
 from analyzer.src.metrics import Metric
 from analyzer.src.features import Features
+from analyzer.src.transport import ColumnStore
 from analyzer.src.utils import get_analyzer_res_path, load_json_file, to_camel_case
 
-import pandas as pd
-from matplotlib.cbook import boxplot_stats
 
+WHIS = 1.5
+
+
+def percentile(sorted_values: np.ndarray, q: float) -> float:
+    """
+    Returns a percentile of sorted values with linear interpolation like `np.percentile`.
+
+    :param sorted_values: Sorted array of values
+    :param q: Percentile between 0 and 1
+    :return: The interpolated percentile
+    """
+    position = q * (len(sorted_values) - 1)
+    lower = int(np.floor(position))
+    upper = min(lower + 1, len(sorted_values) - 1)
+
+    return float(sorted_values[lower] +
+                 (sorted_values[upper] - sorted_values[lower]) * (position - lower))
+
+
+def compute_boxplot_stats(columns: List[np.ndarray]) -> List[Dict[str, float]]:
+    """
+    Computes the whiskers, quartiles and median of each column like matplotlib's
+    `boxplot_stats`, sorting each column only once.
+
+    :param columns: Arrays of values
+    :return: Dicts containing whislo, q1, med, q3 and whishi of each column
+    """
+    boxplots: List[Dict[str, float]] = list()
+
+    for column in columns:
+        values = np.sort(np.asarray(column, dtype=np.float64))
+        n = len(values)
+
+        if not n:
+            boxplots.append({key: np.nan for key in ["whislo", "q1", "med", "q3", "whishi"]})
+            continue
+
+        q1, med, q3 = percentile(values, .25), percentile(values, .5), percentile(values, .75)
+        iqr = q3 - q1
+
+        high = np.searchsorted(values, q3 + WHIS * iqr, side="right") - 1
+        whishi = q3 if high < 0 or values[high] < q3 else float(values[high])
+
+        low = np.searchsorted(values, q1 - WHIS * iqr, side="left")
+        whislo = q1 if low == n or values[low] > q1 else float(values[low])
+
+        boxplots.append({"whislo": whislo, "q1": q1, "med": med, "q3": q3, "whishi": whishi})
+
+    return boxplots
 
-def generate_boxplots() -> None:
-    """Generates boxplots from the raw result data."""
-    metrics = Metric.as_list()
-    features = Features.as_list()
+
+def load_spaces(columnar: bool) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Loads the values of the spaces experiment.
+
+    :param columnar: Whether to read the columnar store instead of the JSON results
+    :return: Dict mapping `<feature>/<metric>` keys to arrays of values if the results exist
+    """
+    if columnar:
+        columns = ColumnStore.load(get_analyzer_res_path(), "results_columns")
+        if columns is None:
+            return None
+
+        prefix = "spaces/"
+        return {k[len(prefix):]: v for k, v in columns.items() if k.startswith(prefix)}
 
     results = load_json_file(get_analyzer_res_path(), "results_with_raw_values.json")
     if results is None:
+        return None
+
+    return spaces_from_results(results)
+
+
+def spaces_from_results(results: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Returns the values of the spaces experiment from the raw results.
+
+    :param results: The raw results
+    :return: Dict mapping `<feature>/<metric>` keys to arrays of values
+    """
+    return {f"{feature}/{metric}": np.asarray(values["values"], dtype=np.float64)
+            for feature, metrics in results["spaces"].items()
+            for metric, values in metrics.items()}
+
+
+def generate_boxplots(
+    columnar: bool = False,
+    spaces: Optional[Dict[str, np.ndarray]] = None
+) -> None:
+    """
+    Generates boxplots from the raw result data.
+
+    :param columnar: Whether to read the columnar store instead of the JSON results
+    :param spaces: Values of the spaces experiment as returned by `load_spaces`, which are
+                   loaded from the results if not given
+    """
+    metrics = Metric.as_list()
+    features = Features.as_list()
+
+    if spaces is None:
+        spaces = load_spaces(columnar)
+    if spaces is None:
         print("Make sure to run the analyzer first.")
         return
 
-    spaces = results["spaces"]
-
     path = join(get_analyzer_res_path(), "boxplots")
     os.makedirs(path, exist_ok=True)
 
     with open(join(path, f"boxplots.txt"), "w+", encoding="utf-8") as boxplots:
         for metric in metrics:
-            series_data: List[List[float]] = list()
+            columns: List[np.ndarray] = list()
 
             for feature in features:
-                metrics_feature = spaces[feature]
-                metrics_no_feature = spaces["no_" + feature]
-
-                no_series = pd.Series(metrics_no_feature[metric]["values"])
-                series = pd.Series(metrics_feature[metric]["values"])
+                columns.extend([spaces[f"no_{feature}/{metric}"], spaces[f"{feature}/{metric}"]])
 
-                series_data.extend([no_series, series])
-
-            boxplot_data: List[Dict[str, Any]] = [
-                boxplot_stats(series)[0] for series in series_data]
+            boxplot_data = compute_boxplot_stats(columns)
 
             escaped_metric = metric.replace("_", "\_")
 
@@ -100,4 +187,9 @@ boxplot={{
             ))
 
 
-generate_boxplots()
+if __name__ == "__main__":
+    parser = ArgumentParser(description='Boxplots')
+    parser.add_argument('-c', '--columnar', action='store_true',
+                        help='Whether to read the columnar store instead of the JSON results')
+
+    generate_boxplots(parser.parse_args().columnar)
@@ -1,26 +1,150 @@
+from argparse import ArgumentParser
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
 from analyzer.src.utils import get_analyzer_res_path, load_json_file, save_json_file
+from analyzer.src.cooccurrence import Cooccurrence
+from analyzer.src.experiments import Experiment
 from analyzer.src.features import Features
 from analyzer.src.metrics import Metric
+from analyzer.src.statistics import Tests
+
+
+def bonferroni(p_values: np.ndarray) -> np.ndarray:
+    """
+    Multiplies the p-values with the number of hypotheses.
+
+    :param p_values: Sorted p-values
+    :return: Corrected p-values in the same order
+    """
+    corrected: np.ndarray = np.minimum(p_values * len(p_values), 1.)
+    return corrected
+
+
+def holm(p_values: np.ndarray) -> np.ndarray:
+    """
+    Multiplies the i-th smallest p-value with the number of hypotheses minus i and keeps the
+    corrected p-values monotonic.
+
+    :param p_values: Sorted p-values
+    :return: Corrected p-values in the same order
+    """
+    factors = len(p_values) - np.arange(len(p_values))
+    return np.minimum(np.maximum.accumulate(p_values * factors), 1.)
+
+
+def benjamini_hochberg(p_values: np.ndarray) -> np.ndarray:
+    """
+    Multiplies the i-th smallest p-value with the number of hypotheses divided by i and keeps the
+    corrected p-values monotonic, which controls the false discovery rate.
+
+    :param p_values: Sorted p-values
+    :return: Corrected p-values in the same order
+    """
+    factors = len(p_values) / np.arange(1, len(p_values) + 1)
+    return np.minimum(np.minimum.accumulate((p_values * factors)[::-1])[::-1], 1.)
+
+
+CORRECTIONS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "bonferroni": bonferroni,
+    "holm": holm,
+    "benjamini_hochberg": benjamini_hochberg
+}
+
+# Name of each correction in the captions of the tables
+CORRECTION_TITLES = {
+    "bonferroni": "Bonferroni",
+    "holm": "Holm",
+    "benjamini_hochberg": "Benjamini-Hochberg"
+}
+
 
+def correct(p_values: np.ndarray, method: str) -> np.ndarray:
+    """
+    Corrects a matrix of p-values for multiple testing, missing p-values are NaN.
 
-def bonferroni_correction() -> None:
-    """This corrects the p-values by multiplying them with the total number of hypotheses."""
+    :param p_values: Matrix of p-values
+    :param method: Name of the correction
+    :return: Matrix of corrected p-values
+    """
+    flat = p_values.ravel()
+    present = np.flatnonzero(~np.isnan(flat))
+    order = present[np.argsort(flat[present], kind="stable")]
+
+    corrected = np.full_like(flat, np.nan)
+    corrected[order] = CORRECTIONS[method](flat[order])
+    return corrected.reshape(p_values.shape)
+
+
+def correct_p_values(method: str = "bonferroni") -> None:
+    """
+    Corrects the p-values of the statistic tests.
+
+    :param method: Name of the correction saved as the corrected p-value
+    """
     test_data = load_json_file(get_analyzer_res_path(), "statistic_tests.json")
     if not test_data:
         return
 
-    num_features = len(test_data["spaces"].keys())
-    num_metrics = len(test_data["spaces"]["lifetimes"].keys())
+    save_json_file(correct_statistics(test_data, method), get_analyzer_res_path(),
+                   "corrected_statistic_tests.json")
+
+
+def correct_statistics(test_data: Dict[str, Any], method: str = "bonferroni") -> Dict[str, Any]:
+    """
+    Adds the p-values of all corrections to the statistic tests. The hypotheses of each test over
+    all features, or all pairs of features of the co-occurrence, and all metrics are corrected
+    together.
+
+    :param test_data: The content of the statistics file
+    :param method: Name of the correction saved as the corrected p-value
+    :return: The statistics with corrected p-values and the name of the saved correction
+    """
+    test_data["correction"] = method
+
+    if test_data.get(Experiment.SPACES):
+        correct_experiment(test_data[Experiment.SPACES], Features.as_list(), method)
+
+    if test_data.get(Experiment.COOCCURRENCE):
+        correct_experiment(test_data[Experiment.COOCCURRENCE],
+                           [f"{first}+{second}" for first, second in Cooccurrence.pairs()],
+                           method)
+
+    return test_data
+
+
+def correct_experiment(statistics: Dict[str, Any], keys: List[str], method: str) -> None:
+    """
+    Adds the p-values of all corrections to the statistic tests of one experiment.
+
+    :param statistics: The statistics of the experiment by key and metric
+    :param keys: The features or pairs of features the statistics are keyed by
+    :param method: Name of the correction saved as the corrected p-value
+    """
+    metrics = Metric.as_list()
+
+    for test in Tests.significance_tests():
+        p_values = np.array([[statistics[key][metric].get(test, {}).get("p_value", np.nan)
+                              for metric in metrics] for key in keys], dtype=np.float64)
+
+        corrected = {name: correct(p_values, name) for name in CORRECTIONS}
 
-    n = num_features * num_metrics
+        for i, key in enumerate(keys):
+            for j, metric in enumerate(metrics):
+                statistic_test = statistics[key][metric].get(test)
+                if not statistic_test:
+                    continue
 
-    for feature in Features.as_list():
-        for metric in Metric.as_list():
-            statistic_test = test_data["spaces"][feature][metric]["mann_whitney_u"]
-            new_p_value = statistic_test["p_value"] * n
-            statistic_test["corrected_p_value"] = new_p_value if new_p_value < 1.0 else 1.0
+                for name, corrected_p_values in corrected.items():
+                    statistic_test[f"{name}_p_value"] = float(corrected_p_values[i, j])
+                statistic_test["corrected_p_value"] = statistic_test[f"{method}_p_value"]
 
-    save_json_file(test_data, get_analyzer_res_path(), "corrected_statistic_tests.json")
 
+if __name__ == "__main__":
+    parser = ArgumentParser(description='Correction')
+    parser.add_argument('-m', '--method', type=str, default="bonferroni",
+                        choices=list(CORRECTIONS.keys()),
+                        help='Correction saved as the corrected p-value')
 
-bonferroni_correction()
+    correct_p_values(parser.parse_args().method)
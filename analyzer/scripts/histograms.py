@@ -1,56 +1,129 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-
 import os
+import multiprocessing
+from argparse import ArgumentParser
 from os.path import join
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from analyzer.src.utils import get_analyzer_res_path, load_json_file
 from analyzer.src.metrics import Metric
 from analyzer.src.features import Features
 
 
-def generate_histograms() -> None:
-    """Generate histograms from the raw values."""
-    features = Features.as_list()
-    metrics = Metric.as_list()
+BINS = 100
+QUANTILES = (.05, .95)
+
+# Histogram to render: output file, title, bin counts and bin edges
+Histogram = Tuple[str, str, np.ndarray, np.ndarray]
+
+# Figure which is reused by all histograms rendered in a process
+_figure: Optional[Any] = None
+
+
+def compute_histogram(values: List[float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the bin counts of the values between the 5% and 95% quantiles.
+
+    :param values: The raw values
+    :return: Bin counts and bin edges
+    """
+    array = np.asarray(values, dtype=np.float64)
+
+    if len(array):
+        lower, upper = np.quantile(array, QUANTILES)
+        array = array[(array >= lower) & (array <= upper)]
 
-    results = load_json_file(get_analyzer_res_path(), "results_with_raw_values.json")
+    return np.histogram(array, bins=BINS)
+
+
+def compute_histograms(results: Optional[Dict[str, Any]] = None) -> Optional[List[Histogram]]:
+    """
+    Computes all histograms from the raw values.
+
+    :param results: The raw results, loaded from the results file if not given
+    :return: List of the histograms to render if the results exist
+    """
+    if results is None:
+        results = load_json_file(get_analyzer_res_path(), "results_with_raw_values.json")
     if not results:
-        print("Make sure to run the analyzer first.")
-        return
+        return None
 
     spaces = results["spaces"]
+    histograms: List[Histogram] = list()
 
-    for feature in features:
-        metrics_feature = spaces[feature]
-        metrics_no_feature = spaces["no_" + feature]
+    for feature in Features.as_list():
+        for metric in Metric.as_list():
+            path = join(get_analyzer_res_path(), "histograms", feature, metric)
+            os.makedirs(path, exist_ok=True)
 
-        for metric in metrics:
-            no_series = pd.Series(metrics_no_feature[metric]["values"])
-            filtered_no_series = no_series[no_series.between(
-                no_series.quantile(.05), no_series.quantile(.95))]
+            for name in [feature, "no_" + feature]:
+                counts, edges = compute_histogram(spaces[name][metric]["values"])
+                histograms.append((join(path, f"{name}_{metric}.png"), name, counts, edges))
 
-            df_no = pd.DataFrame({
-                "no_" + feature: filtered_no_series,
-            })
+    return histograms
 
-            series = pd.Series(metrics_feature[metric]["values"])
-            filtered_series = series[series.between(
-                series.quantile(.05), series.quantile(.95))]
 
-            df = pd.DataFrame({
-                feature: filtered_series
-            })
+def init_renderer() -> Any:
+    """
+    Initializes a rendering process with a headless backend and a reusable figure.
 
-            path = join(get_analyzer_res_path(), "histograms", feature, metric)
+    :return: The figure of the process
+    """
+    global _figure
 
-            os.makedirs(path, exist_ok=True)
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    _figure = plt.figure()
+    return _figure
+
+
+def render_histogram(histogram: Histogram) -> None:
+    """
+    Renders a histogram into a file, reusing the figure of the process.
+
+    :param histogram: The histogram to render
+    """
+    figure = _figure if _figure is not None else init_renderer()
+
+    path, title, counts, edges = histogram
+
+    figure.clf()
+    axes = figure.add_subplot()
+    axes.hist(edges[:-1], bins=edges, weights=counts)
+    axes.set_title(title)
+    axes.grid(True)
+
+    figure.savefig(path)
+
+
+def generate_histograms(jobs: int, results: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Generate histograms from the raw values.
+
+    :param jobs: Number of processes rendering the histograms
+    :param results: The raw results, loaded from the results file if not given
+    """
+    histograms = compute_histograms(results)
+    if histograms is None:
+        print("Make sure to run the analyzer first.")
+        return
+
+    if jobs <= 1:
+        for histogram in histograms:
+            render_histogram(histogram)
+        return
 
-            df.hist(bins=100)
-            plt.savefig(f'{path}/{feature}_{metric}.png')
+    with multiprocessing.Pool(processes=jobs, initializer=init_renderer) as pool:
+        for _ in pool.imap_unordered(render_histogram, histograms, chunksize=4):
+            pass
 
-            df_no.hist(bins=100)
-            plt.savefig(f'{path}/no_{feature}_{metric}.png')
 
+if __name__ == "__main__":
+    parser = ArgumentParser(description='Histograms')
+    parser.add_argument('-j', '--jobs', type=int, default=multiprocessing.cpu_count(),
+                        help='Number of processes rendering the histograms')
 
-generate_histograms()
+    generate_histograms(parser.parse_args().jobs)
@@ -0,0 +1,62 @@
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from analyzer.src.utils import get_root_path
+
+
+# Startup budgets in milliseconds for the cumulative import time of the given module
+BUDGETS: Dict[str, Tuple[List[str], str, float]] = {
+    "help": (["-m", "analyzer", "--help"], "analyzer.main", 100.),
+    "worker": (["-c", "import analyzer.src.analyzer"], "analyzer.src.analyzer", 400.)
+}
+
+REPEATS = 5
+
+
+def measure_import_time(args: List[str], module: str) -> Optional[float]:
+    """
+    Measures the cumulative import time of a module with `-X importtime`.
+
+    :param args: Arguments passed to the Python interpreter
+    :param module: Name of the module to measure
+    :return: The cumulative import time in milliseconds if the module was imported
+    """
+    process = subprocess.run([sys.executable, "-X", "importtime", *args],
+                             cwd=get_root_path(), capture_output=True, text=True)
+
+    pattern = re.compile(rf"import time:\s+\d+ \|\s+(\d+) \| {re.escape(module)}$")
+    for line in process.stderr.splitlines():
+        match = pattern.match(line)
+        if match:
+            return int(match.group(1)) / 1000.
+
+    return None
+
+
+def check_import_times() -> None:
+    """Checks the startup of the CLI and the pool workers against the import time budgets."""
+    exceeded = False
+
+    for name, (args, module, budget) in BUDGETS.items():
+        times = [measure_import_time(args, module) for _ in range(REPEATS)]
+        measured = [time for time in times if time is not None]
+
+        if not measured:
+            print(f"{name}: {module} was not imported")
+            exceeded = True
+            continue
+
+        best = min(measured)
+        status = "ok" if best <= budget else "exceeded"
+        exceeded = exceeded or best > budget
+
+        print(f"{name}: {module} imports in {best:.1f} ms (budget {budget:.0f} ms, {status})")
+
+    if exceeded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    check_import_times()
@@ -1,18 +1,75 @@
-from typing import Any, Dict
+from argparse import ArgumentParser
+from typing import Any, Dict, List, Optional, Tuple
 from os.path import join
 import os
 
 from analyzer.src.statistics import Tests
+from analyzer.src.cooccurrence import Cooccurrence
 from analyzer.src.experiments import Experiment
 from analyzer.src.utils import get_analyzer_res_path, load_json_file, to_camel_case
 from analyzer.src.features import Features
 from analyzer.src.metrics import Metric
-from analyzer.scripts.correction import bonferroni_correction
+from analyzer.scripts.correction import CORRECTIONS, CORRECTION_TITLES, correct_p_values
 
 
-def generate_tables() -> None:
-    """Generates LaTeX tables from the results."""
-    statistics = load_json_file(get_analyzer_res_path(), name="corrected_statistic_tests.json")
+# Title of each test and of the column containing its effect size
+TITLES = {
+    str(Tests.MANN_WHITNEY_U): ("Mann-Whitney U", "Proportion"),
+    str(Tests.KOLMOGOROV_SMIRNOV): ("Kolmogorov-Smirnov", "Distance"),
+    str(Tests.CLIFFS_DELTA): ("Cliff's delta", "Cliff's delta"),
+    str(Tests.VARGHA_DELANEY_A12): ("Vargha-Delaney A12", "A12")
+}
+
+# Upper bounds of the absolute effect sizes for a negligible, small and medium effect
+THRESHOLDS = {
+    str(Tests.CLIFFS_DELTA): (0.147, 0.33, 0.474),
+    str(Tests.VARGHA_DELANEY_A12): (0.06, 0.14, 0.21)
+}
+
+# Title of the first column and the compared code spaces of the experiments with pairs of features
+COMPARISONS = {
+    str(Experiment.COOCCURRENCE): ("Features", "code spaces with both features of each pair and "
+                                               "with only one of them")
+}
+
+# Title of the first column and the compared code spaces of the experiments with single features
+FEATURE_COMPARISON = ("Feature", "code spaces with each feature and without")
+
+
+def table_rows(experiment: str) -> List[Tuple[str, str]]:
+    """
+    Returns the rows of the tables of an experiment.
+
+    :param experiment: Experiment name
+    :return: List of the keys of the statistics and the titles of the rows, which are the pairs
+             of features for the co-occurrence and the features for the other experiments
+    """
+    if experiment == Experiment.COOCCURRENCE:
+        return [(f"{first}+{second}", f"{to_camel_case(first)} + {to_camel_case(second)}")
+                for first, second in Cooccurrence.pairs()]
+    return [(feature, to_camel_case(feature)) for feature in Features.as_list()]
+
+
+def table_label(experiment: str, name: str) -> str:
+    """
+    Returns the label of a table of an experiment.
+
+    :param experiment: Experiment name
+    :param name: Name of the table
+    :return: The name of the table, prefixed with the experiment unless it compares the spaces
+    """
+    return name if experiment == Experiment.SPACES else f"{experiment}_{name}"
+
+
+def generate_tables(statistics: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Generates LaTeX tables from the results.
+
+    :param statistics: The corrected statistics, loaded from the results if not given
+    """
+    if statistics is None:
+        statistics = load_json_file(get_analyzer_res_path(),
+                                    name="corrected_statistic_tests.json")
     if not statistics:
         return
 
@@ -21,7 +78,14 @@ def generate_tables() -> None:
             continue
 
         for test in Tests.as_list():
-            generate_table(statistics, experiment, test,)
+            if not any(test in statistics[experiment][key][metric]
+                       for key, _ in table_rows(experiment) for metric in Metric.as_list()):
+                continue
+
+            if test in Tests.significance_tests():
+                generate_table(statistics, experiment, test)
+            else:
+                generate_effect_size_table(statistics, experiment, test)
 
 
 def generate_table(statistics: Dict[str, Any], experiment: str, test: str) -> None:
@@ -35,15 +99,18 @@ def generate_table(statistics: Dict[str, Any], experiment: str, test: str) -> No
     path = join(get_analyzer_res_path(), "tables")
     os.makedirs(path, exist_ok=True)
 
+    correction = CORRECTION_TITLES[statistics.get("correction", "bonferroni")]
+    column, compared = COMPARISONS.get(experiment, FEATURE_COMPARISON)
+
     with open(join(path, f"tables_{experiment}_{test}.txt"), "w+", encoding="utf-8") as tables:
         for metric in Metric.as_list():
             rows = list()
-            for feature in Features.as_list():
-                test_results = statistics[experiment][feature][metric].get(test)
+            for key, title in table_rows(experiment):
+                test_results = statistics[experiment][key][metric].get(test)
                 if not test_results:
                     continue
 
-                proportion = round(test_results["proportion"], 3)
+                proportion = round(test_results.get("proportion", test_results["statistic"]), 3)
 
                 p_value = test_results["corrected_p_value"]
                 rejected = "Rejected" if p_value < 0.05 else "Not rejected"
@@ -66,31 +133,102 @@ def generate_table(statistics: Dict[str, Any], experiment: str, test: str) -> No
                     p_value = round(p_value, 3)
 
                 escaped_metric = metric.replace("_", "\_")
-                camel_case_feature = to_camel_case(feature)
 
                 rows.append(
-                    f"{camel_case_feature} & ${p_value}$ & ${proportion}$ & {rejected} & ${significance}$ \\\\")
+                    f"{title} & ${p_value}$ & ${proportion}$ & {rejected} & ${significance}$ \\\\")
 
             tables.write("""
 \\begin{{table}}[htb]
 \\begin{{center}}
 \\begin{{tabular}}{{ l c c c c }}
 \\toprule
-\\textbf{{Feature}} & \\textbf{{p-value}} & \\textbf{{Proportion}} & \\textbf{{Decision}} & \\textbf{{Significance}} \\\\ 
+\\textbf{{{7}}} & \\textbf{{p-value}} & \\textbf{{{4}}} & \\textbf{{Decision}} & \\textbf{{Significance}} \\\\ 
 \\midrule
 {0}
 \\bottomrule
 \\end{{tabular}}
-\\caption[Mann-Whitney U test results for the metric "{1}"]{{Results for the "{1}" metric obtained by applying the Mann-Whitney U test with Bonferroni correction. Null hypothesis: No significant difference in {1} between code spaces with each feature and without. (Significance codes: 0 "***" 0.001 "**" 0.01 "*" 0.05 "." 0.1 "–" 1)}}
-\\label{{tab:comparison_table_{2}}}
+\\caption[{3} test results for the metric "{1}"]{{Results for the "{1}" metric obtained by applying the {3} test with {6} correction. Null hypothesis: No significant difference in {1} between {8}. (Significance codes: 0 "***" 0.001 "**" 0.01 "*" 0.05 "." 0.1 "–" 1)}}
+\\label{{tab:{5}_{2}}}
 \\end{{center}}
 \\end{{table}}
 """.format(
                 "\n".join(rows),
                 escaped_metric,
-                metric
+                metric,
+                TITLES[test][0],
+                TITLES[test][1],
+                table_label(experiment, "comparison_table" if test == Tests.MANN_WHITNEY_U
+                            else f"{test}_table"),
+                correction,
+                column,
+                compared
+            ))
+
+
+def generate_effect_size_table(statistics: Dict[str, Any], experiment: str, test: str) -> None:
+    """
+    Generate a table file for an effect size without a p-value.
+
+    :param statistics: The content of the staticstics file
+    :param experiment: Experiment name
+    :param test: Name of the effect size
+    """
+    path = join(get_analyzer_res_path(), "tables")
+    os.makedirs(path, exist_ok=True)
+
+    # A12 measures the effect as the distance from one half
+    center = 0.5 if test == Tests.VARGHA_DELANEY_A12 else 0.
+    column, compared = COMPARISONS.get(experiment, FEATURE_COMPARISON)
+
+    with open(join(path, f"tables_{experiment}_{test}.txt"), "w+", encoding="utf-8") as tables:
+        for metric in Metric.as_list():
+            rows = list()
+            for key, title in table_rows(experiment):
+                test_results = statistics[experiment][key][metric].get(test)
+                if not test_results or test_results["statistic"] is None:
+                    continue
+
+                effect_size = test_results["statistic"]
+                magnitude = "Large"
+                for bound, name in zip(THRESHOLDS[test], ["Negligible", "Small", "Medium"]):
+                    if abs(effect_size - center) < bound:
+                        magnitude = name
+                        break
+
+                rows.append(f"{title} & ${round(effect_size, 3)}$ & "
+                            f"{magnitude} \\\\")
+
+            tables.write("""
+\\begin{{table}}[htb]
+\\begin{{center}}
+\\begin{{tabular}}{{ l c c }}
+\\toprule
+\\textbf{{{6}}} & \\textbf{{{3}}} & \\textbf{{Magnitude}} \\\\
+\\midrule
+{0}
+\\bottomrule
+\\end{{tabular}}
+\\caption[{2} for the metric "{1}"]{{{2} for the "{1}" metric between {7}.}}
+\\label{{tab:{4}_table_{5}}}
+\\end{{center}}
+\\end{{table}}
+""".format(
+                "\n".join(rows),
+                metric.replace("_", "\\_"),
+                TITLES[test][0],
+                TITLES[test][1],
+                table_label(experiment, test),
+                metric,
+                column,
+                compared
             ))
 
 
-bonferroni_correction()
-generate_tables()
+if __name__ == "__main__":
+    parser = ArgumentParser(description='Tables')
+    parser.add_argument('-m', '--method', type=str, default="bonferroni",
+                        choices=list(CORRECTIONS.keys()),
+                        help='Correction of the p-values in the tables')
+
+    correct_p_values(parser.parse_args().method)
+    generate_tables()
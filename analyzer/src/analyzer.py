@@ -1,16 +1,33 @@
 from genericpath import isdir
 import multiprocessing
+import os
+from multiprocessing import resource_tracker
 from os import listdir
 from os.path import isfile, join
-from typing import Any, Dict, List
+from time import perf_counter
+from typing import Any, Dict, List, MutableMapping, Optional, Tuple, Union
 
-from analyzer.src.statistics import Statistics
-from analyzer.src.utils import get_analyzer_res_path, get_collector_res_path, load_json_file, remove_keys, save_json_file
+import numpy as np
+
+from analyzer.src.utils import get_analyzer_res_path, get_collector_res_path, remove_keys, save_json_file
 from analyzer.src.metrics import Metrics
 from analyzer.src.features import Features
 from analyzer.src.experiments import Experiment, Experiments
-
-from tqdm import tqdm
+from analyzer.src.transport import ColumnStore, SharedColumns
+from analyzer.src.dedup import Deduplication, Deduplicator
+from analyzer.src.checkpoint import Checkpoint
+from analyzer.src.sampling import Reservoir, Sampler
+from analyzer.src.bootstrap import Bootstrap
+from analyzer.src.tree import SpaceTree
+from analyzer.src.lints import Lints
+from analyzer.src.nodes import Nodes
+from analyzer.src.cooccurrence import Cooccurrence
+from analyzer.src.scheduler import Scheduler
+from analyzer.src.memory import AdaptivePool
+from analyzer.src.documents import Documents
+from analyzer.src.incremental import IncrementalStatistics
+from analyzer.src.rollup import RepoCube
+from analyzer.src.telemetry import Telemetry, Timer, new_counters
 
 
 class Analyzer:
@@ -25,21 +42,36 @@ class Analyzer:
         :param skip_repos: Number of repositories to skip
         :return: Dict mapping repository paths to result files
         """
-        owners: List[str] = listdir(get_collector_res_path())
-        repos: Dict[str, List[str]] = dict()
+        return {path: list(files)
+                for path, files in Analyzer.get_repo_sizes(repo_count, skip_repos).items()}
+
+    @staticmethod
+    def get_repo_sizes(repo_count: int, skip_repos: int) -> Dict[str, Dict[str, int]]:
+        """
+        Returns a dict mapping the repository paths to the size of each result file. The sizes are
+        read from the directory entries, so only the selected repositories are scanned.
 
-        for owner in owners:
+        :param repo_count: Number of repositories to get
+        :param skip_repos: Number of repositories to skip
+        :return: Dict mapping repository paths to dicts mapping result files to their size
+        """
+        repo_paths: List[str] = list()
+
+        for owner in listdir(get_collector_res_path()):
             owner_path = get_collector_res_path(owner=owner)
             if isdir(owner_path):
-                owned_repos: List[str] = listdir(owner_path)
-
-                for owned_repo in owned_repos:
+                for owned_repo in listdir(owner_path):
                     repo_path: str = get_collector_res_path(owner=owner, repo=owned_repo)
                     if isdir(repo_path):
-                        repos[repo_path] = [f for f in listdir(
-                            repo_path) if isfile(join(repo_path, f))]
+                        repo_paths.append(repo_path)
 
-        return {k: repos[k] for k in list(repos)[skip_repos:repo_count + skip_repos]}
+        repos: Dict[str, Dict[str, int]] = dict()
+        for repo_path in repo_paths[skip_repos:repo_count + skip_repos]:
+            with os.scandir(repo_path) as entries:
+                repos[repo_path] = {entry.name: entry.stat().st_size
+                                    for entry in entries if entry.is_file()}
+
+        return repos
 
     @staticmethod
     def analyze(
@@ -47,7 +79,27 @@ class Analyzer:
         skip_repos: int,
         analyze_repos: bool,
         statistic_tests: bool,
-        experiment_names: List[str]
+        experiment_names: List[str],
+        deduplication: str = str(Deduplication.OFF),
+        checkpoint_interval: float = 0,
+        resume: bool = False,
+        sampler: Optional[Sampler] = None,
+        bootstrap_resamples: int = 0,
+        report: bool = False,
+        jobs: int = 1,
+        export_db: bool = False,
+        watch: bool = False,
+        watch_debounce: float = 60.,
+        watch_idle: float = 0.,
+        stream_path: Optional[str] = None,
+        effect_size_resamples: int = 0,
+        telemetry_interval: float = 0,
+        chunk_size: int = 0,
+        max_memory: int = 0,
+        incremental: bool = False,
+        out_of_core_budget: int = 0,
+        test_cache_size: int = 0,
+        correction: str = "bonferroni"
     ) -> None:
         """
         Analyzes a given number of repositories.
@@ -55,100 +107,466 @@ class Analyzer:
         :param repo_count: Number of repositories to analyze
         :param skip_repos: Number of repositories to skip
         :param experiments: The experiments to run on the data
+        :param deduplication: How to treat result files occurring in several repositories
+        :param checkpoint_interval: Minimum number of seconds between two checkpoints
+        :param resume: Whether to continue from the last checkpoint
+        :param sampler: Sampler for a fast approximate analysis
+        :param bootstrap_resamples: Number of resamples for the error bars of sampled results
+        :param report: Whether to generate the report from the results
+        :param jobs: Number of processes rendering the histograms of the report
+        :param export_db: Whether to export the individual spaces and nodes into a database
+        :param watch: Whether to analyze the collector results while they are written
+        :param watch_debounce: Minimum number of seconds between two summaries while watching
+        :param watch_idle: Seconds without changes after which watching stops (0 never stops)
+        :param stream_path: JSON Lines file or `-` for stdin to analyze instead of the result folder
+        :param effect_size_resamples: Number of resamples for the confidence intervals of the
+                                      proportion and the median difference
+        :param telemetry_interval: Minimum number of seconds between two telemetry exports
+        :param chunk_size: Maximum number of bytes of result files analyzed in one task
+        :param max_memory: Memory budget of the analysis in bytes (0 does not limit the memory)
+        :param incremental: Whether to only add new repositories to the incremental ranks and to
+                            refresh the tests of the discrete metrics from them
+        :param out_of_core_budget: Memory budget in bytes of the statistic tests, which are run on
+                                   the columnar store sorted on disk (0 runs them in memory)
+        :param test_cache_size: Maximum size in bytes of the cache of the statistic test results,
+                                which are only rerun if their inputs changed (0 disables it)
+        :param correction: Name of the correction of the p-values saved by the report
         """
-        if analyze_repos:
-            Analyzer.analyze_repos(repo_count, skip_repos, experiment_names)
+        if watch:
+            from analyzer.src.watch import Watcher
+            Watcher(experiment_names, debounce=watch_debounce, idle_timeout=watch_idle).watch()
 
-        if statistic_tests:
-            Statistics.analyze_results()
+        if stream_path:
+            from analyzer.src.stream import Stream
+            Stream.ingest(stream_path, experiment_names, deduplication, checkpoint_interval, resume)
+
+        if analyze_repos:
+            Analyzer.analyze_repos(repo_count, skip_repos, experiment_names, deduplication,
+                                   checkpoint_interval, resume, sampler, bootstrap_resamples,
+                                   telemetry_interval, chunk_size, max_memory, incremental)
+
+        if statistic_tests and incremental:
+            from analyzer.src.statistics import Statistics
+            Statistics.refresh_incremental()
+        elif statistic_tests and out_of_core_budget > 0:
+            from analyzer.src.statistics import Statistics
+            Statistics.analyze_out_of_core(out_of_core_budget)
+        elif statistic_tests:
+            from analyzer.src.statistics import Statistics
+            Statistics.analyze_results(sampler, bootstrap_resamples, effect_size_resamples,
+                                       test_cache_size)
+
+        if export_db:
+            from analyzer.src.database import Database
+            Database().export(Analyzer.get_repos(repo_count, skip_repos))
+
+        if report:
+            from analyzer.src.report import Report
+            Report.run(jobs, correction)
 
     @staticmethod
-    def analyze_repos(repo_count: int, skip_repos: int, experiment_names: List[str]) -> None:
+    def analyze_repos(
+        repo_count: int,
+        skip_repos: int,
+        experiment_names: List[str],
+        deduplication: str = str(Deduplication.OFF),
+        checkpoint_interval: float = 0,
+        resume: bool = False,
+        sampler: Optional[Sampler] = None,
+        bootstrap_resamples: int = 0,
+        telemetry_interval: float = 0,
+        chunk_size: int = 0,
+        max_memory: int = 0,
+        incremental: bool = False
+    ) -> None:
         """
         Collects the raw data for each experiment on the dataset.
 
         :param repo_count: Number of repositories to collect data of
         :param skip_repos: Number of repositories to skip
+        :param deduplication: How to treat result files occurring in several repositories
+        :param checkpoint_interval: Minimum number of seconds between two checkpoints
+        :param resume: Whether to continue from the last checkpoint
+        :param sampler: Sampler for a fast approximate analysis
+        :param bootstrap_resamples: Number of resamples for the error bars of sampled results
+        :param telemetry_interval: Minimum number of seconds between two telemetry exports
+        :param chunk_size: Maximum number of bytes of result files analyzed in one task, larger
+                           repositories are split into chunks (0 sizes the chunks automatically,
+                           a negative size does not split repositories)
+        :param max_memory: Memory budget of the parent and the workers in bytes, tasks are held
+                           back when it is approached (0 does not limit the memory)
+        :param incremental: Whether to only analyze the repositories which are not part of the
+                            incremental ranks yet, add their values to the ranks and merge them
+                            with the results of the last analysis
         """
-        init_experiments = Experiments.initialized(experiment_names)
+        from tqdm import tqdm
+
+        sampler = sampler or Sampler()
         result_experiments = Experiments.initialized(experiment_names)
 
-        repos: Dict[str, List[str]] = Analyzer.get_repos(repo_count, skip_repos)
+        # With a reservoir, the merged state is kept by the reservoir until the end of the run
+        reservoir = Reservoir(sampler.reservoir_size) if sampler.reservoir_size > 0 else None
+        accumulator: Union[Reservoir, Experiments] = reservoir or result_experiments
 
-        processes = 2 * multiprocessing.cpu_count() + 1
-        pool = multiprocessing.Pool(processes=processes)
+        sizes = Analyzer.get_repo_sizes(repo_count, skip_repos)
+
+        ranks: Optional[IncrementalStatistics] = None
+        if incremental and (sampler.active() or Experiment.SPACES not in experiment_names):
+            print("Incremental ranks need the spaces experiment without sampling, ignoring them.")
+        elif incremental:
+            ranks = IncrementalStatistics.load()
+            sizes = {path: files for path, files in sizes.items() if path not in ranks.repos}
+            print(f"Analyzing {len(sizes)} repositories which are new to the incremental ranks")
 
-        with tqdm(total=repo_count) as t:
-            for path, files in repos.items():
-                repo_result = pool.apply_async(
-                    Analyzer.analyze_repo, args=(init_experiments, path, files))
+            # The ranks are only saved after a complete run, so a checkpoint would not match them
+            resume = False
 
-                result_experiments.merge(repo_result.get())
-                t.update()
+        # Sampled files are left out before they are read, which is where a run spends its time
+        sizes = {path: sampler.sample_files(path, files) for path, files in sizes.items()}
+        repos: Dict[str, List[str]] = {path: list(files) for path, files in sizes.items()}
+
+        # Workers share the tracker of the parent, which releases the shared memory segments
+        resource_tracker.ensure_running()
+
+        processes = 2 * multiprocessing.cpu_count() + 1
+        pool = AdaptivePool(processes, max_memory)
+
+        # Values are capped and prioritized per repository, so these repositories are not split
+        if chunk_size < 0 or sampler.repo_cap > 0 or sampler.reservoir_size > 0:
+            chunk_size = 0
+        elif chunk_size == 0:
+            chunk_size = Scheduler.chunk_size(sizes, processes)
+
+        checkpoint = Checkpoint({
+            "repo_count": repo_count,
+            "skip_repos": skip_repos,
+            "experiment_names": experiment_names,
+            "deduplication": str(deduplication),
+            "sampling": sampler.settings(),
+            "chunk_size": chunk_size
+        }, checkpoint_interval)
+
+        cube = RepoCube(sampler.settings() if sampler.active() else None)
+
+        if resume:
+            columns = checkpoint.load()
+            if columns:
+                accumulator.merge_columns(columns)
+            if columns and checkpoint.cube:
+                cube.merge(RepoCube.from_columns(checkpoint.cube))
+
+        if ranks and ranks.repos:
+            previous = ColumnStore.load(get_analyzer_res_path(), "results_columns")
+            if previous:
+                # Copied, since the columnar store is overwritten at the end of the run
+                accumulator.merge_columns({key: np.array(column)
+                                           for key, column in previous.items()})
+
+            previous_cube = RepoCube.load()
+            if previous_cube:
+                cube.merge(previous_cube)
+                # Combined before the cube file is overwritten at the end of the run
+                cube.cells()
+
+        # First copies of the fingerprinted files and the copies skipped by each task
+        owners: Dict[str, Tuple[str, str]] = dict(checkpoint.state.get("owners", dict()))
+        replays: List[Tuple[str, str]] = list(checkpoint.state.get("replays", list()))
+
+        manager = multiprocessing.Manager() if deduplication != Deduplication.OFF else None
+        registry = manager.dict(owners) if manager else None
+
+        scheduled = Scheduler.schedule(repos, sizes, chunk_size)
+        tasks = checkpoint.filter([
+            (experiment_names, path, files, sampler, registry, key)
+            for key, path, files, _ in scheduled
+        ])
+        paths = {key: path for key, path, _, _ in scheduled}
+        positions = Scheduler.positions(repos, scheduled)
+
+        telemetry = Telemetry(processes, len(tasks), telemetry_interval)
+
+        def merge(key: str, columns: Dict[str, np.ndarray]) -> None:
+            if ranks:
+                ranks.insert_columns(columns)
+            if reservoir:
+                reservoir.merge_columns(columns)
+            else:
+                result_experiments.merge_columns(columns, positions[key])
+            cube.add(paths[key], columns)
+
+        def save_checkpoint() -> None:
+            checkpoint.save(accumulator.as_columns(), cube.as_columns(),
+                            {"owners": owners, "replays": replays})
+
+        try:
+            with tqdm(total=len(scheduled), initial=len(scheduled) - len(tasks)) as t:
+                for key, descriptor, counters, claimed, duplicates in pool.imap_unordered(
+                        Analyzer.analyze_repo_shared, tasks):
+                    start = perf_counter()
+                    merge(key, SharedColumns.receive(descriptor))
+                    owners.update((fingerprint, (paths[key], name))
+                                  for fingerprint, name in claimed)
+                    replays.extend((key, fingerprint) for fingerprint in duplicates)
+                    checkpoint.complete(key)
+                    telemetry.record(counters, perf_counter() - start)
+                    telemetry.record_memory(pool.memory, pool.limit, pool.throttled)
+                    t.update()
+
+                    if telemetry.due():
+                        telemetry.export(t.write)
+
+                    if checkpoint.due():
+                        save_checkpoint()
+
+            if deduplication == Deduplication.REPLAY and replays:
+                # The first copy of each replayed file is analyzed once more and its result is
+                # merged for every copy, within the repository and at the position of the copy
+                replayed = sorted({fingerprint for _, fingerprint in replays})
+                results = dict((fingerprint, SharedColumns.receive(descriptor))
+                               for fingerprint, descriptor, _, _, _ in pool.imap_unordered(
+                                   Analyzer.analyze_repo_shared,
+                                   [(experiment_names, owners[fingerprint][0],
+                                     [owners[fingerprint][1]], Sampler(), None, fingerprint)
+                                    for fingerprint in replayed]))
+
+                for key, fingerprint in replays:
+                    merge(key, sampler.sample_repo(results[fingerprint], paths[key]))
+        except BaseException:
+            pool.terminate()
+            if manager:
+                manager.shutdown()
+            if checkpoint_interval > 0:
+                print("Saving checkpoint before exiting, continue the run with --resume.")
+                save_checkpoint()
+            raise
 
         pool.close()
         pool.join()
 
+        if manager:
+            manager.shutdown()
+            handling = "replayed" if deduplication == Deduplication.REPLAY else "skipped"
+            print(f"Found {len(replays)} duplicate result files, which were {handling}")
+
+        if telemetry_interval > 0:
+            telemetry.export()
+
+        if max_memory > 0:
+            print(f"Throttled {pool.throttled} times to stay below the memory limit")
+
+        if ranks:
+            ranks.repos.update(sizes)
+            ranks.save()
+
+        if reservoir:
+            result_experiments.merge_columns(reservoir.as_columns(with_priorities=False))
+
         result = result_experiments.as_dict()
-        save_json_file(result, get_analyzer_res_path(), name="results_with_raw_values.json")
+
+        if sampler.active():
+            result["sampling"] = sampler.settings()
+
+            if bootstrap_resamples > 0:
+                Analyzer.add_average_intervals(result, result_experiments, sampler,
+                                               bootstrap_resamples)
+
+        Analyzer.save_results(result, result_experiments)
+        cube.save()
+        Checkpoint.remove()
+
+    @staticmethod
+    def save_results(
+        result: Dict[str, Any],
+        experiments: Experiments,
+        summary_only: bool = False
+    ) -> None:
+        """
+        Saves the results with and without raw values and as columns.
+
+        :param result: Dict representation of the experiments
+        :param experiments: The experiments
+        :param summary_only: Whether to only save the results without raw values
+        """
+        if not summary_only:
+            save_json_file(result, get_analyzer_res_path(), name="results_with_raw_values.json")
 
         filtered_result = remove_keys(result, "values")
         save_json_file(filtered_result, get_analyzer_res_path(),
                        name="results_without_raw_values.json")
 
+        if not summary_only:
+            ColumnStore.save(experiments.as_columns(), get_analyzer_res_path(),
+                             name="results_columns")
+
+    @staticmethod
+    def add_average_intervals(
+        result: Dict[str, Any],
+        experiments: Experiments,
+        sampler: Sampler,
+        resamples: int
+    ) -> None:
+        """
+        Adds bootstrap confidence intervals of the averages to sampled results.
+
+        :param result: Dict representation of the experiments
+        :param experiments: The sampled experiments
+        :param sampler: The sampler used for the analysis
+        :param resamples: Number of bootstrap resamples
+        """
+        for experiment, mapping in experiments.experiments.items():
+            for feature, metrics in mapping.mapping.items():
+                for metric, values in metrics.items():
+                    generator = sampler.generator("bootstrap", experiment, feature, metric)
+                    result[experiment][feature][metric]["average_interval"] = \
+                        Bootstrap.mean_interval(values.array(), resamples, generator)
+
+    @staticmethod
+    def analyze_repo_shared(
+        task: Tuple[List[str], str, List[str], Sampler,
+                    Optional[MutableMapping[str, Tuple[str, str]]], str]
+    ) -> Tuple[str, Dict[str, Any], Dict[str, float], List[Tuple[str, str]], List[str]]:
+        """
+        Analyzes a repository or a chunk of its files in a worker and writes the results into
+        shared memory.
+
+        :param task: Tuple of the experiment names, the repository path, the result files to
+                     analyze, the sampler, the registry of the fingerprints of the analyzed files
+                     if duplicates are skipped and the key of the task
+        :return: The key of the task, the descriptor of the shared memory segment containing
+                 the result columns, the telemetry counters of the worker, the fingerprints and
+                 names of the files claimed by the task and the fingerprints of the skipped copies
+        """
+        experiment_names, path, files, sampler, registry, key = task
+        counters = new_counters()
+        deduplicator = Deduplicator(registry) if registry is not None else None
+
+        with Timer(counters, "busy_seconds"):
+            experiments = Analyzer.analyze_repo(
+                Experiments.initialized(experiment_names), path, files, counters, deduplicator)
+
+            with Timer(counters, "share_seconds"):
+                descriptor = SharedColumns.share(
+                    sampler.sample_repo(experiments.as_columns(), path))
+
+        counters["worker"] = os.getpid()
+        if deduplicator is None:
+            return key, descriptor, counters, list(), list()
+        return key, descriptor, counters, deduplicator.claimed, deduplicator.duplicates
+
     @staticmethod
-    def analyze_repo(experiments: Experiments, path: str, files: List[str]) -> Experiments:
+    def analyze_repo(
+        experiments: Experiments,
+        path: str,
+        files: List[str],
+        counters: Optional[Dict[str, float]] = None,
+        deduplicator: Optional[Deduplicator] = None
+    ) -> Experiments:
         """
         Analyzes a repository.
 
         :param experiments: The experiments to add the results to
         :param path: The path of the repository
         :param files: The list of result files in the repository
+        :param counters: Telemetry counters to add the work on the files to
+        :param deduplicator: Deduplicator skipping the files which were already claimed
         """
         for file in files:
-            Analyzer.analyze_file(experiments, path, file)
+            Analyzer.analyze_file(experiments, path, file, counters, deduplicator)
 
         return experiments
 
     @staticmethod
-    def analyze_file(experiments: Experiments, path: str, name: str) -> None:
+    def analyze_file(
+        experiments: Experiments,
+        path: str,
+        name: str,
+        counters: Optional[Dict[str, float]] = None,
+        deduplicator: Optional[Deduplicator] = None
+    ) -> bool:
         """
         Analyzes a single result file.
 
         :param experiments: The experiments to add the results to
         :param path: Path to the result file
         :param name: Name of the result file
+        :param counters: Telemetry counters to add the work on the file to
+        :param deduplicator: Deduplicator skipping the file after parsing if a copy was claimed
+        :return: Whether the result file could be loaded
         """
-        result_file = load_json_file(path, name)
+        counters = counters if counters is not None else new_counters()
+
+        try:
+            with Timer(counters, "read_seconds"):
+                with open(join(path, name), "rb") as result:
+                    data = result.read()
+
+            with Timer(counters, "parse_seconds"):
+                result_file = Documents.parse(data)
+        except (OSError, ValueError):
+            return False
+
         if not result_file:
-            return
+            return False
 
-        nodes_experiment = experiments.get(Experiment.NODES)
-        if nodes_experiment:
-            for node in result_file["node"]:
-                feature = Features.get_feature_by_token(node["name"])
+        if deduplicator:
+            with Timer(counters, "parse_seconds"):
+                fingerprint = Deduplicator.fingerprint(data, result_file)
 
-                if feature is None:
-                    continue
+            if not deduplicator.claim(fingerprint, path, name):
+                return True
 
-                new_node = Metrics(node["data"])
-                nodes_experiment.merge_feature(feature, new_node)
+        with Timer(counters, "analyze_seconds"):
+            Analyzer.analyze_result(experiments, result_file)
 
-        spaces_experiment = experiments.get(Experiment.SPACES)
-        if spaces_experiment:
-            for feature in Features.as_list():
-                for space in result_file["rca"]:
+        counters["files"] += 1
+        counters["bytes"] += len(data)
+        counters["records"] += len(result_file["rca"]) + len(result_file["node"])
+        return True
 
-                    if space["kind"] == "unit":
-                        continue
+    @staticmethod
+    def analyze_result(experiments: Experiments, result_file: Dict[str, Any]) -> None:
+        """
+        Analyzes the contents of a single result file.
 
-                    is_inside = Analyzer.feature_in_space(feature, result_file["finder"], space)
-                    new_space = Metrics(space["data"])
+        :param experiments: The experiments to add the results to
+        :param result_file: The collector result of a source file
+        """
+        nodes_experiment = experiments.get(Experiment.NODES)
+        if nodes_experiment:
+            Nodes.group(nodes_experiment, result_file["node"])
 
-                    if is_inside:
-                        spaces_experiment.merge_feature(feature, new_space)
-                    else:
-                        spaces_experiment.merge_feature("no_" + feature, new_space)
+        spaces_experiment = experiments.get(Experiment.SPACES)
+        depths_experiment = experiments.get(Experiment.DEPTHS)
+        lints_experiment = experiments.get(Experiment.LINTS)
+        cooccurrence_experiment = experiments.get(Experiment.COOCCURRENCE)
+        if spaces_experiment or depths_experiment or lints_experiment or cooccurrence_experiment:
+            tree = SpaceTree(result_file["rca"], result_file["finder"])
+            suites = [(i, space["data"]) for i, space in enumerate(result_file["rca"])
+                      if space["kind"] != "unit"]
+
+            if cooccurrence_experiment:
+                Cooccurrence.group(cooccurrence_experiment, [data for _, data in suites],
+                                   tree.masks[[i for i, _ in suites]])
+
+            spaces = [(i, Metrics(data)) for i, data in suites] \
+                if spaces_experiment or depths_experiment or lints_experiment else []
+
+            if lints_experiment:
+                lints = Lints.join(tree, result_file.get("clippy") or [])
+                space_lints = {i: Lints({name: float(column[i]) for name, column in lints.items()})
+                               for i, _ in spaces}
+
+            for feature in Features.as_list():
+                for i, new_space in spaces:
+                    prefix = "" if tree.has_feature(i, feature) else "no_"
+
+                    if spaces_experiment:
+                        spaces_experiment.merge_feature(prefix + feature, new_space)
+                    if depths_experiment:
+                        depths_experiment.merge_feature(
+                            f"depth_{tree.depth_level(i)}_{prefix}{feature}", new_space)
+                    if lints_experiment:
+                        lints_experiment.merge_feature(prefix + feature, space_lints[i])
 
         files_experiment = experiments.get(Experiment.FILES)
         if files_experiment:
@@ -156,23 +574,3 @@ class Analyzer:
                 if space["kind"] == "unit":
                     new_space = Metrics(space["data"])
                     files_experiment.merge_feature("all_features", new_space)
-
-    @staticmethod
-    def feature_in_space(
-        feature: str,
-        findings: List[Dict[str, Any]],
-        space: Dict[str, Any]
-    ) -> bool:
-        """
-        :param feature: Name of the feature to look for
-        :param findings: List of findings in the file
-        :param space: Dict of the space to be searched
-
-        :return: Whether or not the feature could be found in the given space
-        """
-        for finding in findings:
-            if Features.get_feature_by_token(finding["name"]) == feature and \
-                    finding["start_line"] >= space["start_line"] and \
-                    finding["end_line"] <= space["end_line"]:
-                return True
-        return False
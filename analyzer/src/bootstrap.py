@@ -0,0 +1,203 @@
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+
+class Bootstrap:
+    """This class computes bootstrap confidence intervals for estimates on sampled data."""
+
+    # Maximum number of resampled indices held in memory at once
+    BATCH_SIZE = 1 << 22
+
+    # Maximum number of bytes of resampled counts held in memory at once by each worker
+    MEMORY_BUDGET = 1 << 27
+
+    @staticmethod
+    def interval(
+        estimates: np.ndarray,
+        confidence: float = .95
+    ) -> Optional[Dict[str, float]]:
+        """
+        Returns the percentile interval of bootstrap estimates.
+
+        :param estimates: Estimate of each resample
+        :param confidence: Confidence level of the interval
+        :return: Lower and upper bound of the interval
+        """
+        estimates = estimates[np.isfinite(estimates)]
+        if not len(estimates):
+            return None
+
+        alpha = (1. - confidence) / 2.
+        lower, upper = np.quantile(estimates, [alpha, 1. - alpha])
+        return {"lower": float(lower), "upper": float(upper)}
+
+    @staticmethod
+    def mean_interval(
+        values: np.ndarray,
+        resamples: int,
+        generator: np.random.Generator,
+        confidence: float = .95
+    ) -> Optional[Dict[str, float]]:
+        """
+        Returns a bootstrap confidence interval of the mean.
+
+        :param values: Array of sampled values
+        :param resamples: Number of bootstrap resamples
+        :param generator: Random generator
+        :param confidence: Confidence level of the interval
+        :return: Lower and upper bound of the interval
+        """
+        n = len(values)
+        if not n or not resamples:
+            return None
+
+        means = np.empty(resamples)
+        rows = max(1, Bootstrap.BATCH_SIZE // n)
+
+        for start in range(0, resamples, rows):
+            stop = min(start + rows, resamples)
+            indices = generator.integers(0, n, size=(stop - start, n))
+            means[start:stop] = values[indices].mean(axis=1)
+
+        return Bootstrap.interval(means, confidence)
+
+    @staticmethod
+    def two_sample_interval(
+        values: np.ndarray,
+        x_counts: np.ndarray,
+        y_counts: np.ndarray,
+        statistic: Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray],
+        resamples: int,
+        generator: np.random.Generator,
+        confidence: float = .95
+    ) -> Optional[Dict[str, float]]:
+        """
+        Returns a bootstrap confidence interval of a statistic on two independent samples.
+
+        Like in `effect_size_intervals`, the resamples are drawn as rows of multinomial counts of
+        the sorted distinct values of both samples and passed to the statistic in batches which
+        fit the memory budget.
+
+        :param values: Sorted distinct values of both samples
+        :param x_counts: Count of each distinct value in the first sample
+        :param y_counts: Count of each distinct value in the second sample
+        :param statistic: Function computing the statistic of each resample from the distinct
+                          values and the matrices of the counts of both samples
+        :param resamples: Number of bootstrap resamples
+        :param generator: Random generator
+        :param confidence: Confidence level of the interval
+        :return: Lower and upper bound of the interval
+        """
+        m, n = int(x_counts.sum()), int(y_counts.sum())
+        if not m or not n or not resamples:
+            return None
+
+        x_probabilities = x_counts / m
+        y_probabilities = y_counts / n
+
+        estimates = np.empty(resamples)
+
+        # Counts of both samples and temporary arrays of the statistic per row
+        rows = max(1, Bootstrap.MEMORY_BUDGET // (5 * 8 * len(values)))
+
+        for start in range(0, resamples, rows):
+            stop = min(start + rows, resamples)
+            estimates[start:stop] = statistic(
+                values,
+                generator.multinomial(m, x_probabilities, size=stop - start),
+                generator.multinomial(n, y_probabilities, size=stop - start))
+
+        return Bootstrap.interval(estimates, confidence)
+
+    @staticmethod
+    def median_from_counts(
+        values: np.ndarray,
+        counts: np.ndarray,
+        ranks: np.ndarray
+    ) -> np.ndarray:
+        """
+        Returns the medians of resamples given as counts of the sorted distinct values.
+
+        :param values: Sorted distinct values
+        :param counts: Matrix with the count of each value per resample
+        :param ranks: Positions of the one or two middle values in a sorted resample
+        :return: Median of each resample
+        """
+        cumulative = np.cumsum(counts, axis=1)
+        positions = [(cumulative <= rank).sum(axis=1) for rank in ranks]
+        medians: np.ndarray = np.mean([values[position] for position in positions], axis=0)
+        return medians
+
+    @staticmethod
+    def effect_size_intervals(
+        values: np.ndarray,
+        x_counts: np.ndarray,
+        y_counts: np.ndarray,
+        resamples: int,
+        generator: np.random.Generator,
+        confidence: float = .95
+    ) -> Dict[str, Optional[Dict[str, float]]]:
+        """
+        Returns bootstrap confidence intervals of the proportion of the Mann-Whitney U test and
+        of the difference of the medians of two independent samples.
+
+        Drawing a resample with replacement is the same as drawing multinomial counts of the
+        distinct values, so each resample is a row of counts over the sorted distinct values of
+        both samples. The proportion and the medians then follow from cumulative sums of the rows
+        without sorting a resample. Rows are processed in batches which fit the memory budget.
+
+        :param values: Sorted distinct values of both samples
+        :param x_counts: Count of each distinct value in the first sample
+        :param y_counts: Count of each distinct value in the second sample
+        :param resamples: Number of bootstrap resamples
+        :param generator: Random generator
+        :param confidence: Confidence level of the intervals
+        :return: Lower and upper bound of the proportion and the median difference
+        """
+        m, n = int(x_counts.sum()), int(y_counts.sum())
+        if not m or not n or not resamples:
+            return {"proportion": None, "median_difference": None}
+
+        x_probabilities = x_counts / m
+        y_probabilities = y_counts / n
+
+        x_ranks = np.array([(m - 1) // 2, m // 2])
+        y_ranks = np.array([(n - 1) // 2, n // 2])
+
+        proportions = np.empty(resamples)
+        differences = np.empty(resamples)
+
+        # Counts and cumulative sums of both samples and a temporary array per row
+        rows = max(1, Bootstrap.MEMORY_BUDGET // (5 * 8 * len(values)))
+
+        for start in range(0, resamples, rows):
+            stop = min(start + rows, resamples)
+            x_counts = generator.multinomial(m, x_probabilities, size=stop - start)
+            y_counts = generator.multinomial(n, y_probabilities, size=stop - start)
+
+            # Values of y below each distinct value, ties count as one half
+            y_below = np.cumsum(y_counts, axis=1) - .5 * y_counts
+            proportions[start:stop] = (x_counts * y_below).sum(axis=1) / (m * n)
+
+            differences[start:stop] = Bootstrap.median_from_counts(values, x_counts, x_ranks) - \
+                Bootstrap.median_from_counts(values, y_counts, y_ranks)
+
+        return {
+            "proportion": Bootstrap.interval(proportions, confidence),
+            "median_difference": Bootstrap.interval(differences, confidence)
+        }
+
+    @staticmethod
+    def effect_size_task(
+        task: Tuple[np.ndarray, np.ndarray, np.ndarray, int, np.random.Generator]
+    ) -> Dict[str, Optional[Dict[str, float]]]:
+        """
+        Computes the effect size intervals of a pair of samples in a worker.
+
+        :param task: Tuple of the distinct values, their counts in both samples, the number of
+                     resamples and the random generator
+        :return: Lower and upper bound of the proportion and the median difference
+        """
+        values, x_counts, y_counts, resamples, generator = task
+        return Bootstrap.effect_size_intervals(values, x_counts, y_counts, resamples, generator)
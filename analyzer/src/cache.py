@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+from os.path import join
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from analyzer.src.utils import get_analyzer_res_path, load_json_file, save_text_file_atomic
+
+
+class TestCache:
+    """
+    This class memoizes the results of single statistic tests on disk.
+
+    A result is stored under a hash of the exact values of both samples and of the parameters of
+    the test, so a rerun only computes the tests whose inputs have changed, e.g. those of a
+    feature whose tokens were changed. Each result is a small JSON file whose modification time
+    is refreshed on every hit. When the cache outgrows its size after a run, the least recently
+    used results are removed first.
+    """
+
+    NAME = "test_cache"
+
+    # Part of every key, to be increased whenever the results of the tests change
+    VERSION = 1
+
+    def __init__(self, max_bytes: int, path: Optional[str] = None) -> None:
+        """
+        :param max_bytes: Maximum size of the cache in bytes (0 disables the cache)
+        :param path: Folder of the cache (defaults to a folder in the result folder)
+        """
+        self.max_bytes = max_bytes
+        self.path = path or join(get_analyzer_res_path(), TestCache.NAME)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(samples: List[np.ndarray], parameters: Dict[str, Any]) -> str:
+        """
+        Returns the key of a test.
+
+        :param samples: The samples of the test
+        :param parameters: The parameters of the test which influence its result
+        :return: Hash of the samples and the parameters
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(json.dumps({"version": TestCache.VERSION, **parameters},
+                                 sort_keys=True).encode("utf-8"))
+
+        for sample in samples:
+            data = np.ascontiguousarray(sample, dtype=np.float64)
+            digest.update(len(data).to_bytes(8, "little"))
+            digest.update(data.tobytes())
+
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached result of a test.
+
+        :param key: The key of the test
+        :return: The result if it is cached
+        """
+        if not self.max_bytes:
+            return None
+
+        result = load_json_file(self.path, f"{key}.json")
+
+        if result is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        os.utime(join(self.path, f"{key}.json"))
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Stores the result of a test.
+
+        :param key: The key of the test
+        :param result: The result
+        """
+        if self.max_bytes:
+            save_text_file_atomic(json.dumps(result), self.path, f"{key}.json")
+
+    def evict(self) -> None:
+        """Removes the least recently used results until the cache fits into its size."""
+        if not self.max_bytes or not os.path.isdir(self.path):
+            return
+
+        entries = [entry for entry in os.scandir(self.path)
+                   if entry.is_file() and entry.name.endswith(".json")]
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+
+        size = 0
+        for entry in entries:
+            size += entry.stat().st_size
+            if size > self.max_bytes:
+                os.remove(entry.path)
+                self.evictions += 1
+
+    def summary(self) -> str:
+        """
+        Returns the hit and miss counts of the cache.
+
+        :return: Summary of the cache usage
+        """
+        return (f"Statistic test cache: {self.hits} hits, {self.misses} misses, "
+                f"{self.evictions} evicted")
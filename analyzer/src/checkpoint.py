@@ -0,0 +1,113 @@
+import os
+from os.path import join
+from time import monotonic
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from analyzer.src.utils import get_analyzer_res_path, load_pickle_file, save_pickle_file_atomic
+
+
+class Checkpoint:
+    """
+    This class periodically saves the merged results of an analyzer run together with the
+    repositories they contain, so an interrupted run can be resumed.
+    """
+
+    NAME = "checkpoint.pickle"
+
+    def __init__(self, settings: Dict[str, Any], interval: float) -> None:
+        """
+        :param settings: The settings of the run, a checkpoint is only resumed with equal settings
+        :param interval: Minimum number of seconds between two checkpoints (0 disables them)
+        """
+        self.settings = settings
+        self.interval = interval
+        self.completed: Set[str] = set()
+        self.last_save = monotonic()
+
+        # Columns of the repository cube of the last checkpoint
+        self.cube: Optional[Dict[str, np.ndarray]] = None
+
+        # Further state of the run of the last checkpoint, e.g. the fingerprints of the results
+        self.state: Dict[str, Any] = dict()
+
+    def load(self) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Loads the last checkpoint if it was written with the same settings.
+
+        :return: The result columns of the checkpoint if it can be resumed
+        """
+        checkpoint = load_pickle_file(get_analyzer_res_path(), Checkpoint.NAME)
+        if not checkpoint:
+            print("No checkpoint found, starting from scratch.")
+            return None
+
+        if checkpoint["settings"] != self.settings:
+            print("The checkpoint was written with different settings, starting from scratch.")
+            return None
+
+        self.completed = set(checkpoint["completed"])
+        self.cube = checkpoint.get("cube")
+        self.state = checkpoint.get("state") or dict()
+        print(f"Resuming from checkpoint with {len(self.completed)} completed tasks.")
+
+        columns: Dict[str, np.ndarray] = checkpoint["columns"]
+        return columns
+
+    def filter(self, tasks: List[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
+        """
+        Removes the tasks which are contained in the checkpoint.
+
+        :param tasks: Tasks whose last element is their key, the repository path or the key of a
+                      chunk of its files
+        :return: Tasks which still have to be run
+        """
+        return [task for task in tasks if task[-1] not in self.completed]
+
+    def complete(self, key: str) -> None:
+        """
+        Marks a task as merged into the results.
+
+        :param key: Key of the task
+        """
+        self.completed.add(key)
+
+    def due(self) -> bool:
+        """
+        Returns whether the next periodic checkpoint should be written.
+
+        :return: Whether the interval has passed since the last checkpoint
+        """
+        return self.interval > 0 and monotonic() - self.last_save >= self.interval
+
+    def save(
+        self,
+        columns: Dict[str, np.ndarray],
+        cube: Optional[Dict[str, np.ndarray]] = None,
+        state: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Atomically writes a checkpoint.
+
+        :param columns: The merged result columns
+        :param cube: The columns of the repository cube
+        :param state: Further state of the run which is restored when it is resumed
+        """
+        save_pickle_file_atomic({
+            "settings": self.settings,
+            "completed": sorted(self.completed),
+            "columns": columns,
+            "cube": cube,
+            "state": state or dict()
+        }, get_analyzer_res_path(), Checkpoint.NAME)
+
+        self.last_save = monotonic()
+
+    @staticmethod
+    def remove() -> None:
+        """Removes the checkpoint after the run has finished."""
+        try:
+            os.remove(join(get_analyzer_res_path(), Checkpoint.NAME))
+        except OSError:
+            pass
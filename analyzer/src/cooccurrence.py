@@ -0,0 +1,95 @@
+from itertools import combinations
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from analyzer.src.features import Features
+from analyzer.src.mapping import Mapping
+from analyzer.src.metrics import Metrics
+
+
+class Cooccurrence:
+    """
+    This class groups the spaces by the combination of features they use.
+
+    The features of a space are given by its bit mask in the order of `Features.as_list`, so the
+    seven features form 128 combinations. The metric values of all spaces of a result file are
+    gathered into a matrix whose rows are sorted by mask once, which adds each combination as a
+    single block of rows.
+    """
+
+    @staticmethod
+    def key(mask: int) -> str:
+        """
+        Returns the key of a combination of features.
+
+        :param mask: Bit mask of the features
+        :return: Names of the features joined by `+`, or `none` for spaces without features
+        """
+        features = [feature for i, feature in enumerate(Features.as_list()) if mask >> i & 1]
+        return "+".join(features) if features else "none"
+
+    @staticmethod
+    def keys() -> List[str]:
+        """
+        Returns the keys of all combinations of features.
+
+        :return: List of keys ordered by their bit mask
+        """
+        return [Cooccurrence.key(mask) for mask in range(1 << len(Features))]
+
+    @staticmethod
+    def pairs() -> List[Tuple[str, str]]:
+        """
+        Returns all pairs of features.
+
+        :return: List of pairs of feature names
+        """
+        return list(combinations(Features.as_list(), 2))
+
+    @staticmethod
+    def group(mapping: Mapping, suites: List[Dict[str, Any]], masks: np.ndarray) -> None:
+        """
+        Adds the spaces of a result file to the combinations of their features.
+
+        :param mapping: The mapping of the combinations to their spaces
+        :param suites: The data dictionaries of the spaces
+        :param masks: Bit mask of the features of each space
+        """
+        if not suites:
+            return
+
+        values, integers = Metrics.matrix(suites)
+        order = np.argsort(masks, kind="stable")
+        bounds = np.searchsorted(masks[order], np.arange((1 << len(Features)) + 1))
+
+        for mask, key in enumerate(Cooccurrence.keys()):
+            if bounds[mask] < bounds[mask + 1]:
+                mapping.get(key).merge_matrix(values[order[bounds[mask]:bounds[mask + 1]]],
+                                              integers)
+
+    @staticmethod
+    def pair_samples(
+        columns: List[np.ndarray],
+        first: str,
+        second: str
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the values of the spaces using both features of a pair and of the spaces using
+        exactly one of them.
+
+        :param columns: Values of a metric for each combination, ordered by bit mask
+        :param first: Name of the first feature
+        :param second: Name of the second feature
+        :return: Values of the spaces using both features and of the spaces using one of them
+        """
+        features = Features.as_list()
+        first_bit = 1 << features.index(first)
+        second_bit = 1 << features.index(second)
+
+        both = [column for mask, column in enumerate(columns)
+                if mask & first_bit and mask & second_bit]
+        one = [column for mask, column in enumerate(columns)
+               if bool(mask & first_bit) != bool(mask & second_bit)]
+
+        return np.concatenate(both), np.concatenate(one)
@@ -0,0 +1,262 @@
+import multiprocessing
+import os
+import sqlite3
+from os.path import basename, dirname, join
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from analyzer.src.features import Features
+from analyzer.src.metrics import Metric
+from analyzer.src.tree import SpaceTree
+from analyzer.src.utils import get_analyzer_res_path, load_json_file
+
+
+Row = Tuple[Any, ...]
+
+
+class Database:
+    """
+    This class exports the individual spaces and nodes of the collector results into an indexed
+    SQLite database and offers prepared aggregate queries on it.
+    """
+
+    NAME = "results.sqlite"
+    TABLES = ["spaces", "nodes"]
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        :param path: Path of the database file, defaults to the analyzer result folder
+        """
+        self.path = path or join(get_analyzer_res_path(), Database.NAME)
+
+    @staticmethod
+    def record_columns() -> List[str]:
+        """
+        Returns the columns of the spaces and nodes tables after the repository id.
+
+        :return: List of column names
+        """
+        return ["file", "kind", "name", "start_line", "end_line"] + \
+            [f"has_{feature}" for feature in Features.as_list()] + Metric.as_list()
+
+    @staticmethod
+    def schema() -> List[str]:
+        """
+        Returns the statements creating the tables and indices.
+
+        :return: List of SQL statements
+        """
+        feature_columns = ", ".join(f"has_{feature} INTEGER" for feature in Features.as_list())
+        metric_columns = ", ".join(f"{metric} REAL" for metric in Metric.as_list())
+
+        statements = [
+            "CREATE TABLE repos (id INTEGER PRIMARY KEY, owner TEXT, name TEXT, sloc REAL)"
+        ]
+
+        for table in Database.TABLES:
+            # Spaces reference their parent space and know their nesting depth
+            tree_columns = "id INTEGER PRIMARY KEY, parent_id INTEGER, depth INTEGER, " \
+                if table == "spaces" else ""
+
+            statements.extend([
+                f"CREATE TABLE {table} ({tree_columns}repo_id INTEGER REFERENCES repos(id), "
+                f"file TEXT, kind TEXT, name TEXT, start_line INTEGER, end_line INTEGER, "
+                f"{feature_columns}, {metric_columns})",
+                f"CREATE INDEX {table}_repo ON {table} (repo_id)",
+                f"CREATE INDEX {table}_kind ON {table} (kind)"
+            ])
+            statements.extend(f"CREATE INDEX {table}_{feature} ON {table} (has_{feature})"
+                              for feature in Features.as_list())
+
+        statements.extend([
+            "CREATE INDEX spaces_parent ON spaces (parent_id)",
+            "CREATE INDEX spaces_depth ON spaces (depth)"
+        ])
+
+        return statements
+
+    @staticmethod
+    def record(file: str, finding: Dict[str, Any], features: Sequence[bool]) -> Row:
+        """
+        Returns the row of a space or node.
+
+        :param file: Name of the result file
+        :param finding: The space or node of the collector result
+        :param features: Whether each feature is used in the space or node
+        :return: Row without the repository id
+        """
+        data = finding["data"]
+        metrics = [data[path[0]][path[1]] for path in Metric.as_dict().values()]
+
+        return (file, finding["kind"], finding["name"], finding["start_line"],
+                finding["end_line"], *map(int, features), *metrics)
+
+    @staticmethod
+    def records_repo(task: Tuple[str, List[str]]) -> Tuple[str, List[Row], List[Row]]:
+        """
+        Collects the rows of all spaces and nodes of a repository.
+
+        :param task: Tuple of the repository path and its result files
+        :return: The repository path, the space rows and the node rows, the space rows start
+                 with their index, the index of their parent (or -1) and their depth
+        """
+        path, files = task
+        spaces: List[Row] = list()
+        nodes: List[Row] = list()
+
+        for file in files:
+            result_file = load_json_file(path, file)
+            if not result_file:
+                continue
+
+            tree = SpaceTree(result_file["rca"], result_file["finder"])
+            offset = len(spaces)
+
+            for i, space in enumerate(result_file["rca"]):
+                features = [tree.has_feature(i, feature) for feature in Features.as_list()]
+                parent = tree.parents[i] + offset if tree.parents[i] >= 0 else -1
+                spaces.append((offset + i, parent, tree.depths[i],
+                               *Database.record(file, space, features)))
+
+            for node in result_file["node"]:
+                node_feature = Features.get_feature_by_token(node["name"])
+                features = [feature == node_feature for feature in Features.as_list()]
+                nodes.append(Database.record(file, node, features))
+
+        return path, spaces, nodes
+
+    def export(self, repos: Dict[str, List[str]]) -> None:
+        """
+        Exports the spaces and nodes of the repositories into a new database.
+
+        :param repos: Dict mapping repository paths to result files
+        """
+        from tqdm import tqdm
+
+        tmp_path = self.path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        os.makedirs(dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(tmp_path)
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+
+        statements = Database.schema()
+        for statement in statements:
+            if statement.startswith("CREATE TABLE"):
+                connection.execute(statement)
+
+        columns = ", ".join(Database.record_columns())
+        placeholders = ", ".join(["?"] * (len(Database.record_columns()) + 1))
+        space_id = 0
+
+        with multiprocessing.Pool(processes=2 * multiprocessing.cpu_count() + 1) as pool:
+            with tqdm(total=len(repos)) as t:
+                for repo_id, (path, spaces, nodes) in enumerate(
+                        pool.imap_unordered(Database.records_repo, repos.items())):
+                    connection.execute("INSERT INTO repos VALUES (?, ?, ?, NULL)",
+                                       (repo_id, basename(dirname(path)), basename(path)))
+                    # Indices of the spaces within the repository are turned into global ids
+                    connection.executemany(
+                        f"INSERT INTO spaces (id, parent_id, depth, repo_id, {columns}) "
+                        f"VALUES (?, ?, ?, {placeholders})",
+                        ((space_id + index, space_id + parent if parent >= 0 else None, depth,
+                          repo_id, *row) for index, parent, depth, *row in spaces))
+                    connection.executemany(
+                        f"INSERT INTO nodes (repo_id, {columns}) VALUES ({placeholders})",
+                        ((repo_id, *row) for row in nodes))
+                    space_id += len(spaces)
+                    t.update()
+
+        # Indices are created after inserting, which is faster than updating them on every row
+        for statement in statements:
+            if statement.startswith("CREATE INDEX"):
+                connection.execute(statement)
+
+        connection.execute("UPDATE repos SET sloc = (SELECT SUM(sloc) FROM spaces "
+                           "WHERE spaces.repo_id = repos.id AND spaces.kind = 'unit')")
+        connection.commit()
+        connection.close()
+
+        os.replace(tmp_path, self.path)
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Opens the database read-only.
+
+        :return: Connection to the database
+        """
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+
+    def query(self, sql: str, parameters: Sequence[Any] = ()) -> List[Row]:
+        """
+        Runs an arbitrary query.
+
+        :param sql: The SQL query
+        :param parameters: Parameters of the query
+        :return: The resulting rows
+        """
+        connection = self.connect()
+        try:
+            return connection.execute(sql, parameters).fetchall()
+        finally:
+            connection.close()
+
+    def aggregate(
+        self,
+        metric: str,
+        table: str = "spaces",
+        feature: Optional[str] = None,
+        used: bool = True,
+        kind: Optional[str] = None,
+        min_repo_sloc: Optional[float] = None,
+        depth: Optional[int] = None
+    ) -> Dict[str, Optional[float]]:
+        """
+        Aggregates a metric over a slice of the spaces or nodes.
+
+        :param metric: Name of the metric
+        :param table: Either spaces or nodes
+        :param feature: Feature the slice is restricted to
+        :param used: Whether the feature has to be used or not used
+        :param kind: Kind of space, by default all spaces except units
+        :param min_repo_sloc: Minimum number of source lines of code of the repositories
+        :param depth: Nesting depth of the spaces, units have depth 0
+        :return: Count, average, minimum and maximum of the metric
+        """
+        if metric not in Metric.as_list():
+            raise ValueError(f"Unknown metric {metric}")
+        if table not in Database.TABLES:
+            raise ValueError(f"Unknown table {table}")
+
+        conditions: List[str] = list()
+        parameters: List[Any] = list()
+
+        if feature is not None:
+            if feature not in Features.as_list():
+                raise ValueError(f"Unknown feature {feature}")
+            conditions.append(f"t.has_{feature} = ?")
+            parameters.append(int(used))
+
+        if kind is not None:
+            conditions.append("t.kind = ?")
+            parameters.append(kind)
+        elif table == "spaces":
+            conditions.append("t.kind != 'unit'")
+
+        if depth is not None:
+            if table != "spaces":
+                raise ValueError("Only spaces have a depth")
+            conditions.append("t.depth = ?")
+            parameters.append(depth)
+
+        if min_repo_sloc is not None:
+            conditions.append("r.sloc >= ?")
+            parameters.append(min_repo_sloc)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"SELECT COUNT(t.{metric}), AVG(t.{metric}), MIN(t.{metric}), MAX(t.{metric}) " \
+            f"FROM {table} t JOIN repos r ON t.repo_id = r.id {where}"
+
+        count, average, minimum, maximum = self.query(sql, parameters)[0]
+        return {"count": count, "average": average, "min": minimum, "max": maximum}
@@ -0,0 +1,93 @@
+import hashlib
+import json
+from typing import Any, List, MutableMapping, Tuple
+from enum import Enum
+
+
+class Deduplication(str, Enum):
+    """Ways to treat result files with identical contents in several repositories."""
+    OFF = "off"
+    ONCE = "once"
+    REPLAY = "replay"
+
+    def __str__(self) -> str:
+        """
+        Returns the deduplication mode as a string.
+
+        :return: Deduplication mode
+        """
+        return self.value
+
+    @staticmethod
+    def as_list() -> List[str]:
+        """
+        Returns a list of all deduplication modes.
+
+        :return: List of all deduplication modes
+        """
+        return list(map(lambda x: x.value, Deduplication))
+
+
+class Deduplicator:
+    """
+    This class finds result files that occur several times across the repositories.
+
+    Files are fingerprinted while they are analyzed, by hashing the raw bytes which are parsed
+    anyway. The names of their units, which are the paths of the source files, and the
+    identifiers of streamed records are blanked before hashing, so copies of a file at another
+    path, such as vendored packages or crates copied within a monorepo, share a fingerprint. The
+    workers claim the fingerprints in a registry shared by the pool. The first claimed copy of
+    each file is analyzed and all later copies are skipped once they are parsed and reported as
+    duplicates, whose result the parent can replay from the analyzed copy.
+    """
+
+    def __init__(self, registry: MutableMapping[str, Tuple[str, str]]) -> None:
+        """
+        :param registry: Dict shared by the workers mapping the fingerprints to the repository
+                         path and the name of their first copy
+        """
+        self.registry = registry
+
+        # Fingerprints and names of the files claimed by this task and fingerprints of its copies
+        self.claimed: List[Tuple[str, str]] = list()
+        self.duplicates: List[str] = list()
+
+    @staticmethod
+    def fingerprint(data: bytes, result: Any) -> str:
+        """
+        Returns a fingerprint of a result which does not depend on the path of its source.
+
+        :param data: The raw result
+        :param result: The parsed result
+        :return: Hex digest of the raw result without its unit names and stream identifiers
+        """
+        names: List[Any] = [result.get("repo"), result.get("file")]
+
+        try:
+            names.extend(record["name"] for records in [result["rca"], result["node"]]
+                         for record in records if record["kind"] == "unit")
+        except (KeyError, TypeError):
+            pass
+
+        for name in names:
+            if isinstance(name, str) and name:
+                data = data.replace(json.dumps(name, ensure_ascii=False).encode("utf-8"), b'""')
+
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    def claim(self, fingerprint: str, path: str, name: str) -> bool:
+        """
+        Claims the analysis of a result file.
+
+        :param fingerprint: Fingerprint of the result file
+        :param path: Path of the repository
+        :param name: Name of the result file
+        :return: Whether the file is the first copy of its fingerprint, later copies are recorded
+                 as duplicates
+        """
+        if tuple(self.registry.setdefault(fingerprint, (path, name))) == (path, name):
+            self.claimed.append((fingerprint, name))
+            return True
+
+        self.duplicates.append(fingerprint)
+        return False
@@ -0,0 +1,52 @@
+import json
+from typing import Any, Optional
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None  # type: ignore
+
+
+class Documents:
+    """
+    This class parses the collector results.
+
+    With pysimdjson installed, a result is parsed into a lazy document. Objects and arrays of the
+    document are only turned into Python objects when they are accessed, so the nodes which are
+    skipped after checking their name never materialize their metric suites. Without pysimdjson,
+    the results are parsed completely with the standard library.
+    """
+
+    # Parser of this process, it is reused as long as its last document is not referenced anymore
+    parser: Optional[Any] = None
+
+    @staticmethod
+    def lazy() -> bool:
+        """
+        Returns whether the results are parsed lazily.
+
+        :return: Whether pysimdjson is installed
+        """
+        return simdjson is not None
+
+    @staticmethod
+    def parse(data: bytes) -> Any:
+        """
+        Parses a collector result.
+
+        :param data: The raw result
+        :return: The parsed result, which supports the read access of a dict
+        """
+        if simdjson is None:
+            return json.loads(data)
+
+        if Documents.parser is None:
+            Documents.parser = simdjson.Parser()
+
+        try:
+            return Documents.parser.parse(data)
+        except RuntimeError:
+            # The last document is still referenced and cannot be overwritten, so it keeps the
+            # old parser while the following documents use a new one
+            Documents.parser = simdjson.Parser()
+            return Documents.parser.parse(data)
@@ -2,15 +2,24 @@ from __future__ import annotations
 from typing import Any, Dict, List, Optional
 from enum import Enum
 
+import numpy as np
+
 from analyzer.src.mapping import Mapping
 from analyzer.src.features import Features
 from analyzer.src.metrics import Metrics
+from analyzer.src.tree import SpaceTree
+from analyzer.src.lints import Lints
+from analyzer.src.nodes import Nodes
+from analyzer.src.cooccurrence import Cooccurrence
 
 
 class Experiment(str, Enum):
     NODES = "nodes"
     SPACES = "spaces"
     FILES = "files"
+    DEPTHS = "depths"
+    LINTS = "lints"
+    COOCCURRENCE = "cooccurrence"
 
     def __str__(self) -> str:
         """
@@ -64,16 +73,30 @@ class Experiments():
 
         if Experiment.NODES in experiment_names:
             experiments[str(Experiment.NODES)] = Mapping(
-                {k: Metrics() for k in Features.as_list()})
+                {k: Nodes(k) for k in Features.as_list()})
+
+        double_features = [val for val in Features.as_list() for _ in (0, 1)]
 
         if Experiment.SPACES in experiment_names:
-            double_features = [val for val in Features.as_list() for _ in (0, 1)]
             experiments[str(Experiment.SPACES)] = Mapping({k if i % 2 else "no_" + k: Metrics()
                                                            for i, k in enumerate(double_features)})
 
         if Experiment.FILES in experiment_names:
             experiments[str(Experiment.FILES)] = Mapping({"all_features": Metrics()})
 
+        if Experiment.DEPTHS in experiment_names:
+            experiments[str(Experiment.DEPTHS)] = Mapping({k: Metrics()
+                                                           for feature in Features.as_list()
+                                                           for k in SpaceTree.depth_keys(feature)})
+
+        if Experiment.LINTS in experiment_names:
+            experiments[str(Experiment.LINTS)] = Mapping({k if i % 2 else "no_" + k: Lints()
+                                                          for i, k in enumerate(double_features)})
+
+        if Experiment.COOCCURRENCE in experiment_names:
+            experiments[str(Experiment.COOCCURRENCE)] = Mapping({k: Metrics()
+                                                                 for k in Cooccurrence.keys()})
+
         return experiments
 
     def get(self, name: str) -> Optional[Mapping]:
@@ -93,6 +116,44 @@ class Experiments():
         for experiment, mapping in self.experiments.items():
             mapping.merge(other.experiments[experiment])
 
+    def as_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Returns a columnar representation of the experiments.
+
+        :return: Dict mapping `<experiment>/<feature>/<metric>` keys to arrays of values
+        """
+        return {f"{experiment}/{key}": column
+                for experiment, mapping in self.experiments.items()
+                for key, column in mapping.as_columns().items()}
+
+    def merge_columns(self, columns: Dict[str, np.ndarray], position: int = 0) -> None:
+        """
+        Merges a columnar representation of other experiments.
+
+        :param columns: Dict mapping `<experiment>/<feature>/<metric>` keys to arrays of values
+        :param position: Position of the columns among the merged columns, the values are kept
+                         in the order of the positions regardless of the order of merging
+        """
+        grouped: Dict[str, Dict[str, np.ndarray]] = dict()
+        for key, column in columns.items():
+            experiment, rest = key.split("/", 1)
+            grouped.setdefault(experiment, dict())[rest] = column
+
+        for experiment, experiment_columns in grouped.items():
+            mapping = self.experiments.get(experiment)
+            if mapping:
+                mapping.merge_columns(experiment_columns, position)
+
+    def remove_columns(self, position: int) -> None:
+        """
+        Removes the value columns merged at a position. Sums merged at the position, such as the
+        breakdown of the nodes by tokens, are kept and have to be merged once more negated.
+
+        :param position: Position of the columns
+        """
+        for mapping in self.experiments.values():
+            mapping.remove_columns(position)
+
     def as_dict(self) -> Dict[str, Any]:
         """
         Returns a dict representation of the mapping.
@@ -0,0 +1,152 @@
+import tempfile
+from os.path import join
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from analyzer.src.ranks import SharedRanks
+from analyzer.src.utils import get_analyzer_res_path
+
+
+# Distinct values of a merged block with their number of occurrences in both samples
+CountedBlock = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+class ExternalRanks:
+    """
+    This class runs the Mann-Whitney U test on samples which do not fit into memory.
+
+    Each sample is split into runs which fit into the memory budget. The runs are sorted one by
+    one and written to memory mapped files. The sorted runs of both samples are then merged in
+    blocks: every run contributes the values up to the smallest last value of the buffered runs,
+    which are the only values that cannot be followed by smaller ones. Each merged block is
+    reduced to its distinct values and their counts in both samples, from which U and the tie
+    correction are accumulated while the block is the only one in memory.
+    """
+
+    # Bytes of memory per buffered value, the buffers are copied while a block is merged
+    BYTES_PER_VALUE = 6 * np.dtype(np.float64).itemsize
+
+    def __init__(self, budget: int, directory: str = "") -> None:
+        """
+        :param budget: Memory budget in bytes
+        :param directory: Directory of the sorted runs (defaults to the result folder)
+        """
+        self.budget = budget
+        self.directory = directory or get_analyzer_res_path()
+
+        # Sorting copies a run, so a run takes half of the budget
+        self.run_size = max(1, budget // (2 * np.dtype(np.float64).itemsize))
+
+    def runs(self, column: np.ndarray, path: str, name: str) -> List[np.ndarray]:
+        """
+        Sorts a sample into runs which fit into the memory budget.
+
+        :param column: The sample, usually memory mapped from the columnar store
+        :param path: Directory to write the sorted runs to
+        :param name: Name prefix of the files of the runs
+        :return: The sorted runs, memory mapped from their files
+        """
+        runs: List[np.ndarray] = list()
+
+        for i, start in enumerate(range(0, len(column), self.run_size)):
+            run = np.sort(np.asarray(column[start:start + self.run_size], dtype=np.float64))
+
+            mapped = np.memmap(join(path, f"{name}_{i}.bin"), dtype=np.float64, mode="w+",
+                               shape=(len(run),))
+            mapped[:] = run
+            mapped.flush()
+            runs.append(mapped)
+
+        return runs
+
+    def merge(self, runs: List[np.ndarray], samples: List[int]) -> Iterator[CountedBlock]:
+        """
+        Merges sorted runs in blocks which fit into the memory budget.
+
+        :param runs: The sorted runs of both samples
+        :param samples: Sample of each run, 0 for the first and 1 for the second sample
+        :return: Iterator over the sorted distinct values of each block and their counts in both
+                 samples, each distinct value occurs in a single block
+        """
+        block = max(1, self.budget // (ExternalRanks.BYTES_PER_VALUE * max(1, len(runs))))
+        positions = [0] * len(runs)
+        pending: List[CountedBlock] = list()
+
+        while True:
+            active = [i for i, run in enumerate(runs) if positions[i] < len(run)]
+            if not active:
+                break
+
+            buffers = {i: runs[i][positions[i]:positions[i] + block] for i in active}
+
+            # Runs which continue after their buffer bound the values which can be merged
+            bounds = [buffers[i][-1] for i in active if positions[i] + block < len(runs[i])]
+            bound = min(bounds) if bounds else np.inf
+
+            taken_values: List[np.ndarray] = list()
+            taken_samples: List[np.ndarray] = list()
+            for i in active:
+                count = int(np.searchsorted(buffers[i], bound, side="right"))
+                taken_values.append(np.asarray(buffers[i][:count]))
+                taken_samples.append(np.full(count, samples[i], dtype=np.int8))
+                positions[i] += count
+
+            values = np.concatenate(taken_values)
+            order = np.argsort(values, kind="stable")
+            values = values[order]
+            first = (np.concatenate(taken_samples)[order] == 0).astype(np.int64)
+
+            starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+            counts = np.diff(np.r_[starts, len(values)])
+            x_counts = np.add.reduceat(first, starts)
+            distinct, y_counts = values[starts], counts - x_counts
+
+            # The last value of the previous block may continue in this block
+            if pending and pending[0][0][0] == distinct[0]:
+                x_counts[0] += pending[0][1][0]
+                y_counts[0] += pending[0][2][0]
+            elif pending:
+                yield pending[0]
+            pending = list()
+
+            # The bound itself may continue in the next block
+            if distinct[-1] == bound:
+                pending.append((distinct[-1:], x_counts[-1:], y_counts[-1:]))
+                distinct, x_counts, y_counts = distinct[:-1], x_counts[:-1], y_counts[:-1]
+
+            if len(distinct):
+                yield distinct, x_counts, y_counts
+
+        if pending:
+            yield pending[0]
+
+    def mann_whitney_u(self, x: np.ndarray, y: np.ndarray) -> Dict[str, Any]:
+        """
+        Returns the two-sided Mann-Whitney U test of two samples, which are sorted on disk.
+
+        :param x: First sample
+        :param y: Second sample
+        :return: The U statistic and the p-value
+        """
+        m, n = len(x), len(y)
+        u = 0.
+        tie_sum = 0.
+        y_below = 0
+
+        with tempfile.TemporaryDirectory(prefix=".runs_", dir=self.directory) as path:
+            x_runs = self.runs(x, path, "x")
+            y_runs = self.runs(y, path, "y")
+
+            for _, x_counts, y_counts in self.merge(x_runs + y_runs,
+                                                    [0] * len(x_runs) + [1] * len(y_runs)):
+                u += float(np.dot(x_counts, y_below + np.cumsum(y_counts) - .5 * y_counts))
+                y_below += int(y_counts.sum())
+
+                ties = (x_counts + y_counts).astype(np.float64)
+                tie_sum += float(np.sum(ties ** 3 - ties))
+
+            # The memory maps are released before their files are removed
+            del x_runs, y_runs
+
+        return SharedRanks.normal_test(u, m, n, tie_sum)
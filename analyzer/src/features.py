@@ -34,6 +34,15 @@ class Features(Enum):
         """
         return dict(map(lambda x: (x.name.lower(), x.value), Features))
 
+    @staticmethod
+    def tokens() -> List[str]:
+        """
+        Returns the tokens of all features, grouped by feature in the order of `as_list`.
+
+        :return: List of all tokens
+        """
+        return [token for feature in Features for token in feature.value]
+
     @staticmethod
     def get_feature_by_token(token: str) -> Optional[str]:
         """
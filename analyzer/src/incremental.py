@@ -0,0 +1,240 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from analyzer.src.features import Features
+from analyzer.src.metrics import Metric
+from analyzer.src.ranks import SharedRanks
+from analyzer.src.utils import get_analyzer_res_path, load_arrays_file, save_arrays_file_atomic
+
+
+class FenwickTree:
+    """
+    This class counts non-negative integers in a binary indexed tree. Adding values and counting
+    the values below others take O(log k) steps for a domain of k integers, which are done for
+    all values of a batch at once.
+    """
+
+    def __init__(self, counts: np.ndarray) -> None:
+        """
+        :param counts: Number of occurrences of each integer of the domain
+        """
+        # Node i of the tree sums the counts of the lowest set bit of i integers ending at i - 1
+        cumulative = np.r_[0, np.cumsum(counts, dtype=np.int64)]
+        nodes = np.arange(1, len(counts) + 1)
+
+        self.tree = np.zeros(len(counts) + 1, dtype=np.int64)
+        self.tree[1:] = cumulative[nodes] - cumulative[nodes - (nodes & -nodes)]
+
+    def add(self, values: np.ndarray) -> None:
+        """
+        Adds values to the tree.
+
+        :param values: Integers of the domain, duplicates are counted several times
+        """
+        nodes = values + 1
+        while len(nodes):
+            np.add.at(self.tree, nodes, 1)
+            nodes = nodes + (nodes & -nodes)
+            nodes = nodes[nodes < len(self.tree)]
+
+    def below(self, values: np.ndarray) -> np.ndarray:
+        """
+        Counts the added values which are smaller than the given values.
+
+        :param values: Integers of the domain
+        :return: Number of smaller values for each given value
+        """
+        nodes = values.copy()
+        counts = np.zeros(len(values), dtype=np.int64)
+
+        while nodes.any():
+            counts += self.tree[nodes]
+            nodes -= nodes & -nodes
+
+        return counts
+
+
+class IncrementalRanks:
+    """
+    This class keeps the Mann-Whitney U statistic of two samples of non-negative integers up to
+    date while values are added to either sample.
+
+    A value added to the first sample adds the number of smaller values of the second sample to
+    U and a value added to the second sample adds the number of larger values of the first
+    sample, ties count as one half. The counts come from a Fenwick tree per sample and the tie
+    correction from the count of each value, so the test never sorts the samples again. A sample
+    containing a value which is not a non-negative integer cannot be counted and invalidates the
+    ranks.
+    """
+
+    def __init__(
+        self,
+        x_counts: Optional[np.ndarray] = None,
+        y_counts: Optional[np.ndarray] = None,
+        u: float = 0.,
+        valid: bool = True
+    ) -> None:
+        """
+        :param x_counts: Number of occurrences of each integer in the first sample
+        :param y_counts: Number of occurrences of each integer in the second sample
+        :param u: The U statistic of the first sample
+        :param valid: Whether all values so far were non-negative integers
+        """
+        self.counts = [
+            x_counts if x_counts is not None else np.zeros(0, dtype=np.int64),
+            y_counts if y_counts is not None else np.zeros(0, dtype=np.int64)
+        ]
+        self.trees = [FenwickTree(counts) for counts in self.counts]
+        self.u = u
+        self.valid = valid
+
+        ties = (self.counts[0] + self.counts[1]).astype(np.float64)
+        self.tie_sum = float(np.sum(ties ** 3 - ties))
+
+    def sizes(self) -> List[int]:
+        """
+        Returns the sizes of both samples.
+
+        :return: Number of values in the first and in the second sample
+        """
+        return [int(counts.sum()) for counts in self.counts]
+
+    def grow(self, size: int) -> None:
+        """
+        Enlarges the domain to at least the given number of integers by doubling it.
+
+        :param size: Minimum size of the domain
+        """
+        if size <= len(self.counts[0]):
+            return
+
+        domain = max(size, 2 * len(self.counts[0]))
+        self.counts = [np.r_[counts, np.zeros(domain - len(counts), dtype=np.int64)]
+                       for counts in self.counts]
+        self.trees = [FenwickTree(counts) for counts in self.counts]
+
+    def insert(self, values: np.ndarray, sample: int) -> None:
+        """
+        Adds values to a sample.
+
+        :param values: The values
+        :param sample: 0 for the first sample and 1 for the second sample
+        """
+        if not self.valid or not len(values):
+            return
+
+        codes = values.astype(np.int64)
+        if np.any(codes != values) or codes.min() < 0:
+            self.valid = False
+            return
+
+        self.grow(int(codes.max()) + 1)
+
+        other = 1 - sample
+        below = self.trees[other].below(codes)
+        equal = self.counts[other][codes]
+
+        if sample == 0:
+            self.u += float(np.sum(below) + .5 * np.sum(equal))
+        else:
+            above = self.sizes()[0] - below - equal
+            self.u += float(np.sum(above) + .5 * np.sum(equal))
+
+        distinct, added = np.unique(codes, return_counts=True)
+        ties = (self.counts[0][distinct] + self.counts[1][distinct]).astype(np.float64)
+        self.tie_sum += float(np.sum((ties + added) ** 3 - (ties + added) - (ties ** 3 - ties)))
+
+        self.counts[sample][distinct] += added
+        self.trees[sample].add(codes)
+
+    def mann_whitney_u(self) -> Dict[str, Any]:
+        """
+        Returns the two-sided Mann-Whitney U test of the current samples.
+
+        :return: The U statistic, the p-value and the proportion
+        """
+        m, n = self.sizes()
+        test: Dict[str, Any] = SharedRanks.normal_test(self.u, m, n, self.tie_sum)
+        test["proportion"] = self.u / (m * n) if m * n else None
+        return test
+
+
+class IncrementalStatistics:
+    """
+    This class keeps the incremental ranks of the spaces with and without each feature for each
+    metric, together with the repositories whose values they contain.
+
+    The ranks are saved as an uncompressed numpy archive of the value counts of both samples and
+    the U statistic, from which the Fenwick trees and the tie correction are rebuilt in linear
+    time. Metrics whose values are not all non-negative integers are left out of the tests.
+    """
+
+    NAME = "incremental_ranks.npz"
+
+    def __init__(self) -> None:
+        self.ranks: Dict[str, IncrementalRanks] = {
+            f"{feature}/{metric}": IncrementalRanks()
+            for feature in Features.as_list() for metric in Metric.as_list()}
+        self.repos: Set[str] = set()
+
+    @staticmethod
+    def load() -> IncrementalStatistics:
+        """
+        Loads the incremental ranks of the last incremental analysis.
+
+        :return: The incremental ranks, which are empty if none were saved
+        """
+        statistics = IncrementalStatistics()
+        arrays = load_arrays_file(get_analyzer_res_path(), IncrementalStatistics.NAME)
+
+        if arrays is None:
+            return statistics
+
+        statistics.repos = set(arrays["repos"].tolist())
+        for key in statistics.ranks:
+            statistics.ranks[key] = IncrementalRanks(
+                arrays[f"{key}/x_counts"], arrays[f"{key}/y_counts"],
+                float(arrays[f"{key}/u"]), bool(arrays[f"{key}/valid"]))
+
+        return statistics
+
+    def save(self) -> None:
+        """Saves the incremental ranks."""
+        arrays: Dict[str, np.ndarray] = {"repos": np.array(sorted(self.repos), dtype=str)}
+
+        for key, ranks in self.ranks.items():
+            arrays[f"{key}/x_counts"] = ranks.counts[0]
+            arrays[f"{key}/y_counts"] = ranks.counts[1]
+            arrays[f"{key}/u"] = np.array(ranks.u)
+            arrays[f"{key}/valid"] = np.array(ranks.valid)
+
+        save_arrays_file_atomic(arrays, get_analyzer_res_path(), IncrementalStatistics.NAME)
+
+    def insert_columns(self, columns: Dict[str, np.ndarray]) -> None:
+        """
+        Adds the values of the spaces experiment of an analysis to the ranks.
+
+        :param columns: Dict mapping `<experiment>/<feature>/<metric>` keys to arrays of values
+        """
+        for key, ranks in self.ranks.items():
+            for sample, prefix in enumerate(["spaces/", "spaces/no_"]):
+                column = columns.get(prefix + key)
+                if column is not None:
+                    ranks.insert(column, sample)
+
+    def tests(self) -> Dict[str, Any]:
+        """
+        Returns the Mann-Whitney U tests of the metrics whose ranks could be kept.
+
+        :return: Dict mapping the features and metrics to their test
+        """
+        statistics: Dict[str, Any] = {feature: dict() for feature in Features.as_list()}
+
+        for key, ranks in self.ranks.items():
+            feature, metric = key.split("/")
+            if ranks.valid and min(ranks.sizes()) > 0:
+                statistics[feature][metric] = ranks.mann_whitney_u()
+
+        return statistics
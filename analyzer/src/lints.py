@@ -0,0 +1,82 @@
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from analyzer.src.metrics import Metrics
+from analyzer.src.tree import SpaceTree
+from analyzer.src.values import Values
+
+
+class Lint(str, Enum):
+    """Enum containing the measurements of the clippy lints in a space."""
+    LINTS = "lints"
+    WARNINGS = "warnings"
+    DENSITY = "density"
+
+    def __str__(self) -> str:
+        """
+        Returns the measurement name as a string.
+
+        :return: Measurement name
+        """
+        return self.value
+
+    @staticmethod
+    def as_list() -> List[str]:
+        """
+        Returns a list of all lint measurements.
+
+        :return: List of all lint measurements
+        """
+        return list(map(lambda x: x.value, Lint))
+
+
+class Lints(Metrics):
+    """This class represents the clippy lints found in spaces, including their nested spaces."""
+
+    # Number of source lines of code the lint density refers to
+    DENSITY_SLOC = 1000
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        for name in Lint.as_list():
+            setattr(self, name, Values([data[name]] if data else []))
+
+    @staticmethod
+    def names() -> List[str]:
+        """
+        Returns the names of the lint measurements.
+
+        :return: List of lint measurements
+        """
+        return Lint.as_list()
+
+    @staticmethod
+    def join(tree: SpaceTree, findings: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """
+        Joins the clippy findings of a file to the spaces containing them.
+
+        Each finding is located in its innermost space and the counts are propagated to the
+        ancestors, so the join takes time linear in the number of findings and spaces.
+
+        :param tree: The space tree of the file
+        :param findings: The clippy findings of the file
+        :return: Dict mapping the lint measurements to their value in each space
+        """
+        starts = np.array([finding["start_line"] for finding in findings], dtype=np.int64)
+        ends = np.array([finding["end_line"] for finding in findings], dtype=np.int64)
+        warnings = np.array([finding["kind"] == "warning" for finding in findings], dtype=bool)
+
+        located = tree.locate(starts, ends)
+        inside = located >= 0
+        size = len(tree.spaces)
+
+        lints = tree.propagate(np.bincount(located[inside], minlength=size), np.add)
+        sloc = np.array([space["data"]["loc"]["sloc"] for space in tree.spaces], dtype=np.float64)
+
+        return {
+            str(Lint.LINTS): lints,
+            str(Lint.WARNINGS): tree.propagate(
+                np.bincount(located[inside & warnings], minlength=size), np.add),
+            str(Lint.DENSITY): lints * Lints.DENSITY_SLOC / np.maximum(sloc, 1.)
+        }
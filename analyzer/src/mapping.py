@@ -2,6 +2,8 @@ from __future__ import annotations
 from typing import Any, Dict
 import json
 
+import numpy as np
+
 from analyzer.src.metrics import Metrics
 
 
@@ -38,6 +40,41 @@ class Mapping:
         for feature in self.mapping.keys():
             self.merge_feature(feature, other.get(feature))
 
+    def as_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Returns a columnar representation of the mapping.
+
+        :return: Dict mapping `<feature>/<metric>` keys to arrays of values
+        """
+        return {f"{feature}/{name}": column
+                for feature, metrics in self.mapping.items()
+                for name, column in metrics.as_columns().items()}
+
+    def merge_columns(self, columns: Dict[str, np.ndarray], position: int = 0) -> None:
+        """
+        Merges a columnar representation of another mapping.
+
+        :param columns: Dict mapping `<feature>/<metric>` keys to arrays of values
+        :param position: Position of the columns among the merged columns
+        """
+        grouped: Dict[str, Dict[str, np.ndarray]] = dict()
+        for key, column in columns.items():
+            feature, name = key.split("/", 1)
+            grouped.setdefault(feature, dict())[name] = column
+
+        for feature, feature_columns in grouped.items():
+            if feature in self.mapping:
+                self.get(feature).merge_columns(feature_columns, position)
+
+    def remove_columns(self, position: int) -> None:
+        """
+        Removes the columns merged at a position.
+
+        :param position: Position of the columns
+        """
+        for metrics in self.mapping.values():
+            metrics.remove_columns(position)
+
     def as_dict(self) -> Dict[str, Any]:
         """
         Returns a dict representation of the mapping.
@@ -0,0 +1,152 @@
+import multiprocessing
+import os
+import queue
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+
+class AdaptivePool:
+    """
+    This class runs tasks in a pool of workers while keeping the memory of the parent and the
+    workers below a budget.
+
+    The resident set size of the parent and of all worker processes of the pool is read from
+    `/proc`, so workers count from their start and not only once they returned a result. The
+    number of tasks in flight is halved when the memory gets close to the budget and grows by one
+    task again while there is headroom, like the congestion window of TCP. No new task is started
+    while the budget is exceeded. Each time the pool starts holding back tasks or shrinks the
+    number of tasks in flight counts as a throttle, waiting while the budget stays exceeded does
+    not count again.
+    """
+
+    # Shares of the budget above which the pool shrinks and below which it grows
+    HIGH = .9
+    LOW = .7
+
+    # Seconds between two memory readings while waiting for results
+    POLL_INTERVAL = .5
+
+    def __init__(self, processes: int, max_memory: int = 0) -> None:
+        """
+        :param processes: Number of worker processes
+        :param max_memory: Memory budget in bytes (0 does not limit the memory)
+        """
+        self.pool = multiprocessing.Pool(processes=processes)
+        self.processes = processes
+        self.max_memory = max_memory
+
+        self.limit = processes
+        self.throttled = 0
+        self.holding = False
+        self.memory = 0
+
+    @staticmethod
+    def rss(pid: int) -> int:
+        """
+        Returns the resident set size of a process.
+
+        :param pid: The process id
+        :return: Resident set size in bytes, 0 if it cannot be read
+        """
+        try:
+            with open(f"/proc/{pid}/statm", "r", encoding="utf-8") as statm:
+                return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return 0
+
+    def workers(self) -> List[int]:
+        """
+        Returns the process ids of the workers of the pool, including replaced workers.
+
+        :return: List of process ids
+        """
+        processes: List[Any] = getattr(self.pool, "_pool", [])
+        return [process.pid for process in processes if process.pid is not None]
+
+    def usage(self) -> int:
+        """
+        Returns the memory used by the parent and the workers.
+
+        :return: Resident set size in bytes
+        """
+        self.memory = AdaptivePool.rss(os.getpid()) + sum(map(AdaptivePool.rss, self.workers()))
+        return self.memory
+
+    def adapt(self) -> None:
+        """Shrinks or grows the number of tasks in flight according to the memory usage."""
+        usage = self.usage()
+
+        if usage > AdaptivePool.HIGH * self.max_memory:
+            if self.limit > 1:
+                self.limit = max(1, self.limit // 2)
+                self.throttled += 1
+        elif usage < AdaptivePool.LOW * self.max_memory and self.limit < self.processes:
+            self.limit += 1
+
+    def imap_unordered(
+        self,
+        function: Callable[[Any], Any],
+        tasks: Iterable[Any]
+    ) -> Iterator[Any]:
+        """
+        Runs tasks in the pool and yields their results as soon as they are finished.
+
+        :param function: Function running a task in a worker
+        :param tasks: The tasks
+        :return: Iterator over the results of the tasks
+        """
+        if not self.max_memory:
+            yield from self.pool.imap_unordered(function, tasks)
+            return
+
+        results: queue.Queue[Tuple[bool, Any]] = queue.Queue()
+        remaining = iter(tasks)
+        in_flight = 0
+        exhausted = False
+
+        while not exhausted or in_flight:
+            self.adapt()
+            if self.memory <= self.max_memory:
+                self.holding = False
+
+            while not exhausted and in_flight < self.limit:
+                if in_flight and self.memory > self.max_memory:
+                    if not self.holding:
+                        self.throttled += 1
+                        self.holding = True
+                    break
+
+                task = next(remaining, None)
+                if task is None:
+                    exhausted = True
+                    break
+
+                self.pool.apply_async(function, (task,),
+                                      callback=lambda result: results.put((True, result)),
+                                      error_callback=lambda error: results.put((False, error)))
+                in_flight += 1
+
+            if not in_flight:
+                continue
+
+            try:
+                success, result = results.get(timeout=AdaptivePool.POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+            in_flight -= 1
+            if not success:
+                raise result
+
+            yield result
+
+    def close(self) -> None:
+        """Prevents new tasks from being submitted."""
+        self.pool.close()
+
+    def join(self) -> None:
+        """Waits for the workers to exit."""
+        self.pool.join()
+
+    def terminate(self) -> None:
+        """Stops the workers immediately."""
+        self.pool.terminate()
@@ -1,9 +1,11 @@
 from __future__ import annotations
 from analyzer.src.values import Values
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import json
 from enum import Enum
 
+import numpy as np
+
 
 class Metric(Enum):
     """Enum containing the path to each value in the data dictionary."""
@@ -66,6 +68,15 @@ class Metrics:
                 values = Values([])
             setattr(self, name, values)
 
+    @staticmethod
+    def names() -> List[str]:
+        """
+        Returns the names of the metrics in the suite.
+
+        :return: List of metric names
+        """
+        return Metric.as_list()
+
     def __str__(self) -> str:
         """
         Prints the metrics.
@@ -87,7 +98,89 @@ class Metrics:
 
         :return: Dict containing all metrics
         """
-        return {k: getattr(self, k).as_dict() for k in Metric.as_list()}
+        return {k: getattr(self, k).as_dict() for k in self.names()}
+
+    def items(self) -> List[Tuple[str, Values]]:
+        """
+        Returns the values of each metric.
+
+        :return: List of tuples containing the metric name and its values
+        """
+        return [(name, getattr(self, name)) for name in self.names()]
+
+    def as_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Returns a columnar representation.
+
+        :return: Dict mapping the metric names to arrays of their values
+        """
+        return {name: values.array() for name, values in self.items()}
+
+    def merge_columns(self, columns: Dict[str, np.ndarray], position: int = 0) -> None:
+        """
+        Merges a columnar representation of another metric suite.
+
+        :param columns: Dict mapping the metric names to arrays of their values
+        :param position: Position of the columns among the merged columns
+        """
+        for name, values in self.items():
+            column = columns.get(name)
+            if column is not None:
+                values.merge_array(column, position)
+
+    def remove_columns(self, position: int) -> None:
+        """
+        Removes the columns merged at a position.
+
+        :param position: Position of the columns
+        """
+        for _, values in self.items():
+            values.remove_arrays(position)
+
+    @staticmethod
+    def matrix(suites: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the values of metric suites as a matrix.
+
+        :param suites: The data dictionaries of the metric suites
+        :return: Matrix with a row per suite and a column per metric, missing values are NaN, and
+                 whether each column only contains integers
+        """
+        paths = list(Metric.as_dict().values())
+        rows = [[data[group][name] for group, name in paths] for data in suites]
+        matrix = np.array(rows, dtype=np.float64).reshape(len(rows), len(paths))
+        return matrix, Metrics.integer_columns(rows, matrix)
+
+    @staticmethod
+    def integer_columns(rows: List[List[Any]], matrix: np.ndarray) -> np.ndarray:
+        """
+        Returns which columns of a matrix of metric values were only given as integers.
+
+        Only columns without fractional values are checked for their types, and the check stops
+        at the first value which is not an integer, so columns given as floats cost a single
+        comparison.
+
+        :param rows: The metric values of each suite
+        :param matrix: The values as a matrix, missing values are NaN
+        :return: Boolean array with an entry per column
+        """
+        whole = np.all(np.isnan(matrix) | (matrix == np.floor(matrix)), axis=0)
+        return np.array([bool(whole[j]) and all(type(row[j]) is int for row in rows
+                                                 if row[j] is not None)
+                         for j in range(matrix.shape[1])], dtype=bool)
+
+    def merge_matrix(self, matrix: np.ndarray, integers: Optional[np.ndarray] = None) -> None:
+        """
+        Merges the values of several metric suites given as a matrix.
+
+        :param matrix: Matrix with a row per suite and a column per metric, missing values are NaN
+        :param integers: Whether each column only contains integers, which are merged as integers
+        """
+        for j, (_, values) in enumerate(self.items()):
+            column = matrix[:, j]
+            column = column[~np.isnan(column)]
+            values.merge_array(column.astype(np.int64)
+                               if integers is not None and integers[j] else column)
 
     def merge(self, other: Metrics) -> None:
         """
@@ -95,7 +188,7 @@ class Metrics:
 
         :param other: The other metrics
         """
-        for name in Metric.as_list():
+        for name in self.names():
             self_metric: Values = getattr(self, name)
             other_metric: Values = getattr(other, name)
 
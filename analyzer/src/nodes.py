@@ -0,0 +1,152 @@
+from __future__ import annotations
+from typing import Any, Dict, List
+
+import numpy as np
+
+from analyzer.src.features import Features
+from analyzer.src.mapping import Mapping
+from analyzer.src.metrics import Metric, Metrics
+from analyzer.src.sampling import SUM_SUFFIX
+
+
+# Integer code of each token and the index of its feature, tokens are grouped by feature
+TOKENS = Features.tokens()
+TOKEN_IDS = {token: i for i, token in enumerate(TOKENS)}
+TOKEN_FEATURES = np.repeat(np.arange(len(Features)), [len(feature.value) for feature in Features])
+FEATURE_OFFSETS = np.searchsorted(TOKEN_FEATURES, np.arange(len(Features) + 1))
+
+METRIC_PATHS = list(Metric.as_dict().values())
+
+
+class Nodes(Metrics):
+    """
+    This class represents the metric suites of the nodes of a feature and breaks them down by the
+    tokens of the feature.
+
+    The breakdown keeps the number and the sum of the values of each token and metric. Both are
+    accumulated for all nodes of a result file at once by a single `np.bincount` over the token
+    codes, so no metric suite is created per node.
+    """
+
+    def __init__(self, feature: str) -> None:
+        """
+        :param feature: Name of the feature
+        """
+        super().__init__()
+        self.tokens: List[str] = list(Features.as_dict()[feature])
+
+        shape = (len(self.tokens), len(METRIC_PATHS))
+        self.token_counts = np.zeros(shape, dtype=np.float64)
+        self.token_sums = np.zeros(shape, dtype=np.float64)
+
+    @staticmethod
+    def group(mapping: Mapping, nodes: List[Dict[str, Any]]) -> None:
+        """
+        Adds the nodes of a result file to the features of their tokens.
+
+        The metric values of the nodes with a feature token are gathered into a matrix. Sorting
+        its rows by feature yields the values of each feature, and a single bincount over the
+        token and metric of each value yields the counts and sums of the tokens.
+
+        :param mapping: The mapping of the features to their nodes
+        :param nodes: The nodes of a result file
+        """
+        tokens: List[int] = list()
+        rows: List[List[Any]] = list()
+
+        for node in nodes:
+            token = TOKEN_IDS.get(node["name"])
+            if token is None:
+                continue
+
+            data = node["data"]
+            tokens.append(token)
+            rows.append([data[group][name] for group, name in METRIC_PATHS])
+
+        if not tokens:
+            return
+
+        token_ids = np.array(tokens, dtype=np.int64)
+        values = np.array(rows, dtype=np.float64)
+        integers = Metrics.integer_columns(rows, values)
+        valid = ~np.isnan(values)
+
+        cells = (token_ids[:, None] * len(METRIC_PATHS) + np.arange(len(METRIC_PATHS)))[valid]
+        size = len(TOKENS) * len(METRIC_PATHS)
+        counts = np.bincount(cells, minlength=size).reshape(len(TOKENS), -1)
+        sums = np.bincount(cells, weights=values[valid], minlength=size).reshape(len(TOKENS), -1)
+
+        features = TOKEN_FEATURES[token_ids]
+        order = np.argsort(features, kind="stable")
+        bounds = np.searchsorted(features[order], np.arange(len(Features) + 1))
+
+        for i, feature in enumerate(Features.as_list()):
+            if bounds[i] == bounds[i + 1]:
+                continue
+
+            nodes_metrics = mapping.get(feature)
+            nodes_metrics.merge_matrix(values[order[bounds[i]:bounds[i + 1]]], integers)
+
+            if isinstance(nodes_metrics, Nodes):
+                tokens_of_feature = slice(FEATURE_OFFSETS[i], FEATURE_OFFSETS[i + 1])
+                nodes_metrics.token_counts += counts[tokens_of_feature]
+                nodes_metrics.token_sums += sums[tokens_of_feature]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Returns a dict representation including the breakdown by tokens.
+
+        :return: Dict containing all metrics and the average and count of each token and metric
+        """
+        tokens: Dict[str, Any] = dict()
+        for i, token in enumerate(self.tokens):
+            tokens[token] = {
+                name: {
+                    "average": float(self.token_sums[i, j] / self.token_counts[i, j])
+                    if self.token_counts[i, j] else None,
+                    "count": int(self.token_counts[i, j])
+                } for j, name in enumerate(self.names())
+            }
+
+        return {**super().as_dict(), "tokens": tokens}
+
+    def as_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Returns a columnar representation including the breakdown by tokens.
+
+        :return: Dict mapping the metric names to arrays of their values and the token columns to
+                 the flattened counts and sums
+        """
+        return {
+            **super().as_columns(),
+            "tokens/count" + SUM_SUFFIX: self.token_counts.ravel(),
+            "tokens/sum" + SUM_SUFFIX: self.token_sums.ravel()
+        }
+
+    def merge_columns(self, columns: Dict[str, np.ndarray], position: int = 0) -> None:
+        """
+        Merges a columnar representation of the nodes of another analysis.
+
+        :param columns: Dict mapping the metric names to arrays of their values and the token
+                        columns to the flattened counts and sums
+        :param position: Position of the columns among the merged columns
+        """
+        super().merge_columns(columns, position)
+
+        counts = columns.get("tokens/count" + SUM_SUFFIX)
+        sums = columns.get("tokens/sum" + SUM_SUFFIX)
+        if counts is not None and sums is not None:
+            self.token_counts += counts.reshape(self.token_counts.shape)
+            self.token_sums += sums.reshape(self.token_sums.shape)
+
+    def merge(self, other: Metrics) -> None:
+        """
+        Merges the metric suites and the breakdowns by tokens.
+
+        :param other: The other metrics
+        """
+        super().merge(other)
+
+        if isinstance(other, Nodes):
+            self.token_counts += other.token_counts
+            self.token_sums += other.token_sums
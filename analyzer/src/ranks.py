@@ -0,0 +1,185 @@
+from math import erfc, sqrt
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class SharedRanks:
+    """
+    This class derives several two-sample tests from a single sort of both samples.
+
+    Both samples are sorted together once and reduced to the sorted distinct values and the count
+    of each value per sample. The ranks, the empirical distribution functions and the medians
+    follow from cumulative sums of these counts, so adding a test does not sort the values again.
+    """
+
+    # Largest size of the smaller sample for which samples without ties are tested exactly
+    EXACT_SIZE = 8
+
+    def __init__(self, x: np.ndarray, y: np.ndarray) -> None:
+        """
+        :param x: First sample
+        :param y: Second sample
+        """
+        self.m = len(x)
+        self.n = len(y)
+
+        combined = np.concatenate([x, y])
+        order = np.argsort(combined, kind="stable")
+        sorted_values = combined[order]
+
+        starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+        counts = np.diff(np.r_[starts, len(sorted_values)])
+
+        # Sorted distinct values and how often each of them occurs in both samples
+        self.values: np.ndarray = sorted_values[starts]
+        self.x_counts: np.ndarray = np.add.reduceat((order < self.m).astype(np.int64), starts) \
+            if len(starts) else np.zeros(0, dtype=np.int64)
+        self.y_counts: np.ndarray = counts - self.x_counts
+
+    def u_statistic(self) -> float:
+        """
+        Returns the Mann-Whitney U statistic of the first sample, ties count as one half.
+
+        :return: The U statistic
+        """
+        y_below = np.cumsum(self.y_counts) - .5 * self.y_counts
+        return float(np.dot(self.x_counts, y_below))
+
+    def proportion(self) -> Optional[float]:
+        """
+        Returns the proportion of pairs in which the value of the first sample exceeds the value
+        of the second sample, ties count as one half. This equals the Vargha-Delaney A12 measure.
+
+        :return: The proportion
+        """
+        product = self.m * self.n
+        if not product:
+            return None
+        return self.u_statistic() / product
+
+    def mann_whitney_u(self) -> Dict[str, float]:
+        """
+        Returns the two-sided Mann-Whitney U test with the normal approximation corrected for
+        ties and without continuity correction. Like `scipy.stats.mannwhitneyu`, samples without
+        ties of which at least one has at most `EXACT_SIZE` values use the exact distribution.
+
+        :return: The U statistic and the p-value
+        """
+        ties = (self.x_counts + self.y_counts).astype(np.float64)
+
+        if min(self.m, self.n) <= SharedRanks.EXACT_SIZE and self.m * self.n and \
+                np.all(ties == 1):
+            from scipy.stats import mannwhitneyu
+
+            test = mannwhitneyu(self.values[self.x_counts > 0], self.values[self.y_counts > 0],
+                                alternative="two-sided", method="exact")
+            return {"statistic": float(test.statistic), "p_value": float(test.pvalue)}
+
+        return SharedRanks.normal_test(self.u_statistic(), self.m, self.n,
+                                       float(np.sum(ties ** 3 - ties)))
+
+    @staticmethod
+    def normal_test(u: float, m: int, n: int, tie_sum: float) -> Dict[str, float]:
+        """
+        Returns the two-sided Mann-Whitney U test for a given U statistic using the normal
+        approximation corrected for ties.
+
+        :param u: The U statistic of the first sample
+        :param m: Size of the first sample
+        :param n: Size of the second sample
+        :param tie_sum: Sum of `t^3 - t` over the number `t` of occurrences of each distinct value
+        :return: The U statistic and the p-value
+        """
+        total = m + n
+        tie_term = tie_sum / (total * (total - 1)) if total > 1 else 0.
+        variance = m * n / 12. * (total + 1 - tie_term)
+
+        if variance <= 0:
+            return {"statistic": u, "p_value": 1.}
+
+        z = (u - m * n / 2.) / sqrt(variance)
+        return {"statistic": u, "p_value": min(1., erfc(abs(z) / sqrt(2.)))}
+
+    @staticmethod
+    def p_values(values: np.ndarray, x_counts: np.ndarray, y_counts: np.ndarray) -> np.ndarray:
+        """
+        Returns the p-values of `mann_whitney_u` for samples given as rows of counts of the sorted
+        distinct values, without building the ranks of each pair of samples.
+
+        :param values: Sorted distinct values of all samples
+        :param x_counts: Matrix with the count of each value per first sample
+        :param y_counts: Matrix with the count of each value per second sample
+        :return: p-value of each pair of samples
+        """
+        from scipy.special import erfc as erfc_array
+
+        m = x_counts.sum(axis=1).astype(np.float64)
+        n = y_counts.sum(axis=1).astype(np.float64)
+        total = m + n
+        ties = (x_counts + y_counts).astype(np.float64)
+
+        y_below = np.cumsum(y_counts, axis=1) - .5 * y_counts
+        u = (x_counts * y_below).sum(axis=1)
+
+        tie_term = np.divide(np.sum(ties ** 3 - ties, axis=1), total * (total - 1),
+                             out=np.zeros(len(total)), where=total > 1)
+        variance = m * n / 12. * (total + 1 - tie_term)
+        z = np.divide(u - m * n / 2., np.sqrt(np.maximum(variance, 0.)),
+                      out=np.zeros(len(total)), where=variance > 0)
+        p_values: np.ndarray = np.minimum(1., erfc_array(np.abs(z) / sqrt(2.)))
+
+        # Samples without ties of which one is small are tested exactly
+        exact = (np.minimum(m, n) <= SharedRanks.EXACT_SIZE) & (m * n > 0) & \
+            np.all(ties <= 1, axis=1)
+        for row in np.flatnonzero(exact):
+            p_values[row] = SharedRanks(values[x_counts[row] > 0],
+                                        values[y_counts[row] > 0]).mann_whitney_u()["p_value"]
+
+        return p_values
+
+    def kolmogorov_smirnov(self) -> Dict[str, float]:
+        """
+        Returns the two-sided Kolmogorov-Smirnov test with the asymptotic p-value.
+
+        :return: The largest distance of the empirical distribution functions and the p-value
+        """
+        from scipy.stats import kstwo
+
+        distance = float(np.max(np.abs(
+            np.cumsum(self.x_counts) / self.m - np.cumsum(self.y_counts) / self.n)))
+        effective = round(self.m * self.n / (self.m + self.n))
+
+        return {"statistic": distance, "p_value": float(min(1., kstwo.sf(distance, effective)))}
+
+    def cliffs_delta(self) -> Optional[float]:
+        """
+        Returns Cliff's delta, the difference of the probabilities that a value of the first
+        sample is larger and smaller than a value of the second sample.
+
+        :return: Cliff's delta between -1 and 1
+        """
+        proportion = self.proportion()
+        if proportion is None:
+            return None
+        return 2. * proportion - 1.
+
+    def median(self, counts: np.ndarray, size: int) -> float:
+        """
+        Returns the median of one of the samples.
+
+        :param counts: Count of each distinct value in the sample
+        :param size: Size of the sample
+        :return: The median
+        """
+        cumulative = np.cumsum(counts)
+        positions = np.searchsorted(cumulative, [(size - 1) // 2, size // 2], side="right")
+        return float(np.mean(self.values[positions]))
+
+    def median_difference(self) -> float:
+        """
+        Returns the difference of the medians of both samples.
+
+        :return: The median difference
+        """
+        return self.median(self.x_counts, self.m) - self.median(self.y_counts, self.n)
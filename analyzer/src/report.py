@@ -0,0 +1,255 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from os.path import exists, join
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from analyzer.src.utils import get_analyzer_res_path, load_json_file, save_json_file
+
+
+class Intermediates:
+    """This class holds data shared between the stages, each item is loaded at most once."""
+
+    def __init__(self) -> None:
+        self.data: Dict[str, Any] = dict()
+        self.locks: Dict[str, Lock] = dict()
+        self.lock = Lock()
+
+    def get(self, key: str, load: Callable[[], Any]) -> Any:
+        """
+        Returns an intermediate result and loads it if no stage has provided it yet.
+
+        :param key: Key of the intermediate result
+        :param load: Function loading the intermediate result
+        :return: The intermediate result
+        """
+        with self.lock:
+            key_lock = self.locks.setdefault(key, Lock())
+
+        with key_lock:
+            if key not in self.data:
+                self.data[key] = load()
+            return self.data[key]
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Provides an intermediate result for the following stages.
+
+        :param key: Key of the intermediate result
+        :param value: The intermediate result
+        """
+        with self.lock:
+            key_lock = self.locks.setdefault(key, Lock())
+
+        with key_lock:
+            self.data[key] = value
+
+
+class Stage:
+    """A stage of the report which is only run when its input files have changed."""
+
+    def __init__(
+        self,
+        name: str,
+        inputs: List[str],
+        outputs: List[str],
+        dependencies: List[str],
+        run: Callable[[Intermediates], None],
+        options: Optional[Dict[str, Any]] = None,
+        forks: bool = False
+    ) -> None:
+        """
+        :param name: Name of the stage
+        :param inputs: Files in the analyzer result folder the stage reads
+        :param outputs: Files or folders in the analyzer result folder the stage writes
+        :param dependencies: Names of the stages which have to run before this stage
+        :param run: Function running the stage
+        :param options: Options of the stage, which is rerun when they change like its inputs
+        :param forks: Whether the stage forks worker processes
+        """
+        self.name = name
+        self.inputs = inputs
+        self.outputs = outputs
+        self.dependencies = dependencies
+        self.run = run
+        self.options: Dict[str, Any] = options or dict()
+        self.forks = forks
+
+
+def run_correction(method: str, intermediates: Intermediates) -> None:
+    """
+    Corrects the p-values of the statistic tests.
+
+    :param method: Name of the correction saved as the corrected p-value
+    :param intermediates: Shared intermediate results
+    """
+    from analyzer.scripts.correction import correct_statistics
+
+    statistics = load_json_file(get_analyzer_res_path(), "statistic_tests.json")
+    if not statistics:
+        return
+
+    corrected = correct_statistics(statistics, method)
+    save_json_file(corrected, get_analyzer_res_path(), "corrected_statistic_tests.json")
+    intermediates.set("corrected_statistics", corrected)
+
+
+def run_tables(intermediates: Intermediates) -> None:
+    """
+    Generates the LaTeX tables.
+
+    :param intermediates: Shared intermediate results
+    """
+    from analyzer.scripts.tables import generate_tables
+
+    generate_tables(intermediates.get("corrected_statistics", lambda: load_json_file(
+        get_analyzer_res_path(), "corrected_statistic_tests.json")))
+
+
+def load_results() -> Optional[Dict[str, Any]]:
+    """
+    Loads the raw results.
+
+    :return: The raw results if they exist
+    """
+    return load_json_file(get_analyzer_res_path(), "results_with_raw_values.json")
+
+
+def run_boxplots(intermediates: Intermediates) -> None:
+    """
+    Generates the boxplots.
+
+    :param intermediates: Shared intermediate results
+    """
+    from analyzer.scripts.boxplots import generate_boxplots, spaces_from_results
+
+    results = intermediates.get("results", load_results)
+    if results:
+        generate_boxplots(spaces=spaces_from_results(results))
+
+
+def run_histograms(jobs: int, intermediates: Intermediates) -> None:
+    """
+    Generates the histograms.
+
+    :param jobs: Number of processes rendering the histograms
+    :param intermediates: Shared intermediate results
+    """
+    from analyzer.scripts.histograms import generate_histograms
+
+    results = intermediates.get("results", load_results)
+    if results:
+        generate_histograms(jobs, results)
+
+
+class Report:
+    """This class runs the report scripts as a pipeline of stages."""
+
+    STATE = "report_state.json"
+
+    @staticmethod
+    def stages(jobs: int, correction: str = "bonferroni") -> List[Stage]:
+        """
+        Returns the stages of the report.
+
+        :param jobs: Number of processes rendering the histograms
+        :param correction: Name of the correction saved as the corrected p-value
+        :return: List of stages
+        """
+        return [
+            Stage("correction", ["statistic_tests.json"], ["corrected_statistic_tests.json"],
+                  [], lambda intermediates: run_correction(correction, intermediates),
+                  {"correction": correction}),
+            Stage("tables", ["corrected_statistic_tests.json"], ["tables"],
+                  ["correction"], run_tables),
+            Stage("boxplots", ["results_with_raw_values.json"], ["boxplots"],
+                  [], run_boxplots),
+            Stage("histograms", ["results_with_raw_values.json"], ["histograms"],
+                  [], lambda intermediates: run_histograms(jobs, intermediates), forks=True)
+        ]
+
+    @staticmethod
+    def fingerprint(stage: Stage) -> Dict[str, Any]:
+        """
+        Returns the size and modification time of each input file and the options of a stage.
+
+        :param stage: The stage
+        :return: Dict mapping the input files to their size and modification time and the options
+                 to their values
+        """
+        fingerprint: Dict[str, Any] = dict(stage.options)
+
+        for name in stage.inputs:
+            try:
+                stat = os.stat(join(get_analyzer_res_path(), name))
+                fingerprint[name] = [stat.st_size, stat.st_mtime_ns]
+            except OSError:
+                fingerprint[name] = None
+
+        return fingerprint
+
+    @staticmethod
+    def up_to_date(stage: Stage, state: Dict[str, Any]) -> bool:
+        """
+        Returns whether a stage can be skipped like a make target.
+
+        :param stage: The stage
+        :param state: The input fingerprints of the last runs
+        :return: Whether the inputs are unchanged and all outputs exist
+        """
+        outputs_exist = all(exists(join(get_analyzer_res_path(), name))
+                            for name in stage.outputs)
+        return outputs_exist and state.get(stage.name) == Report.fingerprint(stage)
+
+    @staticmethod
+    def run(jobs: int, correction: str = "bonferroni", force: bool = False) -> None:
+        """
+        Runs all stages whose inputs have changed, independent stages run concurrently.
+
+        :param jobs: Number of processes rendering the histograms
+        :param correction: Name of the correction saved as the corrected p-value
+        :param force: Whether to run all stages regardless of their inputs
+        """
+        stages = {stage.name: stage for stage in Report.stages(jobs, correction)}
+        state: Dict[str, Any] = load_json_file(get_analyzer_res_path(), Report.STATE) or dict()
+        state_lock = Lock()
+        intermediates = Intermediates()
+
+        def run_stage(stage: Stage) -> None:
+            if not force and Report.up_to_date(stage, state):
+                print(f"Skipping {stage.name}, its inputs have not changed.")
+                return
+
+            fingerprint = Report.fingerprint(stage)
+            print(f"Running {stage.name}.")
+            stage.run(intermediates)
+
+            with state_lock:
+                state[stage.name] = fingerprint
+                save_json_file(state, get_analyzer_res_path(), Report.STATE)
+
+        done: Set[str] = set()
+        running: Dict[Future[None], str] = dict()
+
+        with ThreadPoolExecutor(max_workers=len(stages)) as executor:
+            while len(done) < len(stages):
+                ready = [stage for name, stage in stages.items()
+                         if name not in done and name not in running.values() and
+                         all(dependency in done for dependency in stage.dependencies)]
+
+                # Stages forking worker processes run in the main thread while no other stage
+                # runs, as a fork copies the locks held by other threads but not the threads
+                forking = [stage for stage in ready if stage.forks]
+                if forking and not running:
+                    run_stage(forking[0])
+                    done.add(forking[0].name)
+                    continue
+
+                for stage in ready:
+                    if not stage.forks:
+                        running[executor.submit(run_stage, stage)] = stage.name
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    future.result()
+                    done.add(running.pop(future))
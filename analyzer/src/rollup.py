@@ -0,0 +1,435 @@
+from __future__ import annotations
+from os.path import basename, dirname
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from analyzer.src.sampling import PRIORITY_SUFFIX, SUM_SUFFIX
+from analyzer.src.transport import ColumnStore
+from analyzer.src.utils import get_analyzer_res_path
+
+
+class QuantileSketch:
+    """
+    This class maps values to the logarithmic buckets of a mergeable quantile sketch.
+
+    A positive value v falls into the bucket i with gamma^(i - 1) < v <= gamma^i, which is
+    represented by a value within the relative accuracy of all values of the bucket. Negative
+    values use the buckets of their magnitude and zero has a bucket of its own. The buckets are
+    encoded as integers ordered like the values they represent, so sketches are merged by adding
+    the counts of equal codes and quantiles are read from the cumulative counts of sorted codes.
+    """
+
+    RELATIVE_ACCURACY = .01
+    GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+
+    # Added to the bucket indices, so all nonzero doubles have a code with the sign of the value
+    OFFSET = 1 << 16
+
+    @staticmethod
+    def codes(values: np.ndarray) -> np.ndarray:
+        """
+        Returns the bucket codes of values.
+
+        :param values: Finite values
+        :return: Bucket code of each value
+        """
+        codes = np.zeros(len(values), dtype=np.int32)
+        nonzero = values != 0
+
+        indices = np.ceil(np.log(np.abs(values[nonzero])) / np.log(QuantileSketch.GAMMA))
+        codes[nonzero] = np.sign(values[nonzero]) * (indices + QuantileSketch.OFFSET)
+        return codes
+
+    @staticmethod
+    def values(codes: np.ndarray) -> np.ndarray:
+        """
+        Returns the values represented by bucket codes.
+
+        :param codes: Bucket codes
+        :return: Value of each bucket
+        """
+        indices = np.abs(codes).astype(np.float64) - QuantileSketch.OFFSET
+        values: np.ndarray = \
+            np.sign(codes) * 2. * QuantileSketch.GAMMA ** indices / (QuantileSketch.GAMMA + 1)
+        return values
+
+
+class RepoCube:
+    """
+    This class keeps a rollup of the result columns of each repository, from which the results
+    of any subset of the repositories are aggregated without analyzing them again.
+
+    Every repository and column with values forms a cell holding the count, the sum, the sum of
+    squares, the minimum, the maximum and the quantile sketch of its values. The cells are saved
+    in a columnar file sorted by column and repository, with the buckets of all sketches stored
+    back to back. Aggregating a subset selects its cells and merges them per column, which only
+    takes vectorized operations on the cells. Columns of sums and the priorities of sampled values
+    are not part of the cube. The cube of a sampled run keeps the sampling settings, as its cells
+    only hold the sampled values.
+    """
+
+    NAME = "repo_cube"
+
+    STATISTICS = ["count", "sum", "sum_squares", "min", "max"]
+
+    def __init__(self, sampling: Optional[Dict[str, float]] = None) -> None:
+        """
+        :param sampling: The sampling settings of the run if its values are sampled
+        """
+        self.sampling: Dict[str, float] = sampling or dict()
+        self.repos: List[str] = list()
+        self.keys: List[str] = list()
+        self.repo_ids: Dict[str, int] = dict()
+        self.key_ids: Dict[str, int] = dict()
+
+        # Cells which are combined into one cell per repository and column when needed
+        self.batches: List[Dict[str, np.ndarray]] = list()
+        self.combined = True
+
+    @staticmethod
+    def repo_name(path: str) -> str:
+        """
+        Returns the name of a repository.
+
+        :param path: Path of the collector results of the repository
+        :return: Name of the owner and the repository separated by `/`
+        """
+        return f"{basename(dirname(path))}/{basename(path)}"
+
+    @staticmethod
+    def identify(names: List[str], ids: Dict[str, int], name: str) -> int:
+        """
+        Returns the index of a name, which is added if it is new.
+
+        :param names: List of all names
+        :param ids: Dict mapping the names to their index
+        :param name: The name
+        :return: The index of the name
+        """
+        if name not in ids:
+            ids[name] = len(names)
+            names.append(name)
+
+        return ids[name]
+
+    def add(self, path: str, columns: Dict[str, np.ndarray]) -> None:
+        """
+        Adds the result columns of a repository or a chunk of its files.
+
+        :param path: Path of the collector results of the repository
+        :param columns: Dict mapping `<experiment>/<feature>/<metric>` keys to arrays of values
+        """
+        self.add_repo(RepoCube.repo_name(path), columns)
+
+    def add_repo(self, name: str, columns: Dict[str, np.ndarray]) -> None:
+        """
+        Adds the result columns of a repository given by its name.
+
+        :param name: Name of the repository
+        :param columns: Dict mapping `<experiment>/<feature>/<metric>` keys to arrays of values
+        """
+        repo = RepoCube.identify(self.repos, self.repo_ids, name)
+        cells: Dict[str, List[Any]] = {name: list() for name in
+                                       ["cell_key", *RepoCube.STATISTICS, "buckets", "counts"]}
+
+        for key, column in columns.items():
+            if key.endswith(SUM_SUFFIX) or key.endswith(PRIORITY_SUFFIX):
+                continue
+
+            values = np.asarray(column, dtype=np.float64)
+            values = values[np.isfinite(values)]
+
+            if not len(values):
+                continue
+
+            buckets, counts = np.unique(QuantileSketch.codes(values), return_counts=True)
+
+            cells["cell_key"].append(RepoCube.identify(self.keys, self.key_ids, key))
+            cells["count"].append(len(values))
+            cells["sum"].append(values.sum())
+            cells["sum_squares"].append(np.dot(values, values))
+            cells["min"].append(values.min())
+            cells["max"].append(values.max())
+            cells["buckets"].append(buckets)
+            cells["counts"].append(counts)
+
+        if not cells["cell_key"]:
+            return
+
+        self.batches.append({
+            "cell_repo": np.full(len(cells["cell_key"]), repo, dtype=np.int32),
+            "cell_key": np.array(cells["cell_key"], dtype=np.int32),
+            "count": np.array(cells["count"], dtype=np.int64),
+            "sum": np.array(cells["sum"], dtype=np.float64),
+            "sum_squares": np.array(cells["sum_squares"], dtype=np.float64),
+            "min": np.array(cells["min"], dtype=np.float64),
+            "max": np.array(cells["max"], dtype=np.float64),
+            "sketch_offsets": np.r_[0, np.cumsum(list(map(len, cells["buckets"])))],
+            "sketch_buckets": np.concatenate(cells["buckets"]).astype(np.int32),
+            "sketch_counts": np.concatenate(cells["counts"]).astype(np.int64)
+        })
+        self.combined = False
+
+    def merge(self, other: RepoCube) -> None:
+        """
+        Merges the cells of another cube.
+
+        :param other: The other cube
+        """
+        cells = other.cells()
+        self.sampling = self.sampling or other.sampling
+
+        if not len(cells["cell_key"]):
+            return
+
+        repos = np.array([RepoCube.identify(self.repos, self.repo_ids, repo)
+                          for repo in other.repos], dtype=np.int32)
+        keys = np.array([RepoCube.identify(self.keys, self.key_ids, key)
+                         for key in other.keys], dtype=np.int32)
+
+        self.batches.append({**cells, "cell_repo": repos[cells["cell_repo"]],
+                             "cell_key": keys[cells["cell_key"]]})
+        self.combined = False
+
+    def cells(self) -> Dict[str, np.ndarray]:
+        """
+        Returns one cell per repository and column, sorted by column and repository.
+
+        :return: Dict mapping the names of the cell arrays to the arrays
+        """
+        if not self.batches:
+            return RepoCube.empty()
+
+        if not self.combined:
+            cells = RepoCube.concatenate(self.batches)
+            groups = cells["cell_key"].astype(np.int64) * len(self.repos) + cells["cell_repo"]
+            self.batches = [RepoCube.combine(cells, groups)]
+            self.combined = True
+
+        return self.batches[0]
+
+    def as_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Returns the cube as columns of a columnar file.
+
+        :return: Dict mapping the names of the arrays to the arrays
+        """
+        return {"repos": np.array(self.repos, dtype=str), "keys": np.array(self.keys, dtype=str),
+                "sampling_names": np.array(list(self.sampling.keys()), dtype=str),
+                "sampling_values": np.array(list(self.sampling.values()), dtype=np.float64),
+                **self.cells()}
+
+    @staticmethod
+    def from_columns(columns: Dict[str, np.ndarray]) -> RepoCube:
+        """
+        Returns the cube of the columns of a columnar file.
+
+        :param columns: Dict mapping the names of the arrays to the arrays
+        :return: The cube
+        """
+        cube = RepoCube()
+        if "sampling_names" in columns:
+            cube.sampling = dict(zip(columns["sampling_names"].tolist(),
+                                     columns["sampling_values"].tolist()))
+        cube.repos = columns["repos"].tolist()
+        cube.keys = columns["keys"].tolist()
+        cube.repo_ids = {repo: i for i, repo in enumerate(cube.repos)}
+        cube.key_ids = {key: i for i, key in enumerate(cube.keys)}
+        cube.batches = [{name: column for name, column in columns.items()
+                         if name not in ["repos", "keys", "sampling_names", "sampling_values"]}]
+        return cube
+
+    def save(self) -> None:
+        """Saves the cube in the result folder."""
+        ColumnStore.save(self.as_columns(), get_analyzer_res_path(), RepoCube.NAME)
+
+    @staticmethod
+    def load() -> Optional[RepoCube]:
+        """
+        Loads the cube of the last analysis, whose cells are memory mapped.
+
+        :return: The cube if it was saved
+        """
+        columns = ColumnStore.load(get_analyzer_res_path(), RepoCube.NAME)
+        return RepoCube.from_columns(columns) if columns is not None else None
+
+    def select_repos(self, repos: Optional[Iterable[str]] = None,
+                     exclude: Iterable[str] = ()) -> np.ndarray:
+        """
+        Returns the repositories of a subset.
+
+        :param repos: Names of repositories or owners to include (defaults to all repositories)
+        :param exclude: Names of repositories or owners to exclude
+        :return: Boolean mask of the selected repositories
+        """
+        def matches(names: List[str]) -> np.ndarray:
+            prefixes = tuple(f"{name}/" for name in names)
+            return np.array([repo in names or repo.startswith(prefixes) for repo in self.repos],
+                            dtype=bool)
+
+        selected = matches(list(repos)) if repos is not None else np.ones(len(self.repos), bool)
+        subset: np.ndarray = selected & ~matches(list(exclude))
+        return subset
+
+    def aggregate(
+        self,
+        repos: Optional[Iterable[str]] = None,
+        exclude: Iterable[str] = (),
+        quantiles: Sequence[float] = (.25, .5, .75)
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Aggregates the values of each column over a subset of the repositories.
+
+        :param repos: Names of repositories or owners to include (defaults to all repositories)
+        :param exclude: Names of repositories or owners to exclude
+        :param quantiles: Quantiles to estimate from the sketches
+        :return: Dict mapping the column keys to their count, sum, average, standard deviation,
+                 minimum, maximum and quantiles
+        """
+        cells = self.cells()
+        selected = self.select_repos(repos, exclude)
+        subset = RepoCube.select(cells, selected[cells["cell_repo"]])
+
+        if not len(subset["cell_key"]):
+            return dict()
+
+        columns = RepoCube.combine(subset, subset["cell_key"])
+        estimates = RepoCube.quantiles(columns, quantiles)
+
+        count = columns["count"].astype(np.float64)
+        average = columns["sum"] / count
+        variance = np.maximum(columns["sum_squares"] / count - average ** 2, 0.)
+
+        return {self.keys[key]: {
+            "count": int(columns["count"][i]),
+            "sum": float(columns["sum"][i]),
+            "average": float(average[i]),
+            "std": float(np.sqrt(variance[i])),
+            "min": float(columns["min"][i]),
+            "max": float(columns["max"][i]),
+            "quantiles": {str(q): float(estimates[j, i]) for j, q in enumerate(quantiles)}
+        } for i, key in enumerate(columns["cell_key"].tolist())}
+
+    @staticmethod
+    def empty() -> Dict[str, np.ndarray]:
+        """
+        Returns cells without any cell.
+
+        :return: Dict mapping the names of the cell arrays to empty arrays
+        """
+        return {
+            "cell_repo": np.zeros(0, dtype=np.int32),
+            "cell_key": np.zeros(0, dtype=np.int32),
+            **{name: np.zeros(0, dtype=np.int64 if name == "count" else np.float64)
+               for name in RepoCube.STATISTICS},
+            "sketch_offsets": np.zeros(1, dtype=np.int64),
+            "sketch_buckets": np.zeros(0, dtype=np.int32),
+            "sketch_counts": np.zeros(0, dtype=np.int64)
+        }
+
+    @staticmethod
+    def concatenate(batches: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+        """
+        Concatenates batches of cells.
+
+        :param batches: The batches of cells
+        :return: The cells of all batches
+        """
+        cells = {name: np.concatenate([batch[name] for batch in batches])
+                 for name in batches[0] if name != "sketch_offsets"}
+
+        sizes = np.concatenate([np.diff(batch["sketch_offsets"]) for batch in batches])
+        cells["sketch_offsets"] = np.r_[0, np.cumsum(sizes)]
+        return cells
+
+    @staticmethod
+    def select(cells: Dict[str, np.ndarray], mask: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Returns a subset of cells together with their sketches.
+
+        :param cells: The cells
+        :param mask: Boolean mask of the cells to keep
+        :return: The selected cells
+        """
+        offsets = np.asarray(cells["sketch_offsets"])
+        starts = offsets[:-1][mask]
+        sizes = offsets[1:][mask] - starts
+
+        # Position of each bucket of the selected sketches in the buckets of all sketches
+        new_offsets = np.r_[0, np.cumsum(sizes)]
+        entries = np.arange(new_offsets[-1]) + np.repeat(starts - new_offsets[:-1], sizes)
+
+        return {
+            **{name: np.asarray(cells[name])[mask]
+               for name in ["cell_repo", "cell_key", *RepoCube.STATISTICS]},
+            "sketch_offsets": new_offsets,
+            "sketch_buckets": np.asarray(cells["sketch_buckets"])[entries],
+            "sketch_counts": np.asarray(cells["sketch_counts"])[entries]
+        }
+
+    @staticmethod
+    def combine(cells: Dict[str, np.ndarray], groups: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Merges the cells of each group into a single cell.
+
+        :param cells: The cells
+        :param groups: Group of each cell, the merged cells are sorted by group
+        :return: One cell per group, which keeps the repository and column of its first cell
+        """
+        if not len(groups):
+            return cells
+
+        order = np.argsort(groups, kind="stable")
+        sorted_groups = groups[order]
+        starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+
+        combined = {
+            "cell_repo": np.asarray(cells["cell_repo"])[order][starts],
+            "cell_key": np.asarray(cells["cell_key"])[order][starts],
+            "count": np.add.reduceat(np.asarray(cells["count"])[order], starts),
+            "sum": np.add.reduceat(np.asarray(cells["sum"])[order], starts),
+            "sum_squares": np.add.reduceat(np.asarray(cells["sum_squares"])[order], starts),
+            "min": np.minimum.reduceat(np.asarray(cells["min"])[order], starts),
+            "max": np.maximum.reduceat(np.asarray(cells["max"])[order], starts)
+        }
+
+        # Buckets of equal code are added up within the merged sketch of each group
+        sizes = np.diff(cells["sketch_offsets"])
+        entry_groups = np.repeat(np.searchsorted(sorted_groups[starts], groups), sizes)
+        buckets = np.asarray(cells["sketch_buckets"])
+        entry_order = np.lexsort((buckets, entry_groups))
+        entry_groups, buckets = entry_groups[entry_order], buckets[entry_order]
+
+        distinct = np.flatnonzero(np.r_[True, (entry_groups[1:] != entry_groups[:-1]) |
+                                        (buckets[1:] != buckets[:-1])])
+        combined["sketch_buckets"] = buckets[distinct]
+        combined["sketch_counts"] = np.add.reduceat(
+            np.asarray(cells["sketch_counts"])[entry_order], distinct)
+        combined["sketch_offsets"] = np.r_[0, np.cumsum(
+            np.bincount(entry_groups[distinct], minlength=len(starts)))]
+
+        return combined
+
+    @staticmethod
+    def quantiles(cells: Dict[str, np.ndarray], quantiles: Sequence[float]) -> np.ndarray:
+        """
+        Estimates quantiles from the sketches of cells.
+
+        :param cells: The cells, whose sketches are sorted by code
+        :param quantiles: The quantiles between 0 and 1
+        :return: Array with the estimate of each quantile and cell
+        """
+        offsets = cells["sketch_offsets"]
+        cumulative = np.cumsum(cells["sketch_counts"])
+        before = np.r_[0, cumulative][offsets[:-1]]
+        values = QuantileSketch.values(cells["sketch_buckets"])
+
+        estimates = np.empty((len(quantiles), len(cells["count"])))
+        for i, q in enumerate(quantiles):
+            ranks = before + np.floor(q * (cells["count"] - 1))
+            estimates[i] = values[np.searchsorted(cumulative, ranks, side="right")]
+
+        # The bucket values of the extremes may lie slightly outside of the exact extremes
+        clipped: np.ndarray = np.clip(estimates, cells["min"], cells["max"])
+        return clipped
@@ -0,0 +1,183 @@
+from typing import Dict
+from zlib import crc32
+
+import numpy as np
+
+
+PRIORITY_SUFFIX = "#priority"
+
+# Suffix of columns holding sums, which are added up when merging instead of being sampled
+SUM_SUFFIX = "#sum"
+
+
+class Sampler:
+    """
+    This class draws reproducible samples of the result columns for fast approximate analyses.
+
+    Every result file and every value is assigned a uniform random priority, which is seeded by
+    the sampler seed, the repository and the file or the column. Sampling by priority makes each
+    step independent of the order in which repositories are analyzed:
+
+    * `fraction` keeps each result file with the given probability (priority below the fraction)
+      before it is read, so reading, parsing and analyzing the files shrink with the fraction. The
+      values of a kept file are all kept, which makes the sample a cluster sample of the files.
+    * `repo_cap` keeps at most this many values per repository and column (the lowest priorities),
+      which stratifies by repository so huge crates do not dominate.
+    * `reservoir_size` keeps at most this many values per column over the whole run. This is a
+      reservoir sample which is maintained by keeping the lowest priorities while merging.
+
+    Columns of sums, which end in `SUM_SUFFIX`, are kept unchanged.
+    """
+
+    def __init__(
+        self,
+        fraction: float = 1.,
+        repo_cap: int = 0,
+        reservoir_size: int = 0,
+        seed: int = 0
+    ) -> None:
+        self.fraction = fraction
+        self.repo_cap = repo_cap
+        self.reservoir_size = reservoir_size
+        self.seed = seed
+
+    def active(self) -> bool:
+        """
+        Returns whether any sampling is done.
+
+        :return: Whether the sampler changes the results
+        """
+        return self.fraction < 1. or self.repo_cap > 0 or self.reservoir_size > 0
+
+    def settings(self) -> Dict[str, float]:
+        """
+        Returns the sampling settings.
+
+        :return: Dict containing the sampling settings
+        """
+        return {
+            "fraction": self.fraction,
+            "repo_cap": self.repo_cap,
+            "reservoir_size": self.reservoir_size,
+            "seed": self.seed
+        }
+
+    def generator(self, *keys: str) -> np.random.Generator:
+        """
+        Returns a random generator which only depends on the seed and the given keys.
+
+        :param keys: Keys identifying the sampled data, e.g. repository and column
+        :return: Seeded random generator
+        """
+        return np.random.default_rng([self.seed, *[crc32(key.encode("utf-8")) for key in keys]])
+
+    def sample_files(self, path: str, files: Dict[str, int]) -> Dict[str, int]:
+        """
+        Samples the result files of a repository.
+
+        :param path: Path of the repository
+        :param files: Dict mapping the result files to their sizes
+        :return: The kept result files with their sizes
+        """
+        if self.fraction >= 1.:
+            return files
+
+        return {file: size for file, size in files.items()
+                if self.generator(path, file).random() < self.fraction}
+
+    def sample_repo(self, columns: Dict[str, np.ndarray], path: str) -> Dict[str, np.ndarray]:
+        """
+        Samples the result columns of a repository.
+
+        :param columns: Dict mapping column keys to arrays of values
+        :param path: Path of the repository
+        :return: Sampled columns, including priority columns if a reservoir is kept
+        """
+        if self.repo_cap <= 0 and self.reservoir_size <= 0:
+            return columns
+
+        sampled: Dict[str, np.ndarray] = dict()
+
+        for key, column in columns.items():
+            if key.endswith(SUM_SUFFIX):
+                sampled[key] = column
+                continue
+
+            priorities = self.generator(path, key).random(len(column))
+
+            if self.repo_cap > 0 and len(column) > self.repo_cap:
+                lowest = np.argpartition(priorities, self.repo_cap - 1)[:self.repo_cap]
+                column, priorities = column[lowest], priorities[lowest]
+
+            sampled[key] = column
+            if self.reservoir_size > 0:
+                sampled[key + PRIORITY_SUFFIX] = priorities
+
+        return sampled
+
+
+class Reservoir:
+    """This class keeps the values with the lowest priorities per column."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.values: Dict[str, np.ndarray] = dict()
+        self.priorities: Dict[str, np.ndarray] = dict()
+
+    def merge_columns(self, columns: Dict[str, np.ndarray]) -> None:
+        """
+        Merges sampled columns with priorities into the reservoir.
+
+        :param columns: Columns as returned by `Sampler.sample_repo`
+        """
+        for key, column in columns.items():
+            if key.endswith(PRIORITY_SUFFIX):
+                continue
+
+            if key.endswith(SUM_SUFFIX):
+                self.values[key] = self.values[key] + column if key in self.values else column
+                continue
+
+            priorities = columns[key + PRIORITY_SUFFIX]
+
+            if key in self.values:
+                column = np.concatenate([self.values[key], column])
+                priorities = np.concatenate([self.priorities[key], priorities])
+
+            if len(column) > self.size:
+                kept = np.argpartition(priorities, self.size - 1)[:self.size]
+                column, priorities = column[kept], priorities[kept]
+
+            self.values[key] = column
+            self.priorities[key] = priorities
+
+    def as_columns(self, with_priorities: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Returns the columns of the reservoir.
+
+        :param with_priorities: Whether to include the priority columns
+        :return: Dict mapping column keys to arrays of values
+        """
+        columns = dict(self.values)
+        if with_priorities:
+            columns.update({key + PRIORITY_SUFFIX: priorities
+                            for key, priorities in self.priorities.items()})
+        return columns
+
+
+def sample_values(
+    values: np.ndarray,
+    fraction: float,
+    generator: np.random.Generator
+) -> np.ndarray:
+    """
+    Keeps each value with the given probability.
+
+    :param values: Array of values
+    :param fraction: Probability of keeping a value
+    :param generator: Random generator
+    :return: Sampled values
+    """
+    if fraction >= 1.:
+        return values
+    return values[generator.random(len(values)) < fraction]
@@ -0,0 +1,105 @@
+from typing import Dict, List, Tuple
+
+
+# Key identifying a task, its repository path, its result files and its estimated cost
+ScheduledTask = Tuple[str, str, List[str], int]
+
+
+class Scheduler:
+    """
+    This class orders the repositories of a run so the pool stays busy until the end.
+
+    The cost of a repository is estimated by the size of its result files, which is gathered while
+    discovering the repositories. Tasks are dispatched largest first, so the largest repositories
+    do not end up at the tail of the run while all other workers are idle. Repositories larger
+    than the chunk size are split into consecutive chunks of files of similar size, whose results
+    are merged into the same accumulators like the results of whole repositories. Each task has a
+    position in the order of the repositories and their chunks, so the merged values keep the
+    order of analyzing the repositories one after another.
+    """
+
+    # Number of chunks per worker the automatic chunk size aims at
+    CHUNKS_PER_PROCESS = 4
+
+    @staticmethod
+    def chunk_size(sizes: Dict[str, Dict[str, int]], processes: int) -> int:
+        """
+        Returns the automatic chunk size, which splits the total size into a few chunks per worker.
+
+        :param sizes: Dict mapping repository paths to the size of each result file
+        :param processes: Number of worker processes
+        :return: Maximum number of bytes of a task
+        """
+        total = sum(sum(files.values()) for files in sizes.values())
+        return max(1, total // (processes * Scheduler.CHUNKS_PER_PROCESS))
+
+    @staticmethod
+    def split(files: Dict[str, int], chunks: int) -> List[List[str]]:
+        """
+        Splits files into consecutive chunks of similar size, a chunk ends once the files up to
+        it hold their share of the total size.
+
+        :param files: Dict mapping the result files to their size
+        :param chunks: Number of chunks
+        :return: List of the files of each chunk in the order of the files
+        """
+        total = sum(files.values())
+        split: List[List[str]] = [list()]
+        size = 0
+
+        for name, file_size in files.items():
+            split[-1].append(name)
+            size += file_size
+
+            if len(split) < chunks and size * chunks >= total * len(split):
+                split.append(list())
+
+        return [chunk for chunk in split if chunk]
+
+    @staticmethod
+    def schedule(
+        repos: Dict[str, List[str]],
+        sizes: Dict[str, Dict[str, int]],
+        chunk_size: int = 0
+    ) -> List[ScheduledTask]:
+        """
+        Returns the tasks of the repositories ordered by their cost, largest first.
+
+        :param repos: Dict mapping repository paths to the result files to analyze
+        :param sizes: Dict mapping repository paths to the size of each result file
+        :param chunk_size: Maximum number of bytes of a task (0 does not split repositories)
+        :return: List of tasks, a repository split into chunks has one task per chunk whose key is
+                 the repository path followed by `#` and the chunk index
+        """
+        tasks: List[ScheduledTask] = list()
+
+        for path, files in repos.items():
+            file_sizes = {name: sizes.get(path, dict()).get(name, 0) for name in files}
+            cost = sum(file_sizes.values())
+
+            chunks = -(-cost // chunk_size) if chunk_size > 0 else 1
+            if chunks <= 1:
+                tasks.append((path, path, files, cost))
+                continue
+
+            for i, chunk in enumerate(Scheduler.split(file_sizes, chunks)):
+                tasks.append((f"{path}#{i}", path, chunk, sum(file_sizes[name] for name in chunk)))
+
+        return sorted(tasks, key=lambda task: task[3], reverse=True)
+
+    @staticmethod
+    def positions(repos: Dict[str, List[str]], tasks: List[ScheduledTask]) -> Dict[str, int]:
+        """
+        Returns the position of each task in the order of the repositories and their chunks.
+
+        :param repos: Dict mapping repository paths to the result files to analyze
+        :param tasks: The scheduled tasks
+        :return: Dict mapping the task keys to their positions
+        """
+        repo_ids = {path: i for i, path in enumerate(repos)}
+
+        def order(task: ScheduledTask) -> Tuple[int, int]:
+            key, path, _, _ = task
+            return repo_ids[path], int(key[len(path) + 1:]) if key != path else 0
+
+        return {task[0]: i for i, task in enumerate(sorted(tasks, key=order))}
@@ -1,17 +1,29 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from enum import Enum
+import multiprocessing
 
 from analyzer.src.experiments import Experiment
 from analyzer.src.values import Values
 from analyzer.src.metrics import Metric
 from analyzer.src.features import Features
 from analyzer.src.utils import get_analyzer_res_path, load_json_file, save_json_file
+from analyzer.src.sampling import Sampler, sample_values
+from analyzer.src.bootstrap import Bootstrap
+from analyzer.src.ranks import SharedRanks
+from analyzer.src.cooccurrence import Cooccurrence
+from analyzer.src.incremental import IncrementalStatistics
+from analyzer.src.external import ExternalRanks
+from analyzer.src.transport import ColumnStore
+from analyzer.src.cache import TestCache
 
-import scipy.stats as st
+import numpy as np
 
 
 class Tests(str, Enum):
     MANN_WHITNEY_U = "mann_whitney_u"
+    KOLMOGOROV_SMIRNOV = "kolmogorov_smirnov"
+    CLIFFS_DELTA = "cliffs_delta"
+    VARGHA_DELANEY_A12 = "vargha_delaney_a12"
 
     def __str__(self) -> str:
         """
@@ -30,6 +42,15 @@ class Tests(str, Enum):
         """
         return list(map(lambda x: x.value, Tests))
 
+    @staticmethod
+    def significance_tests() -> List[str]:
+        """
+        Returns a list of the statistic tests which compute a p-value.
+
+        :return: List of significance tests
+        """
+        return [str(Tests.MANN_WHITNEY_U), str(Tests.KOLMOGOROV_SMIRNOV)]
+
     @staticmethod
     def proportion(u: float, m: float, n: float) -> Optional[float]:
         """
@@ -54,14 +75,42 @@ class Statistics:
     """This class handles statistic significance tests."""
 
     @staticmethod
-    def analyze_results() -> None:
-        """Runs statistic tests on the result data."""
+    def analyze_results(
+        sampler: Optional[Sampler] = None,
+        bootstrap_resamples: int = 0,
+        effect_size_resamples: int = 0,
+        cache_size: int = 0
+    ) -> None:
+        """
+        Runs statistic tests on the result data.
+
+        :param sampler: Sampler whose fraction and seed are used to test a sample of the values
+        :param bootstrap_resamples: Number of resamples for the error bars of sampled results
+        :param effect_size_resamples: Number of resamples for the confidence intervals of the
+                                      proportion and the median difference
+        :param cache_size: Maximum size in bytes of the cache of the test results (0 disables it)
+        """
         result = load_json_file(get_analyzer_res_path(), name="results_with_raw_values.json")
 
         if not result:
             return
 
-        statistics = dict()
+        sampler = sampler or Sampler()
+        statistics: Dict[str, Any] = dict()
+
+        # Results of a sampled analysis are not sampled a second time
+        fraction = 1. if result.get("sampling") else sampler.fraction
+
+        if sampler.active() or result.get("sampling"):
+            statistics["sampling"] = result.get("sampling", sampler.settings())
+
+        # Samples of each test whose effect sizes are bootstrapped after all tests have run
+        effect_size_tasks: List[Tuple[Dict[str, Any], Tuple[Any, ...]]] = list()
+
+        # Results of the tests which were not cached, stored once their effect sizes are added
+        cache = TestCache(cache_size)
+        computed: List[Tuple[str, Dict[str, Any]]] = list()
+        bootstrapped = bootstrap_resamples if "sampling" in statistics else 0
 
         spaces = result.get(Experiment.SPACES)
         if spaces:
@@ -77,19 +126,222 @@ class Statistics:
                     values_not_used = Values(spaces["no_" + feature]
                                              [metric]["values"]).filtered_values()
 
+                    if fraction < 1.:
+                        generator = sampler.generator("statistics", feature, metric)
+                        values_used = sample_values(
+                            np.array(values_used), fraction, generator).tolist()
+                        values_not_used = sample_values(
+                            np.array(values_not_used), fraction, generator).tolist()
+
                     min_len = min([len(values_used), len(values_not_used)])
 
                     if min_len == 0:
                         continue
 
-                    test_result = st.mannwhitneyu(
-                        values_used, values_not_used, use_continuity=False)
+                    # The samples are only hashed if the cache is enabled
+                    key = TestCache.key([np.array(values_used), np.array(values_not_used)], {
+                        "experiment": str(Experiment.SPACES), "feature": feature,
+                        "metric": metric, "seed": sampler.seed,
+                        "bootstrap_resamples": bootstrapped,
+                        "effect_size_resamples": effect_size_resamples}) if cache_size else ""
+
+                    cached = cache.get(key)
+                    if cached is not None:
+                        spaces_statistics[feature][metric] = cached
+                        continue
 
-                    spaces_statistics[feature][metric][str(Tests.MANN_WHITNEY_U)] = {
-                        "statistic": test_result[0],
-                        "p_value": test_result[1],
-                        "proportion": Tests.proportion(test_result[0], len(values_used), len(values_not_used))
+                    ranks = SharedRanks(np.array(values_used), np.array(values_not_used))
+                    mann_whitney_u = ranks.mann_whitney_u()
+
+                    test_statistics: Dict[str, Any] = {
+                        **mann_whitney_u,
+                        "proportion": Tests.proportion(mann_whitney_u["statistic"], len(values_used), len(values_not_used)),
+                        "median_difference": ranks.median_difference()
                     }
 
+                    if effect_size_resamples > 0:
+                        effect_size_tasks.append((test_statistics, (
+                            ranks.values,
+                            ranks.x_counts,
+                            ranks.y_counts,
+                            effect_size_resamples,
+                            sampler.generator("effect_sizes", feature, metric)
+                        )))
+
+                    if bootstrapped > 0:
+                        test_statistics["p_value_interval"] = Bootstrap.two_sample_interval(
+                            ranks.values,
+                            ranks.x_counts,
+                            ranks.y_counts,
+                            SharedRanks.p_values,
+                            bootstrap_resamples,
+                            sampler.generator("bootstrap", feature, metric)
+                        )
+
+                    spaces_statistics[feature][metric] = {
+                        str(Tests.MANN_WHITNEY_U): test_statistics,
+                        str(Tests.KOLMOGOROV_SMIRNOV): ranks.kolmogorov_smirnov(),
+                        str(Tests.CLIFFS_DELTA): {"statistic": ranks.cliffs_delta()},
+                        str(Tests.VARGHA_DELANEY_A12): {"statistic": ranks.proportion()}
+                    }
+                    computed.append((key, spaces_statistics[feature][metric]))
+
             statistics[str(Experiment.SPACES)] = spaces_statistics
+
+        cooccurrence = result.get(Experiment.COOCCURRENCE)
+        if cooccurrence:
+            cooccurrence_statistics: Dict[str, Any] = {f"{first}+{second}": dict()
+                                                       for first, second in Cooccurrence.pairs()}
+
+            for metric in Metric.as_list():
+                columns = [np.array(Values(cooccurrence[key][metric]["values"]).filtered_values(),
+                                    dtype=np.float64) for key in Cooccurrence.keys()]
+
+                for first, second in Cooccurrence.pairs():
+                    pair = f"{first}+{second}"
+                    cooccurrence_statistics[pair][metric] = dict()
+
+                    values_both, values_one = Cooccurrence.pair_samples(columns, first, second)
+
+                    if fraction < 1.:
+                        generator = sampler.generator("statistics", pair, metric)
+                        values_both = sample_values(values_both, fraction, generator)
+                        values_one = sample_values(values_one, fraction, generator)
+
+                    if min(len(values_both), len(values_one)) == 0:
+                        continue
+
+                    key = TestCache.key([values_both, values_one], {
+                        "experiment": str(Experiment.COOCCURRENCE), "pair": pair,
+                        "metric": metric}) if cache_size else ""
+
+                    cached = cache.get(key)
+                    if cached is not None:
+                        cooccurrence_statistics[pair][metric] = cached
+                        continue
+
+                    ranks = SharedRanks(values_both, values_one)
+                    mann_whitney_u = ranks.mann_whitney_u()
+
+                    cooccurrence_statistics[pair][metric] = {
+                        str(Tests.MANN_WHITNEY_U): {
+                            **mann_whitney_u,
+                            "proportion": Tests.proportion(
+                                mann_whitney_u["statistic"], len(values_both), len(values_one)),
+                            "median_difference": ranks.median_difference()
+                        }
+                    }
+                    computed.append((key, cooccurrence_statistics[pair][metric]))
+
+            statistics[str(Experiment.COOCCURRENCE)] = cooccurrence_statistics
+
+        if effect_size_tasks:
+            Statistics.add_effect_size_intervals(effect_size_tasks)
+
+        if cache_size:
+            for key, test in computed:
+                cache.put(key, test)
+            cache.evict()
+            print(cache.summary())
+
         save_json_file(statistics, get_analyzer_res_path(), name="statistic_tests.json")
+
+    @staticmethod
+    def refresh_incremental() -> None:
+        """
+        Runs the Mann-Whitney U tests of the discrete metrics on the incremental ranks, which does
+        not load the raw values, and updates them and the effect sizes derived from them in the
+        statistic tests.
+        """
+        tests = IncrementalStatistics.load().tests()
+
+        statistics = {str(Experiment.SPACES): {
+            feature: {metric: {
+                str(Tests.MANN_WHITNEY_U): test,
+                str(Tests.CLIFFS_DELTA): {"statistic": 2. * test["proportion"] - 1.
+                                          if test["proportion"] is not None else None},
+                str(Tests.VARGHA_DELANEY_A12): {"statistic": test["proportion"]}
+            } for metric, test in metrics.items()}
+            for feature, metrics in tests.items()}}
+
+        Statistics.update_tests(statistics)
+
+    @staticmethod
+    def analyze_out_of_core(budget: int) -> None:
+        """
+        Runs the Mann-Whitney U tests of the spaces on the columnar store, sorting the values on
+        disk so the memory stays below a budget regardless of the number of values.
+
+        :param budget: Memory budget in bytes
+        """
+        from tqdm import tqdm
+
+        columns = ColumnStore.load(get_analyzer_res_path(), "results_columns")
+
+        if not columns:
+            return
+
+        ranks = ExternalRanks(budget)
+        spaces_statistics: Dict[str, Any] = dict()
+
+        for feature in tqdm(Features.as_list()):
+            spaces_statistics[feature] = dict()
+
+            for metric in Metric.as_list():
+                spaces_statistics[feature][metric] = dict()
+
+                values_used = columns.get(f"spaces/{feature}/{metric}")
+                values_not_used = columns.get(f"spaces/no_{feature}/{metric}")
+
+                if values_used is None or values_not_used is None or \
+                        min(len(values_used), len(values_not_used)) == 0:
+                    continue
+
+                mann_whitney_u = ranks.mann_whitney_u(values_used, values_not_used)
+                proportion = Tests.proportion(
+                    mann_whitney_u["statistic"], len(values_used), len(values_not_used))
+
+                spaces_statistics[feature][metric] = {
+                    str(Tests.MANN_WHITNEY_U): {**mann_whitney_u, "proportion": proportion},
+                    str(Tests.CLIFFS_DELTA): {"statistic": 2. * proportion - 1.
+                                              if proportion is not None else None},
+                    str(Tests.VARGHA_DELANEY_A12): {"statistic": proportion}
+                }
+
+        Statistics.update_tests({str(Experiment.SPACES): spaces_statistics})
+
+    @staticmethod
+    def update_tests(statistics: Dict[str, Any]) -> None:
+        """
+        Saves the tests of a run which only conducts some of the tests into the statistic tests,
+        the other tests of the last run are kept.
+
+        :param statistics: Dict mapping the experiments, features and metrics to the results of
+                           each conducted test
+        """
+        saved: Dict[str, Any] = load_json_file(get_analyzer_res_path(),
+                                               name="statistic_tests.json") or dict()
+
+        for experiment, features in statistics.items():
+            for feature, metrics in features.items():
+                for metric, tests in metrics.items():
+                    saved.setdefault(experiment, dict()).setdefault(feature, dict()) \
+                        .setdefault(metric, dict()).update(tests)
+
+        save_json_file(saved, get_analyzer_res_path(), name="statistic_tests.json")
+
+    @staticmethod
+    def add_effect_size_intervals(tasks: List[Tuple[Dict[str, Any], Tuple[Any, ...]]]) -> None:
+        """
+        Bootstraps the effect sizes of the tests in a pool of workers.
+
+        :param tasks: List of the statistics of each test and the task of its bootstrap
+        """
+        from tqdm import tqdm
+
+        with multiprocessing.Pool(processes=multiprocessing.cpu_count()) as pool:
+            intervals = pool.imap(Bootstrap.effect_size_task, [task for _, task in tasks])
+
+            for (test_statistics, _), interval in tqdm(zip(tasks, intervals), total=len(tasks)):
+                test_statistics["proportion_interval"] = interval["proportion"]
+                test_statistics["median_difference_interval"] = interval["median_difference"]
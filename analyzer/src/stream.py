@@ -0,0 +1,297 @@
+import multiprocessing
+import sys
+from collections import deque
+from multiprocessing import resource_tracker
+from multiprocessing.pool import AsyncResult
+from typing import Any, BinaryIO, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from analyzer.src.analyzer import Analyzer
+from analyzer.src.checkpoint import Checkpoint
+from analyzer.src.dedup import Deduplication, Deduplicator
+from analyzer.src.experiments import Experiments
+from analyzer.src.documents import Documents
+from analyzer.src.rollup import RepoCube
+from analyzer.src.transport import SharedColumns
+
+
+# Repository, fingerprint and number of records of a group of streamed records
+Group = Tuple[str, str, int]
+
+
+class Stream:
+    """
+    This class ingests collector results from a JSON Lines stream instead of the result folder.
+
+    Every line contains the result of one source file with the keys of a result file (`rca`,
+    `node`, `finder`, ...) as well as `repo` and `file` identifiers. Lines are passed to the
+    workers in batches of raw bytes, so the parent never parses the records. Lines which are not
+    valid records are skipped and counted.
+    """
+
+    # Maximum number of bytes of raw lines per batch
+    BATCH_BYTES = 8 << 20
+
+    @staticmethod
+    def open(path: str) -> Optional[BinaryIO]:
+        """
+        Opens a JSON Lines stream, which may be compressed with Zstandard.
+
+        :param path: Path of a `.jsonl` or `.jsonl.zst` file, or `-` for stdin
+        :return: Binary stream of the lines if it can be read
+        """
+        source: BinaryIO = sys.stdin.buffer if path == "-" else open(path, "rb")
+
+        if not path.endswith(".zst"):
+            return source
+
+        try:
+            import zstandard
+        except ImportError:
+            print("Install zstandard to read compressed streams.")
+            return None
+
+        reader: BinaryIO = zstandard.ZstdDecompressor().stream_reader(source)
+        return reader
+
+    @staticmethod
+    def batches(stream: BinaryIO) -> Iterator[List[bytes]]:
+        """
+        Splits a stream into batches of lines.
+
+        :param stream: Binary stream of JSON lines
+        :return: Iterator of batches of raw lines
+        """
+        batch: List[bytes] = list()
+        size = 0
+
+        for line in iter(stream.readline, b""):
+            if not line.strip():
+                continue
+
+            batch.append(line)
+            size += len(line)
+
+            if size >= Stream.BATCH_BYTES:
+                yield batch
+                batch, size = list(), 0
+
+        if batch:
+            yield batch
+
+    @staticmethod
+    def valid(result_file: Any) -> bool:
+        """
+        Returns whether a parsed record can be analyzed.
+
+        :param result_file: The parsed record
+        :return: Whether the record is an object with the keys read by the analysis
+        """
+        return hasattr(result_file, "keys") and all(key in result_file
+                                                    for key in ["rca", "node", "finder"])
+
+    @staticmethod
+    def analyze_batch_shared(
+        task: Tuple[List[str], List[bytes], bool]
+    ) -> Tuple[List[Group], int, int, Dict[str, Any]]:
+        """
+        Analyzes a batch of lines in a worker and writes the results into shared memory.
+
+        The records are grouped by their repository, and with fingerprints also by their
+        fingerprint, so the parent can merge each group into the results of its repository and
+        leave out the groups of duplicate records.
+
+        :param task: Tuple of the experiment names, the raw lines and whether to fingerprint the
+                     records
+        :return: The repository, fingerprint and number of records of each group, the number of
+                 skipped lines, the number of duplicates within the batch and the descriptor of
+                 the shared memory segment containing the result columns of each group, whose
+                 keys are prefixed with the group index
+        """
+        experiment_names, lines, fingerprinted = task
+        groups: Dict[Tuple[str, str], Experiments] = dict()
+        records: Dict[Tuple[str, str], int] = dict()
+        skipped = 0
+        duplicates = 0
+        seen: Set[str] = set()
+
+        for line in lines:
+            try:
+                result_file = Documents.parse(line)
+            except ValueError:
+                skipped += 1
+                continue
+
+            if not Stream.valid(result_file):
+                skipped += 1
+                continue
+
+            repo = str(result_file.get("repo") or "")
+            fingerprint = Deduplicator.fingerprint(line, result_file) if fingerprinted else ""
+            group = (repo, fingerprint)
+
+            if fingerprint in seen:
+                duplicates += 1
+                continue
+
+            # Each record is analyzed on its own, so a record failing partway adds no values
+            record = Experiments.initialized(experiment_names)
+            try:
+                Analyzer.analyze_result(record, result_file)
+            except (KeyError, TypeError, ValueError, IndexError):
+                skipped += 1
+                continue
+
+            if group not in groups:
+                groups[group] = Experiments.initialized(experiment_names)
+                records[group] = 0
+
+            groups[group].merge_columns(record.as_columns())
+            records[group] += 1
+            if fingerprint:
+                seen.add(fingerprint)
+
+        columns = {f"{i}/{key}": column
+                   for i, experiments in enumerate(groups.values())
+                   for key, column in experiments.as_columns().items() if len(column)}
+
+        summary = [(repo, fingerprint, records[(repo, fingerprint)])
+                   for repo, fingerprint in groups]
+        return summary, skipped, duplicates, SharedColumns.share(columns)
+
+    @staticmethod
+    def split(columns: Dict[str, np.ndarray], count: int) -> List[Dict[str, np.ndarray]]:
+        """
+        Splits the columns of a batch into the columns of its groups.
+
+        :param columns: Columns whose keys are prefixed with the group index
+        :param count: Number of groups
+        :return: The columns of each group
+        """
+        groups: List[Dict[str, np.ndarray]] = [dict() for _ in range(count)]
+        for key, column in columns.items():
+            i, rest = key.split("/", 1)
+            groups[int(i)][rest] = column
+        return groups
+
+    @staticmethod
+    def ingest(
+        path: str,
+        experiment_names: List[str],
+        deduplication: str = str(Deduplication.OFF),
+        checkpoint_interval: float = 0,
+        resume: bool = False
+    ) -> None:
+        """
+        Analyzes all records of a JSON Lines stream and saves the results.
+
+        The batches are merged in the order of the stream, so a checkpoint contains all batches
+        up to the last merged one, which are skipped when the same stream is resumed.
+
+        :param path: Path of a `.jsonl` or `.jsonl.zst` file, or `-` for stdin
+        :param experiment_names: The experiments to run on the data
+        :param deduplication: Whether to leave out records identical to an earlier record (`once`),
+                              replaying duplicates merges them like all other records
+        :param checkpoint_interval: Minimum number of seconds between two checkpoints
+        :param resume: Whether to skip the batches of the last checkpoint
+        """
+        from tqdm import tqdm
+
+        stream = Stream.open(path)
+        if stream is None:
+            return
+
+        result_experiments = Experiments.initialized(experiment_names)
+        cube = RepoCube()
+        fingerprinted = deduplication == Deduplication.ONCE
+
+        checkpoint = Checkpoint({
+            "input": path,
+            "experiment_names": experiment_names,
+            "deduplication": str(deduplication),
+            "batch_bytes": Stream.BATCH_BYTES
+        }, checkpoint_interval)
+
+        if resume:
+            columns = checkpoint.load()
+            if columns:
+                result_experiments.merge_columns(columns)
+            if columns and checkpoint.cube:
+                cube.merge(RepoCube.from_columns(checkpoint.cube))
+
+        # Fingerprints of the merged records, the first record of each fingerprint is kept
+        fingerprints: Set[str] = set(checkpoint.state.get("fingerprints", []))
+        repos: Set[str] = set()
+        counts = {"records": 0, "skipped": 0, "duplicates": 0}
+
+        # Workers share the tracker of the parent, which releases the shared memory segments
+        resource_tracker.ensure_running()
+
+        processes = 2 * multiprocessing.cpu_count() + 1
+        pool = multiprocessing.Pool(processes=processes)
+
+        # Bounds the number of batches in flight, so the stream is not read into memory at once
+        pending: Deque[Tuple[str, AsyncResult[Tuple[List[Group], int, int, Dict[str, Any]]]]] = \
+            deque()
+
+        def merge_next() -> None:
+            key, result = pending.popleft()
+            groups, skipped, duplicates, descriptor = result.get()
+            columns = SharedColumns.receive(descriptor)
+
+            for (repo, fingerprint, records), group_columns in zip(
+                    groups, Stream.split(columns, len(groups))):
+                if fingerprint and fingerprint in fingerprints:
+                    counts["duplicates"] += records
+                    continue
+
+                if fingerprint:
+                    fingerprints.add(fingerprint)
+
+                result_experiments.merge_columns(group_columns)
+                cube.add_repo(repo, group_columns)
+                counts["records"] += records
+                if records:
+                    repos.add(repo)
+
+            counts["skipped"] += skipped
+            counts["duplicates"] += duplicates
+            checkpoint.complete(key)
+            t.update(sum(records for _, _, records in groups) + skipped + duplicates)
+
+            if checkpoint.due():
+                checkpoint.save(result_experiments.as_columns(), cube.as_columns(),
+                                {"fingerprints": sorted(fingerprints)})
+
+        try:
+            with stream, tqdm(unit="records") as t:
+                for i, batch in enumerate(Stream.batches(stream)):
+                    if str(i) in checkpoint.completed:
+                        continue
+
+                    pending.append((str(i), pool.apply_async(
+                        Stream.analyze_batch_shared, ((experiment_names, batch, fingerprinted),))))
+
+                    if len(pending) >= 2 * processes:
+                        merge_next()
+
+                while pending:
+                    merge_next()
+        except BaseException:
+            pool.terminate()
+            if checkpoint_interval > 0:
+                print("Saving checkpoint before exiting, continue the run with --resume.")
+                checkpoint.save(result_experiments.as_columns(), cube.as_columns(),
+                                {"fingerprints": sorted(fingerprints)})
+            raise
+
+        pool.close()
+        pool.join()
+
+        print(f"Analyzed {counts['records']} records of {len(repos)} repositories, skipped "
+              f"{counts['skipped']} invalid lines and {counts['duplicates']} duplicate records")
+
+        Analyzer.save_results(result_experiments.as_dict(), result_experiments)
+        cube.save()
+        Checkpoint.remove()
@@ -0,0 +1,221 @@
+import json
+from time import monotonic, perf_counter
+from typing import Callable, Dict, List, Tuple
+
+from analyzer.src.utils import get_analyzer_res_path, save_text_file_atomic
+
+
+# Counters collected by the workers, with their Prometheus help text
+WORKER_COUNTERS: Dict[str, str] = {
+    "files": "Result files analyzed",
+    "bytes": "Bytes of result files read",
+    "records": "Spaces and nodes analyzed",
+    "read_seconds": "Seconds spent reading result files",
+    "parse_seconds": "Seconds spent parsing result files",
+    "analyze_seconds": "Seconds spent adding results to the experiments",
+    "share_seconds": "Seconds spent writing results into shared memory",
+    "busy_seconds": "Seconds spent on tasks"
+}
+
+
+def new_counters() -> Dict[str, float]:
+    """
+    Returns zeroed worker counters.
+
+    :return: Dict mapping the counter names to zero
+    """
+    return dict.fromkeys(WORKER_COUNTERS, 0.)
+
+
+class Timer:
+    """Context manager adding the elapsed seconds to a counter."""
+
+    def __init__(self, counters: Dict[str, float], name: str) -> None:
+        """
+        :param counters: The counters
+        :param name: Name of the counter to add the elapsed seconds to
+        """
+        self.counters = counters
+        self.name = name
+        self.start = 0.
+
+    def __enter__(self) -> None:
+        self.start = perf_counter()
+
+    def __exit__(self, *_: object) -> None:
+        self.counters[self.name] += perf_counter() - self.start
+
+
+class Telemetry:
+    """
+    This class aggregates the counters of the workers of an analyzer run and periodically exports
+    them as a Prometheus textfile and as a structured log line.
+
+    The time the workers spend reading, parsing and analyzing and the time the parent spends
+    merging tell I/O bound, parse bound and merge bound phases apart. The utilization relates the
+    busy time of the workers to the wall time of the pool, so a low utilization with a queue of
+    waiting tasks means the parent cannot keep up with merging.
+    """
+
+    NAME = "analyzer.prom"
+
+    def __init__(self, processes: int, total: int, interval: float = 10.) -> None:
+        """
+        :param processes: Number of worker processes
+        :param total: Number of tasks of the run
+        :param interval: Minimum number of seconds between two exports (0 disables them)
+        """
+        self.processes = processes
+        self.total = total
+        self.interval = interval
+
+        self.workers: Dict[str, Dict[str, float]] = dict()
+        self.completed = 0
+        self.merge_seconds = 0.
+
+        self.memory_bytes = 0.
+        self.in_flight_limit = float(processes)
+        self.throttled = 0.
+
+        self.start = monotonic()
+        self.last_export = self.start
+        self.last_totals = new_counters()
+
+    def record(self, counters: Dict[str, float], merge_seconds: float) -> None:
+        """
+        Records a finished task.
+
+        :param counters: The counters of the task, including the id of its worker
+        :param merge_seconds: Seconds the parent spent merging the result of the task
+        """
+        worker = str(int(counters.get("worker", 0)))
+        totals = self.workers.setdefault(worker, new_counters())
+
+        for name in WORKER_COUNTERS:
+            totals[name] += counters.get(name, 0.)
+
+        self.completed += 1
+        self.merge_seconds += merge_seconds
+
+    def record_memory(self, memory: int, limit: int, throttled: int) -> None:
+        """
+        Records the state of the memory budget of the pool.
+
+        :param memory: Resident set size of the parent and the workers in bytes
+        :param limit: Number of tasks allowed in flight
+        :param throttled: Number of times the pool held back tasks or shrank
+        """
+        self.memory_bytes = float(memory)
+        self.in_flight_limit = float(limit)
+        self.throttled = float(throttled)
+
+    def totals(self) -> Dict[str, float]:
+        """
+        Returns the counters summed over all workers.
+
+        :return: Dict mapping the counter names to their totals
+        """
+        totals = new_counters()
+        for counters in self.workers.values():
+            for name, value in counters.items():
+                totals[name] += value
+        return totals
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Returns the current state of the run including the rates since the last export.
+
+        :return: Dict mapping the names of the measurements to their values
+        """
+        now = monotonic()
+        elapsed = max(now - self.start, 1e-9)
+        window = max(now - self.last_export, 1e-9)
+        totals = self.totals()
+
+        snapshot = {
+            "elapsed_seconds": elapsed,
+            "tasks_completed": float(self.completed),
+            "tasks_total": float(self.total),
+            "tasks_remaining": float(self.total - self.completed),
+            "worker_utilization": totals["busy_seconds"] / (self.processes * elapsed),
+            "merge_seconds": self.merge_seconds,
+            "memory_bytes": self.memory_bytes,
+            "in_flight_limit": self.in_flight_limit,
+            "throttled": self.throttled,
+            **totals
+        }
+
+        for name in ["files", "bytes", "records"]:
+            snapshot[f"{name}_per_second"] = (totals[name] - self.last_totals[name]) / window
+
+        # Share of the time spent in each phase, the largest share is the bottleneck. Merging
+        # blocks the whole pool, so its time is weighted by the number of workers.
+        phases = {
+            "read": totals["read_seconds"],
+            "parse": totals["parse_seconds"],
+            "analyze": totals["analyze_seconds"] + totals["share_seconds"],
+            "merge": self.merge_seconds * self.processes
+        }
+        phase_total = max(sum(phases.values()), 1e-9)
+        for phase, seconds in phases.items():
+            snapshot[f"{phase}_share"] = seconds / phase_total
+
+        return snapshot
+
+    def textfile(self, snapshot: Dict[str, float]) -> str:
+        """
+        Returns the measurements in the Prometheus text format.
+
+        :param snapshot: The current state as returned by `snapshot`
+        :return: The contents of the textfile
+        """
+        lines: List[str] = list()
+
+        for name, description in WORKER_COUNTERS.items():
+            metric = f"analyzer_worker_{name}_total"
+            lines.extend([f"# HELP {metric} {description}", f"# TYPE {metric} counter"])
+            lines.extend(f'{metric}{{worker="{worker}"}} {counters[name]}'
+                         for worker, counters in sorted(self.workers.items()))
+
+        measurements: List[Tuple[str, str, str]] = [
+            ("tasks_completed", "counter", "Repositories or chunks of files analyzed"),
+            ("merge_seconds", "counter", "Seconds the parent spent merging results"),
+            ("throttled", "counter", "Times the pool held back tasks near the memory limit"),
+            ("tasks_total", "gauge", "Repositories or chunks of files of the run"),
+            ("tasks_remaining", "gauge", "Repositories or chunks of files not merged yet"),
+            ("worker_utilization", "gauge", "Busy time of the workers divided by their wall time"),
+            ("files_per_second", "gauge", "Result files analyzed per second"),
+            ("bytes_per_second", "gauge", "Bytes of result files read per second"),
+            ("records_per_second", "gauge", "Spaces and nodes analyzed per second"),
+            ("memory_bytes", "gauge", "Resident set size of the parent and the workers"),
+            ("in_flight_limit", "gauge", "Tasks allowed in flight under the memory limit")
+        ]
+        for name, kind, description in measurements:
+            metric = f"analyzer_{name}_total" if kind == "counter" else f"analyzer_{name}"
+            lines.extend([f"# HELP {metric} {description}", f"# TYPE {metric} {kind}",
+                          f"{metric} {snapshot[name]}"])
+
+        return "\n".join(lines) + "\n"
+
+    def due(self) -> bool:
+        """
+        Returns whether the next export is due.
+
+        :return: Whether exports are enabled and the interval has passed
+        """
+        return self.interval > 0 and monotonic() - self.last_export >= self.interval
+
+    def export(self, write: Callable[[str], None] = print) -> None:
+        """
+        Writes the Prometheus textfile and a structured log line.
+
+        :param write: Function writing the log line
+        """
+        snapshot = self.snapshot()
+
+        save_text_file_atomic(self.textfile(snapshot), get_analyzer_res_path(), Telemetry.NAME)
+        write("telemetry " + json.dumps({name: round(value, 3)
+                                         for name, value in snapshot.items()}))
+
+        self.last_export = monotonic()
+        self.last_totals = self.totals()
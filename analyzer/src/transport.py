@@ -0,0 +1,146 @@
+import os
+from multiprocessing import shared_memory
+from os.path import join
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from analyzer.src.utils import load_json_file, save_json_file
+
+
+ColumnIndex = List[Tuple[str, str, int, int]]
+
+
+class SharedColumns:
+    """
+    This class moves columnar results between processes through shared memory segments.
+
+    A worker writes all of its columns into a single segment and only returns a small descriptor
+    containing the segment name and the position of each column. The receiving process copies the
+    segment once and slices the columns from it, so no Python object is pickled per value.
+    """
+
+    ALIGNMENT = 8
+
+    @staticmethod
+    def layout(columns: Dict[str, np.ndarray]) -> Tuple[ColumnIndex, int]:
+        """
+        Computes the position of each column in a contiguous buffer.
+
+        :param columns: Dict mapping column keys to arrays
+        :return: The column index and the total size of the buffer in bytes
+        """
+        index: ColumnIndex = list()
+        offset = 0
+
+        for key, column in columns.items():
+            index.append((key, column.dtype.str, offset, len(column)))
+            offset += column.nbytes
+            offset += -offset % SharedColumns.ALIGNMENT
+
+        return index, offset
+
+    @staticmethod
+    def write(columns: Dict[str, np.ndarray], index: ColumnIndex, buffer: Any) -> None:
+        """
+        Writes columns into a buffer according to their index.
+
+        :param columns: Dict mapping column keys to arrays
+        :param index: The column index computed by `layout`
+        :param buffer: Writable buffer which is large enough to hold all columns
+        """
+        for key, dtype, offset, length in index:
+            target = np.ndarray((length,), dtype=np.dtype(dtype), buffer=buffer, offset=offset)
+            target[:] = columns[key]
+
+    @staticmethod
+    def read(index: ColumnIndex, buffer: Any) -> Dict[str, np.ndarray]:
+        """
+        Returns views of the columns in a buffer.
+
+        :param index: The column index computed by `layout`
+        :param buffer: Buffer containing the columns
+        :return: Dict mapping column keys to array views into the buffer
+        """
+        return {key: np.ndarray((length,), dtype=np.dtype(dtype), buffer=buffer, offset=offset)
+                for key, dtype, offset, length in index}
+
+    @staticmethod
+    def share(columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        """
+        Writes columns into a new shared memory segment.
+
+        :param columns: Dict mapping column keys to arrays
+        :return: Descriptor of the shared memory segment
+        """
+        index, size = SharedColumns.layout(columns)
+
+        segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            SharedColumns.write(columns, index, segment.buf)
+        finally:
+            segment.close()
+
+        return {"name": segment.name, "size": size, "index": index}
+
+    @staticmethod
+    def receive(descriptor: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Reads the columns of a shared memory segment and releases the segment.
+
+        :param descriptor: Descriptor returned by `share`
+        :return: Dict mapping column keys to arrays
+        """
+        segment = shared_memory.SharedMemory(name=descriptor["name"])
+        try:
+            assert segment.buf is not None
+            buffer = bytearray(segment.buf[:descriptor["size"]])
+        finally:
+            segment.close()
+            segment.unlink()
+
+        return SharedColumns.read(descriptor["index"], buffer)
+
+
+class ColumnStore:
+    """
+    This class saves columns in a columnar file, which consists of a raw data file containing all
+    columns back to back and a JSON index with the position of each column. Loading maps the data
+    file into memory, so columns are only read from disk when they are accessed.
+    """
+
+    @staticmethod
+    def save(columns: Dict[str, np.ndarray], path: str, name: str) -> None:
+        """
+        Saves columns in a columnar file.
+
+        :param columns: Dict mapping column keys to arrays
+        :param path: Path to save the columns at
+        :param name: Name of the columnar file without extension
+        """
+        index, size = SharedColumns.layout(columns)
+
+        os.makedirs(path, exist_ok=True)
+        data = np.memmap(join(path, f"{name}.bin"), dtype=np.uint8, mode="w+",
+                         shape=(max(size, 1),))
+        SharedColumns.write(columns, index, data)
+        data.flush()
+        del data
+
+        save_json_file({"size": size, "index": index}, path, f"{name}.json")
+
+    @staticmethod
+    def load(path: str, name: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Loads the columns of a columnar file.
+
+        :param path: Path of the columnar file
+        :param name: Name of the columnar file without extension
+        :return: Dict mapping column keys to memory mapped arrays if the file exists
+        """
+        store = load_json_file(path, f"{name}.json")
+        if store is None:
+            return None
+
+        data = np.memmap(join(path, f"{name}.bin"), dtype=np.uint8, mode="r")
+        return SharedColumns.read(store["index"], data)
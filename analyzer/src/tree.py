@@ -0,0 +1,146 @@
+from typing import Any, Dict, List
+
+import numpy as np
+
+from analyzer.src.features import Features
+
+
+# Bit of each feature in the feature masks of the spaces
+FEATURE_BITS = {feature: 1 << i for i, feature in enumerate(Features.as_list())}
+
+
+class SpaceTree:
+    """
+    This class rebuilds the nesting of the flattened spaces of a result file.
+
+    The spaces are sorted by their start line and, for equal start lines, by their end line in
+    descending order. A single sweep over the sorted spaces with a stack of the currently open
+    spaces yields the parent and the depth of each space. Findings are joined to the innermost
+    space containing them, and values of the findings are propagated from the innermost spaces up
+    to their ancestors one nesting level at a time. The features of each space are kept as a bit
+    mask in the order of `Features.as_list`.
+    """
+
+    # Number of nesting levels the spaces are split into, the last level contains all deeper spaces
+    DEPTH_LEVELS = 4
+
+    def __init__(self, spaces: List[Dict[str, Any]], findings: List[Dict[str, Any]]) -> None:
+        """
+        :param spaces: List of spaces of a result file
+        :param findings: List of findings of the feature finder in the same file
+        """
+        self.spaces = spaces
+        self.starts = np.array([space["start_line"] for space in spaces], dtype=np.int64)
+        self.ends = np.array([space["end_line"] for space in spaces], dtype=np.int64)
+
+        # Spaces with identical lines keep their collector order, which lists parents first
+        self.order = np.lexsort((np.arange(len(spaces)), -self.ends, self.starts))
+        self.sorted_starts = self.starts[self.order]
+
+        parents = [-1] * len(spaces)
+        depths = [0] * len(spaces)
+        ends = self.ends.tolist()
+        stack: List[int] = list()
+
+        for i in self.order.tolist():
+            # Open spaces which end before this space cannot contain it or any later space
+            while stack and ends[stack[-1]] < ends[i]:
+                stack.pop()
+
+            if stack:
+                parents[i] = stack[-1]
+                depths[i] = depths[stack[-1]] + 1
+            stack.append(i)
+
+        self.parents = np.array(parents, dtype=np.int64)
+        self.depths = np.array(depths, dtype=np.int64)
+
+        # Indices of the nested spaces on each depth, deepest first
+        self.levels = [np.flatnonzero(self.depths == depth)
+                       for depth in range(int(self.depths.max(initial=0)), 0, -1)]
+
+        lines: List[List[int]] = [[], [], []]
+        for finding in findings:
+            feature = Features.get_feature_by_token(finding["name"])
+            if feature is not None:
+                lines[0].append(finding["start_line"])
+                lines[1].append(finding["end_line"])
+                lines[2].append(FEATURE_BITS[feature])
+
+        starts, finding_ends, bits = (np.array(column, dtype=np.int64) for column in lines)
+        located = self.locate(starts, finding_ends)
+
+        masks = np.zeros(len(spaces), dtype=np.int64)
+        np.bitwise_or.at(masks, located[located >= 0], bits[located >= 0])
+        self.masks = self.propagate(masks, np.bitwise_or)
+
+    def locate(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Joins findings to the innermost spaces containing them.
+
+        The candidate of a finding is the last space in sweep order which starts before it. If
+        the candidate ends before the finding, its ancestors are tried, which takes one array
+        operation per nesting level.
+
+        :param starts: Start lines of the findings
+        :param ends: End lines of the findings
+        :return: Index of the innermost space containing each finding, or -1
+        """
+        if not len(self.order):
+            return np.full(len(starts), -1, dtype=np.int64)
+
+        positions = np.searchsorted(self.sorted_starts, starts, side="right") - 1
+        located = np.where(positions >= 0, self.order[np.maximum(positions, 0)], -1)
+
+        outside = located >= 0
+        while True:
+            outside[outside] = self.ends[located[outside]] < ends[outside]
+            if not outside.any():
+                return located
+
+            located[outside] = self.parents[located[outside]]
+            outside &= located >= 0
+
+    def propagate(self, values: np.ndarray, combine: np.ufunc) -> np.ndarray:
+        """
+        Combines the values of the spaces with the values of all of their descendants.
+
+        :param values: Value of each space
+        :param combine: Function combining the values, e.g. `np.add` or `np.bitwise_or`
+        :return: Combined value of each space
+        """
+        values = values.copy()
+        for level in self.levels:
+            combine.at(values, self.parents[level], values[level])
+        return values
+
+    def has_feature(self, space: int, feature: str) -> bool:
+        """
+        Returns whether a feature is used in a space or any of its descendants.
+
+        :param space: Index of the space
+        :param feature: Name of the feature
+        :return: Whether the feature is used in the space
+        """
+        return bool(self.masks[space] & FEATURE_BITS[feature])
+
+    def depth_level(self, space: int) -> int:
+        """
+        Returns the nesting level of a space, where the spaces directly inside the file are on the
+        first level and all spaces nested deeper than the last level are on the last level.
+
+        :param space: Index of the space
+        :return: The nesting level
+        """
+        return min(int(self.depths[space]), SpaceTree.DEPTH_LEVELS)
+
+    @staticmethod
+    def depth_keys(feature: str) -> List[str]:
+        """
+        Returns the keys of the spaces with and without a feature on each nesting level.
+
+        :param feature: Name of the feature
+        :return: List of keys
+        """
+        return [f"depth_{level}_{prefix}{feature}"
+                for level in range(1, SpaceTree.DEPTH_LEVELS + 1) for prefix in ["no_", ""]]
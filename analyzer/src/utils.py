@@ -1,4 +1,5 @@
 import json
+import pickle
 import sys
 import os
 from os.path import join
@@ -37,6 +38,98 @@ def save_json_file(data: Dict[str, Any], path: str, name: str) -> None:
         return None
 
 
+def load_pickle_file(path: str, name: str) -> Optional[Any]:
+    """
+    Load the contents of a pickle file.
+
+    :param path: Path of the file to load
+    :param name: Name of the file
+    :return: The unpickled object if the file exists
+    """
+    try:
+        with open(join(path, name), "rb") as pickle_file:
+            return pickle.load(pickle_file)
+    except:
+        return None
+
+
+def save_pickle_file_atomic(data: Any, path: str, name: str) -> None:
+    """
+    Saves an object in a pickle file. The file is written under a temporary name first and then
+    renamed, so readers never see a partially written file.
+
+    :param data: Object to be saved in a pickle file
+    :param path: Path to save the object at
+    :param name: Name of the pickle file
+    """
+    os.makedirs(path, exist_ok=True)
+    tmp_path = join(path, f".{name}.tmp")
+
+    with open(tmp_path, "wb") as pickle_file:
+        pickle.dump(data, pickle_file, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle_file.flush()
+        os.fsync(pickle_file.fileno())
+
+    os.replace(tmp_path, join(path, name))
+
+
+def save_text_file_atomic(text: str, path: str, name: str) -> None:
+    """
+    Saves a text file. The file is written under a temporary name first and then renamed, so
+    readers never see a partially written file.
+
+    :param text: Contents of the file
+    :param path: Path to save the file at
+    :param name: Name of the file
+    """
+    os.makedirs(path, exist_ok=True)
+    tmp_path = join(path, f".{name}.tmp")
+
+    with open(tmp_path, "w", encoding="utf-8") as text_file:
+        text_file.write(text)
+
+    os.replace(tmp_path, join(path, name))
+
+
+def load_arrays_file(path: str, name: str) -> Optional[Dict[str, Any]]:
+    """
+    Loads the arrays of an uncompressed numpy archive.
+
+    :param path: Path of the archive
+    :param name: Name of the archive
+    :return: Dict mapping the names of the arrays to the arrays if the archive exists
+    """
+    import numpy as np
+
+    try:
+        with np.load(join(path, name)) as archive:
+            return {key: archive[key] for key in archive.files}
+    except (OSError, ValueError):
+        return None
+
+
+def save_arrays_file_atomic(arrays: Dict[str, Any], path: str, name: str) -> None:
+    """
+    Saves arrays in an uncompressed numpy archive. The archive is written under a temporary name
+    first and then renamed, so readers never see a partially written archive.
+
+    :param arrays: Dict mapping the names of the arrays to the arrays
+    :param path: Path to save the archive at
+    :param name: Name of the archive
+    """
+    import numpy as np
+
+    os.makedirs(path, exist_ok=True)
+    tmp_path = join(path, f".{name}.tmp")
+
+    with open(tmp_path, "wb") as archive:
+        np.savez(archive, **arrays)
+        archive.flush()
+        os.fsync(archive.fileno())
+
+    os.replace(tmp_path, join(path, name))
+
+
 def get_root_path() -> str:
     """
     Returns the root path of the repository.
@@ -1,13 +1,24 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import json
 
+import numpy as np
+
 
 class Values:
     """This class contains a list of values and offers utility functions on it."""
 
     def __init__(self, values: List[float]) -> None:
         self._values = values
+        self._chunks: List[Tuple[int, np.ndarray]] = []
+
+    def chunks(self) -> List[np.ndarray]:
+        """
+        Returns the merged chunks ordered by their position.
+
+        :return: List of arrays of values
+        """
+        return [chunk for _, chunk in sorted(self._chunks, key=lambda chunk: chunk[0])]
 
     def values(self) -> List[float]:
         """
@@ -15,8 +26,26 @@ class Values:
 
         :return: Saved values
         """
+        if self._chunks:
+            # Converted per chunk, so integer chunks keep their integer values
+            for chunk in self.chunks():
+                self._values.extend(chunk.tolist())
+            self._chunks = []
         return self._values
 
+    def array(self) -> np.ndarray:
+        """
+        Returns the filtered values as an array without converting merged chunks. Integer values
+        keep an integer array.
+
+        :return: Array of the filtered values
+        """
+        own = np.array([x for x in self._values if x is not None])
+        if not self._chunks:
+            return own
+        return np.concatenate([own, *self.chunks()]) if len(own) else \
+            np.concatenate(self.chunks())
+
     def filtered_values(self) -> List[float]:
         """
         Filters out any `None` values.
@@ -60,6 +89,26 @@ class Values:
         """
         self._values.extend(other.values())
 
+    def merge_array(self, array: np.ndarray, position: int = 0) -> None:
+        """
+        Merges an array of filtered values. The array is only concatenated once it is needed.
+
+        :param array: Array of values without `None` entries
+        :param position: Position of the array among the merged arrays, arrays of equal position
+                         keep the order in which they are merged
+        """
+        if len(array):
+            self._chunks.append((position, array))
+
+    def remove_arrays(self, position: int) -> None:
+        """
+        Removes the arrays merged at a position, which have to be kept as arrays, i.e. the values
+        must not have been converted since.
+
+        :param position: Position of the arrays
+        """
+        self._chunks = [chunk for chunk in self._chunks if chunk[0] != position]
+
     def as_dict(self) -> Dict[str, Any]:
         """
         Returns the values with their count and average value.
@@ -0,0 +1,221 @@
+import multiprocessing
+import os
+from multiprocessing import resource_tracker
+from time import monotonic, sleep
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from analyzer.src.analyzer import Analyzer
+from analyzer.src.experiments import Experiments
+from analyzer.src.rollup import RepoCube
+from analyzer.src.sampling import SUM_SUFFIX
+from analyzer.src.transport import SharedColumns
+from analyzer.src.utils import get_collector_res_path
+
+
+# Identifies a result file by its repository path and name
+FileKey = Tuple[str, str]
+
+
+class Watcher:
+    """
+    This class analyzes the collector results while they are written.
+
+    The collector result folder is polled for new or changed files, which are analyzed by a pool
+    of workers. The results of each repository are merged as soon as they are analyzed, each file
+    at its own position. A changed or removed file subtracts its previous contribution by removing
+    the values merged at its position and merging its sums negated, so only the sums are kept per
+    file. The summary is rewritten at most once per debounce interval, the raw values and the
+    repository cube are saved when watching stops.
+    """
+
+    def __init__(
+        self,
+        experiment_names: List[str],
+        poll_interval: float = 5.,
+        debounce: float = 60.,
+        idle_timeout: float = 0.
+    ) -> None:
+        """
+        :param experiment_names: The experiments to run on the data
+        :param poll_interval: Seconds between two scans of the collector result folder
+        :param debounce: Minimum number of seconds between two summaries
+        :param idle_timeout: Seconds without changes after which watching stops (0 never stops)
+        """
+        self.experiment_names = experiment_names
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.idle_timeout = idle_timeout
+
+        self.stats: Dict[FileKey, Tuple[int, int]] = dict()
+
+        # Merged results of each repository and the position and sum columns of each merged file
+        self.repos: Dict[str, Experiments] = dict()
+        self.files: Dict[FileKey, Tuple[int, Dict[str, np.ndarray]]] = dict()
+        self.position = 0
+
+    @staticmethod
+    def scan() -> Dict[FileKey, Tuple[int, int]]:
+        """
+        Returns the size and modification time of all result files.
+
+        :return: Dict mapping the result files to their size and modification time
+        """
+        stats: Dict[FileKey, Tuple[int, int]] = dict()
+
+        for owner in os.scandir(get_collector_res_path()):
+            if not owner.is_dir():
+                continue
+
+            for repo in os.scandir(owner.path):
+                if not repo.is_dir():
+                    continue
+
+                for file in os.scandir(repo.path):
+                    if file.is_file():
+                        stat = file.stat()
+                        stats[(repo.path, file.name)] = (stat.st_size, stat.st_mtime_ns)
+
+        return stats
+
+    @staticmethod
+    def analyze_file_shared(
+        task: Tuple[List[str], str, str]
+    ) -> Tuple[str, str, Optional[Dict[str, Any]]]:
+        """
+        Analyzes a single result file in a worker and writes the results into shared memory.
+
+        :param task: Tuple of the experiment names, the repository path and the file name
+        :return: The repository path, the file name and the descriptor of the shared memory
+                 segment if the file could be loaded
+        """
+        experiment_names, path, name = task
+        experiments = Experiments.initialized(experiment_names)
+
+        if not Analyzer.analyze_file(experiments, path, name):
+            return path, name, None
+
+        return path, name, SharedColumns.share(experiments.as_columns())
+
+    def add(self, key: FileKey, columns: Dict[str, np.ndarray]) -> None:
+        """
+        Merges the result of a new or changed file into the results of its repository.
+
+        :param key: The result file
+        :param columns: The result columns of the file
+        """
+        self.remove(key)
+
+        path, _ = key
+        experiments = self.repos.setdefault(path, Experiments.initialized(self.experiment_names))
+        experiments.merge_columns(columns, self.position)
+
+        # Sum columns of the features with nodes, which are subtracted when the file changes
+        summed = {name.rsplit("/", 1)[0] for name, column in columns.items()
+                  if name.endswith(SUM_SUFFIX) and column.any()}
+        self.files[key] = (self.position, {name: column for name, column in columns.items()
+                                           if name.endswith(SUM_SUFFIX) and
+                                           name.rsplit("/", 1)[0] in summed})
+        self.position += 1
+
+    def remove(self, key: FileKey) -> bool:
+        """
+        Subtracts the result of a file from the results of its repository.
+
+        :param key: The result file
+        :return: Whether the result of the file was merged
+        """
+        merged = self.files.pop(key, None)
+        if merged is None:
+            return False
+
+        path, _ = key
+        position, sums = merged
+        self.repos[path].remove_columns(position)
+        self.repos[path].merge_columns({name: -column for name, column in sums.items()})
+
+        if not any(file_path == path for file_path, _ in self.files):
+            del self.repos[path]
+
+        return True
+
+    def merged(self) -> Experiments:
+        """
+        Returns the merged results of all repositories.
+
+        :return: The merged experiments
+        """
+        experiments = Experiments.initialized(self.experiment_names)
+        for position, path in enumerate(sorted(self.repos)):
+            experiments.merge_columns(self.repos[path].as_columns(), position)
+
+        return experiments
+
+    def save(self, summary_only: bool) -> None:
+        """
+        Saves the current results.
+
+        :param summary_only: Whether to only save the results without raw values
+        """
+        experiments = self.merged()
+        Analyzer.save_results(experiments.as_dict(), experiments, summary_only)
+
+        if not summary_only:
+            cube = RepoCube()
+            for path, repo_experiments in sorted(self.repos.items()):
+                cube.add(path, repo_experiments.as_columns())
+            cube.save()
+
+    def watch(self) -> None:
+        """Analyzes new and changed result files until interrupted or idle."""
+        resource_tracker.ensure_running()
+
+        processes = 2 * multiprocessing.cpu_count() + 1
+        pool = multiprocessing.Pool(processes=processes)
+
+        last_change = monotonic()
+        last_save = monotonic()
+        dirty = False
+
+        try:
+            while not self.idle_timeout or monotonic() - last_change < self.idle_timeout:
+                stats = Watcher.scan()
+
+                for key in set(self.stats) - set(stats):
+                    del self.stats[key]
+                    if self.remove(key):
+                        dirty = True
+
+                changed = [key for key, stat in stats.items() if self.stats.get(key) != stat]
+                tasks = [(self.experiment_names, path, name) for path, name in changed]
+
+                for path, name, descriptor in pool.imap_unordered(
+                        Watcher.analyze_file_shared, tasks):
+                    # Files which cannot be loaded, e.g. while being written, are retried once
+                    # their size or modification time changes
+                    self.stats[(path, name)] = stats[(path, name)]
+
+                    if descriptor is not None:
+                        self.add((path, name), SharedColumns.receive(descriptor))
+                        dirty = True
+                    elif self.remove((path, name)):
+                        dirty = True
+
+                if changed:
+                    last_change = monotonic()
+                    print(f"Analyzed {len(changed)} new or changed files, "
+                          f"{len(self.files)} files in total.")
+
+                if dirty and monotonic() - last_save >= self.debounce:
+                    self.save(summary_only=True)
+                    last_save = monotonic()
+                    dirty = False
+
+                sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pool.terminate()
+
+        self.save(summary_only=False)